@@ -0,0 +1,156 @@
+"""
+Фейковый LLM для нагрузочных прогонов (llm_provider="fake").
+
+Не ходит в сеть: отвечает после задержки FAKE_LLM_LATENCY ± FAKE_LLM_JITTER,
+чтобы время ответа было похоже на настоящий провайдер. С привязанными
+инструментами на реплику пользователя вызывает update_resume_field для
+ближайшего незаполненного поля: схему и резюме берёт из системного
+промпта и выбирает поле через get_next_question — так граф проходит
+тот же путь, что и в проде, включая запись в резюме. Structured output
+возвращает схему, заполненную значениями по умолчанию (is_malicious=False,
+status="OK" и т.п.).
+"""
+import ast
+import asyncio
+import random
+import re
+import time
+import uuid
+from collections.abc import Sequence as AbcSequence
+from typing import (
+    Any, Dict, List, Literal, Optional, Sequence, Union, get_args, get_origin,
+)
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from agent.utils import get_next_question
+
+# блок состояния в системном промпте call_tools_or_respond:
+# обе части — repr словарей, каждая в одну строку
+_STATE_RE = re.compile(
+    r"Схема резюме:\n(.*)\nТекущее состояние резюме пользователя:\n(.*)\n"
+)
+
+_REPLIES = (
+    "Спасибо, записал. Расскажите, пожалуйста, подробнее.",
+    "Отлично! Перейдём к следующему вопросу.",
+    "Понял вас. Что ещё важно добавить?",
+)
+
+
+def _fake_value(annotation: Any) -> Any:
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return get_args(annotation)[0]
+    if origin is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        return _fake_value(args[0]) if args else None
+    if origin in (list, AbcSequence):
+        return []
+    if origin is dict:
+        return {}
+    return {bool: False, int: 0, float: 0.0, str: ""}.get(annotation)
+
+
+def _next_field(system_prompt: str) -> Optional[str]:
+    """Поле, о котором спросил бы агент, по схеме и резюме из промпта."""
+    blocks = _STATE_RE.findall(system_prompt)
+    if not blocks:
+        return None
+    try:
+        schema, resume = (ast.literal_eval(part) for part in blocks[-1])
+    except (SyntaxError, ValueError):
+        return None
+    if not isinstance(schema, dict) or not isinstance(resume, dict):
+        return None
+    question: Optional[Dict[str, Any]] = get_next_question(resume, schema)
+    return question["field_name"] if question else None
+
+
+def fake_structured(schema: Any) -> Any:
+    """Экземпляр pydantic-схемы: обязательные поля — «пустыми» значениями."""
+    values = {
+        name: (
+            _fake_value(info.annotation) if info.is_required()
+            else info.get_default(call_default_factory=True)
+        )
+        for name, info in schema.model_fields.items()
+    }
+    try:
+        return schema.model_validate(values)
+    except ValueError:
+        return schema.model_construct(**values)
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 1.5
+    jitter: float = 0.5
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "FakeChatModel":
+        names = [getattr(t, "name", getattr(t, "__name__", str(t))) for t in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> RunnableLambda:
+        def invoke(_: Any) -> Any:
+            time.sleep(self._delay())
+            return fake_structured(schema)
+
+        async def ainvoke(_: Any) -> Any:
+            await asyncio.sleep(self._delay())
+            return fake_structured(schema)
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        last = messages[-1] if messages else None
+        field_name = None
+        if "update_resume_field" in self.tool_names and isinstance(
+            last, HumanMessage
+        ):
+            field_name = _next_field(str(messages[0].content))
+        if field_name:
+            message = AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": "update_resume_field",
+                    "args": {
+                        "field_name": field_name,
+                        "value": str(last.content)[:200],
+                    },
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                }],
+            )
+        else:
+            message = AIMessage(content=random.choice(_REPLIES))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay())
+        return self._respond(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return self._respond(messages)
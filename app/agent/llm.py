@@ -1,8 +1,5 @@
 from core.config import settings
 
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.chat_models import ChatYandexGPT
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,7 +12,10 @@ def create_llm(provider: str = settings.llm_provider,
                model: str = settings.llm_model_name, temperature: float = settings.temperature, top_p: float = settings.top_p):
     global _google_api_keys_list, _current_google_key_idx
 
+    # Provider SDKs are heavy to import; load only the selected one.
     if provider.lower() == "openai":
+        from langchain_openai import ChatOpenAI
+
         logger.info(f"SET LLM {provider} {model}")
         return ChatOpenAI(
             model_name=model,
@@ -26,6 +26,8 @@ def create_llm(provider: str = settings.llm_provider,
             openai_proxy=settings.openai_proxy,
         )
     elif provider.lower() == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         logger.info(f"SET LLM {provider} {model}")
 
         if not _google_api_keys_list:
@@ -55,6 +57,14 @@ def create_llm(provider: str = settings.llm_provider,
             top_p=top_p,
             thinking_budget=1024
         )
+    elif provider.lower() == "fake":
+        from agent.fake_llm import FakeChatModel
+
+        logger.info("SET LLM fake (%.2fs latency)", settings.FAKE_LLM_LATENCY)
+        return FakeChatModel(
+            latency=settings.FAKE_LLM_LATENCY,
+            jitter=settings.FAKE_LLM_JITTER,
+        )
     else:
         raise ValueError(f"Unknown model: {model}")
 
@@ -8,8 +8,8 @@ from langchain_core.messages import (
 from langchain_core.runnables import RunnableConfig
 from agent.resume import get_user_resume, get_resume_scheme
 from agent.llm_graph import graph
-from crud.conversation_history import get_conversation_history, get_user_session_for_conversation
-from crud.user import get_user_by_tg_id
+from crud.conversation_history import get_conversation_history
+from services.identity import RequestIdentity
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -28,33 +28,33 @@ def _convert_db_history_to_messages(history: List[Dict[str, Any]]) -> List[Human
     return messages
 
 
-async def get_assistant_response(question: str, user_id: str, db: Session) -> str | None:
+async def get_assistant_response(
+    question: str, identity: RequestIdentity, db: Session
+) -> str | None:
     """
     Внешняя точка входа для бота.
     Использует историю разговора из базы данных.
+    Пользователь, резюме и сессия уже разрешены в identity.
     """
+    user_id = str(identity.tg_id)
     try:
         config = RunnableConfig({"configurable": {"thread_id": user_id}})
 
-        current_resume = await get_user_resume(user_id)
+        current_resume = await get_user_resume(db, identity)
         logger.debug("User %s resume fetched: %s", user_id, current_resume)
 
         resume_scheme = await get_resume_scheme()
         logger.debug("User %s resume scheme fetched: %s", user_id, resume_scheme)
 
-        user = get_user_by_tg_id(db, int(user_id))
-        if user:
-            session = get_user_session_for_conversation(db, user.id)
-            history = get_conversation_history(db, session.id, limit=50)
-            past_messages = _convert_db_history_to_messages(history)
-        else:
-            past_messages = []
+        history = get_conversation_history(db, identity.session_id, limit=50)
+        past_messages = _convert_db_history_to_messages(history)
 
         all_messages = past_messages + [HumanMessage(content=question)]
 
         response = await graph.ainvoke(
             {
                 "user_id": user_id,
+                "identity": identity,
                 "current_resume": current_resume,
                 "resume_scheme": resume_scheme,
                 "messages": all_messages,
@@ -1,5 +1,6 @@
 import logging
 import asyncio
+from functools import lru_cache
 from typing import Any, Dict, List, Literal
 
 from langchain_core.messages import (
@@ -13,6 +14,7 @@ from pydantic import BaseModel
 from agent.llm import create_llm, create_precise_llm
 from agent.tools import available_tools
 from agent.llm_guardrails import check_malicious_input
+from services.identity import RequestIdentity
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +22,25 @@ logger = logging.getLogger(__name__)
 # LLMs
 # ──────────────────────────────────────────────────────────────────────────────
 
-llm = create_llm().bind_tools(available_tools)
+# Клиенты создаются при первом обращении, а не при импорте модуля:
+# импорт роутера не тянет SDK провайдера и не ходит за ключами.
 
-precise_llm = create_precise_llm()
+@lru_cache(maxsize=None)
+def get_llm():
+    logger.debug("LLM initialised (base + tools bound)")
+    return create_llm().bind_tools(available_tools)
 
-precise_llm_with_tools = create_precise_llm().bind_tools(
-    available_tools, tool_choice="any"
-)
+
+@lru_cache(maxsize=None)
+def get_precise_llm():
+    return create_precise_llm()
 
 
-logger.debug("LLM initialised (base + tools bound)")
+@lru_cache(maxsize=None)
+def get_precise_llm_with_tools():
+    return create_precise_llm().bind_tools(
+        available_tools, tool_choice="any"
+    )
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Prompts (без изменений, кроме формирования ниже)
@@ -115,6 +126,7 @@ class CustomState(MessagesState):
     """Расширенное состояние графа."""
 
     user_id: str
+    identity: RequestIdentity
     current_resume: Dict[str, Any]
     resume_scheme: Dict[str, Any]
     verification: ResumeVerificationOutput
@@ -150,7 +162,7 @@ async def call_tools_or_respond(state: CustomState) -> Dict[str, Any]:
         prompt: List = [SystemMessage(sys_msg)] + state["messages"]
 
         logger.debug("Prompt → LLM_with_tools: %s", prompt)
-        response = await llm.ainvoke(prompt)
+        response = await get_llm().ainvoke(prompt)
         logger.debug("LLM_with_tools ответ: %s", response)
         return response
 
@@ -196,10 +208,11 @@ async def fill_missing_fields(
             )
         )
     ]
-    tools_response = await precise_llm_with_tools.ainvoke(prompt)
+    tools_response = await get_precise_llm_with_tools().ainvoke(prompt)
     await tools_node.ainvoke(
         {
             "user_id": state["user_id"],
+            "identity": state["identity"],
             "current_resume": current_resume,
             "messages": [tools_response],
             "session": state["session"],
@@ -243,7 +256,7 @@ async def verify_resume_structure(state: CustomState) -> Dict[str, Any]:
             )
         ),
     ]
-    response = await precise_llm.with_structured_output(
+    response = await get_precise_llm().with_structured_output(
         ResumeVerificationOutput,
     ).ainvoke(prompt_messages)
     if response.status == "MISSING_INFORMATION":
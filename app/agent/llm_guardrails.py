@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 from typing import Optional
 
 from langchain_core.messages import AIMessage, SystemMessage, BaseMessage, HumanMessage
@@ -29,7 +30,10 @@ class MaliciousInputDetectionOutput(BaseModel):
     is_malicious: bool = Field(..., description="True if the input is malicious, False otherwise.")
     reason: Optional[str] = Field(None, description="A brief explanation if the input is deemed malicious.")
 
-llm = create_precise_llm()
+@lru_cache(maxsize=None)
+def get_guard_llm():
+    """Создаётся при первой проверке, а не при импорте."""
+    return create_precise_llm()
 
 class Response(BaseModel):
     is_safe: bool = Field(..., description="True if the input is safe, False otherwise.")
@@ -52,7 +56,7 @@ async def check_malicious_input(input: str) -> Response:
     ]
     
     try:
-        detection_result = await llm.with_structured_output(
+        detection_result = await get_guard_llm().with_structured_output(
             MaliciousInputDetectionOutput
         ).ainvoke(prompt_messages)
 
@@ -1,13 +1,16 @@
-from typing import Any, List
+from typing import Any, Dict, List
 from sqlalchemy.orm import Session
 from crud.resume import (
-    get_or_create_active_resume,
-    update_resume_field,
     append_resume_insight,
+    append_resume_list_item,
+    patch_resume_data,
+    update_resume_list_item,
+    remove_resume_list_item,
 )
-from crud.user import get_user_by_tg_id
 from crud.dialog import continue_resume_flow
 from db.session import SessionLocal
+from models.resume import Resume
+from services.identity import RequestIdentity
 from services.schema_builder import build_resume_schema
 
 
@@ -21,39 +24,77 @@ async def get_resume_scheme():
         db.close()
 
 
-async def get_user_resume(user_id: str):
-    """Получает текущее резюме пользователя из API."""
-    db: Session = SessionLocal()
-    try:
-        current_user = get_user_by_tg_id(db=db, tg_id=int(user_id))
-        if not current_user:
-            return None
-        resume = get_or_create_active_resume(db=db, user_id=current_user.id)
-        # Remove None fields from resume data
-        filtered_data = {k: v for k, v in resume.data.items() if v is not None}
-        return filtered_data
-    finally:
-        db.close()
+async def get_user_resume(session: Session, identity: RequestIdentity):
+    """Текущие данные активного резюме пользователя (без пустых полей)."""
+    resume = session.get(Resume, identity.resume_id)
+    if resume is None:
+        return None
+    # Remove None fields from resume data
+    return {k: v for k, v in resume.data.items() if v is not None}
 
 
-async def update_user_resume(session: Session, user_id: str, field_name: str, value: Any):
-    """Обновляет поле резюме пользователя в API."""
-    current_user = get_user_by_tg_id(db=session, tg_id=int(user_id))
-    if not current_user:
-        return None
-    resume = get_or_create_active_resume(db=session, user_id=current_user.id)
-    updated_resume = update_resume_field(
-        db=session,
-        resume=resume,
-        field_name=field_name,
-        value=value
+async def update_user_resume(
+    session: Session, identity: RequestIdentity, field_name: str, value: Any
+):
+    """Обновляет поле резюме пользователя (только этот ключ JSONB)."""
+    patch_resume_data(session, identity.resume_id, {field_name: value})
+    session.commit()
+    return value
+
+
+async def add_user_list_item(
+    session: Session,
+    identity: RequestIdentity,
+    list_name: str,
+    entry: Dict[str, Any],
+) -> int | None:
+    """
+    Добавляет запись в начало списка; возвращает новую длину
+    или None, если резюме уже удалено.
+    """
+    count = append_resume_list_item(
+        session, identity.resume_id, list_name, entry, prepend=True
+    )
+    session.commit()
+    return count
+
+
+async def update_user_list_item(
+    session: Session,
+    identity: RequestIdentity,
+    list_name: str,
+    index: int,
+    entry_id: str,
+    field_name: str,
+    value: Any,
+) -> bool:
+    """Меняет одно поле записи списка; False, если запись сдвинулась."""
+    ok = update_resume_list_item(
+        session, identity.resume_id, list_name, index, field_name, value,
+        entry_id=entry_id,
+    )
+    session.commit()
+    return ok
+
+
+async def remove_user_list_item(
+    session: Session,
+    identity: RequestIdentity,
+    list_name: str,
+    index: int,
+    entry_id: str,
+) -> bool:
+    """Удаляет запись списка; False, если запись сдвинулась."""
+    ok = remove_resume_list_item(
+        session, identity.resume_id, list_name, index, entry_id=entry_id
     )
-    return updated_resume.data
+    session.commit()
+    return ok
 
 
 async def append_user_insight(
     session: Session,
-    user_id: str,
+    identity: RequestIdentity,
     description: str,
     insight: str,
 ) -> List[str] | None:
@@ -62,10 +103,9 @@ async def append_user_insight(
 
     Возвращает обновлённый список инсайтов.
     """
-    user = get_user_by_tg_id(db=session, tg_id=int(user_id))
-    if not user:
+    resume = session.get(Resume, identity.resume_id)
+    if resume is None:
         return None
-    resume = get_or_create_active_resume(db=session, user_id=user.id)
     updated_resume = append_resume_insight(
         db=session,
         resume=resume,
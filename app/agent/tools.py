@@ -4,11 +4,14 @@ from typing import Annotated, Any, Dict, List
 from langgraph.prebuilt import InjectedState
 from sqlalchemy.orm import Session
 from agent.resume import (
-    get_user_resume,
     update_user_resume,
     append_user_insight,
+    add_user_list_item,
+    update_user_list_item,
+    remove_user_list_item,
 )
 from agent.validation import validate
+from services.identity import RequestIdentity
 from langchain_core.tools import tool
 
 import uuid
@@ -31,6 +34,13 @@ def _success(msg: str) -> str:
     return f"{{ 'success': '{msg}' }}"
 
 
+def _find_entry(items: List[Dict[str, Any]], entry_id: str) -> int | None:
+    for i, item in enumerate(items):
+        if item.get("id") == entry_id:
+            return i
+    return None
+
+
 def _create_list_entry_dict(item_fields: Dict[str, Any]) -> Dict[str, Any]:
     entry = {
         "id": str(uuid.uuid4())[:5],
@@ -40,18 +50,20 @@ def _create_list_entry_dict(item_fields: Dict[str, Any]) -> Dict[str, Any]:
     return entry
 
 
-async def _save_resume_field(session: Session, user_id: str, field: str, value: Any) -> str:
-    await update_user_resume(session, user_id, field, value)
+async def _save_resume_field(
+    session: Session, identity: RequestIdentity, field: str, value: Any
+) -> str:
+    await update_user_resume(session, identity, field, value)
     return _success("Поле успешно обновлено.")
 
 
 async def _save_resume_insight(
     session: Session,
-    user_id: str,
+    identity: RequestIdentity,
     description: str,
     insight: str,
 ) -> str:
-    await append_user_insight(session, user_id, description, insight)
+    await append_user_insight(session, identity, description, insight)
     return _success("Инсайт успешно сохранён.")
 
 
@@ -79,7 +91,7 @@ async def update_resume_field(
             return _err(err_msg)
 
         state["current_resume"][field_name] = value
-        return await _save_resume_field(state["session"], str(user_id), field_name, value)
+        return await _save_resume_field(state["session"], state["identity"], field_name, value)
     except Exception as e:
         return _err(f"Error updating resume field: {e}")
 
@@ -120,13 +132,13 @@ async def create_list_item(
 
         logger.info("create_list_item [user %s]: %s", user_id, list_entry)
 
-        resume = await get_user_resume(user_id)
-        list: List[Dict[str, Any]] = resume.get(list_name, [])
-        list.insert(0, list_entry)
-        
-        state["current_resume"][list_name] = list
+        count = await add_user_list_item(state["session"], state["identity"], list_name, list_entry)
+        if count is None:
+            return _err("Resume not found")
 
-        await update_user_resume(state["session"], str(user_id), list_name, list)
+        items: List[Dict[str, Any]] = list(state["current_resume"].get(list_name) or [])
+        items.insert(0, list_entry)
+        state["current_resume"][list_name] = items
         return _success(f"{list_name} entry created.")
     except Exception as e:
         return _err(f"Error creating list item: {e}")
@@ -162,23 +174,18 @@ async def update_list_item(
         if not list_name:
             return _err("List name is required")
 
-        resume = await get_user_resume(user_id)
-       
-        list_items = resume.get(list_name, [])
-        entry_index = None
-        for i, item in enumerate(list_items):
-            if item.get("id") == entry_id:
-                entry_index = i
-                break
-        
+        list_items = state["current_resume"].get(list_name) or []
+        entry_index = _find_entry(list_items, entry_id)
         if entry_index is None:
             return _err(f"Entry with ID {entry_id} not found in {list_name}")
-        
-        resume[list_name][entry_index][field_name] = value
-        
-        state["current_resume"][list_name] = resume[list_name]
 
-        await update_user_resume(state["session"], str(user_id), list_name, resume[list_name])
+        ok = await update_user_list_item(
+            state["session"], state["identity"], list_name, entry_index, entry_id, field_name, value
+        )
+        if not ok:
+            return _err(f"Entry with ID {entry_id} not found in {list_name}")
+
+        list_items[entry_index][field_name] = value
         return _success(f"{list_name} item updated.")
     except Exception as e:
         return _err(f"Error updating list item: {e}")
@@ -209,23 +216,18 @@ async def remove_list_item(
         if not list_name:
             return _err("List name is required")
 
-        resume = await get_user_resume(user_id)
-
-        list_items = resume.get(list_name, [])
-        entry_index = None
-        for i, item in enumerate(list_items):
-            if item.get("id") == entry_id:
-                entry_index = i
-                break
-
+        list_items = state["current_resume"].get(list_name) or []
+        entry_index = _find_entry(list_items, entry_id)
         if entry_index is None:
             return _err(f"Entry with ID {entry_id} not found in {list_name}")
 
-        resume[list_name].pop(entry_index)
-
-        state["current_resume"][list_name] = resume[list_name]
+        ok = await remove_user_list_item(
+            state["session"], state["identity"], list_name, entry_index, entry_id
+        )
+        if not ok:
+            return _err(f"Entry with ID {entry_id} not found in {list_name}")
 
-        await update_user_resume(state["session"], str(user_id), list_name, resume[list_name])
+        list_items.pop(entry_index)
         return _success(f"{list_name} item removed.")
     except Exception as e:
         return _err(f"Error removing item from {list_name}: {e}")
@@ -264,7 +266,7 @@ async def save_interview_insight(
         )
         return await _save_resume_insight(
             state["session"],
-            str(user_id),
+            state["identity"],
             description,
             insight,
         )
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
-__all__ = ["get_next_question"]
-
+__all__ = ["FieldPlan", "get_next_question"]
 
 
 # helpers
@@ -40,51 +43,172 @@ def _priority_of(meta: Dict[str, Any]) -> int:
     return 10**9
 
 
-def _iter_schema_props(
-    schema_props: Dict[str, Any],
-    resume_fragment: Dict[str, Any],
-    prefix: str = "",
-) -> List[Tuple[str, str, int]]:
+def _is_askable(meta: Dict[str, Any]) -> bool:
+    return meta.get("question") not in ("", "-")
+
+
+def _schema_key(resume_schema: Dict[str, Any]) -> str:
     """
-    Рекурсивный обход схемы:
-    возвращает список (field_path, question, priority) незаполненных полей.
+    Отпечаток содержимого схемы: одна версия шаблонов — один план.
+    Порядок ключей учитывается — он решает при равных приоритетах.
     """
-    candidates: List[Tuple[str, str, int]] = []
-
-    for field, meta in sorted(
-        schema_props.items(), key=lambda item: _priority_of(item[1])
-    ):
-        if meta.get("type") != "array":
-            if not _is_filled(resume_fragment.get(field)) and meta["question"] not in ["", "-"]:
-                candidates.append(
-                    (f"{prefix}{field}", meta["question"], _priority_of(meta))
-                )
-            continue
-        
-        group_items_schema = meta["items"]["properties"]
-        group_resume: List[Dict[str, Any]] = resume_fragment.get(field, [])
-
-        if not group_resume:
-            first_field, first_meta = min(
-                group_items_schema.items(), key=lambda i: _priority_of(i[1])
+    raw = json.dumps(resume_schema, ensure_ascii=False)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+# plan
+@dataclass(frozen=True)
+class _Slot:
+    path: str
+    question: str
+    priority: int
+    group: Optional[str] = None
+
+
+class FieldPlan:
+    """
+    Предрасчитанный по схеме порядок вопросов.
+
+    Каждое поле (и каждое поле элемента группы) получает «слот»; слоты
+    упорядочены по приоритету, поэтому ближайший незаполненный вопрос —
+    младший бит маски пропусков резюме. Сортировка и разбор схемы
+    делаются один раз на версию схемы, а не на каждый вызов.
+    """
+
+    def __init__(self, resume_schema: Dict[str, Any]):
+        props = resume_schema.get("properties", {})
+        ordered = sorted(props.items(), key=lambda i: _priority_of(i[1]))
+
+        keyed: List[Tuple[Tuple[int, int, int], str, _Slot]] = []
+        for pos, (field, meta) in enumerate(ordered):
+            if meta.get("type") != "array":
+                if _is_askable(meta):
+                    slot = _Slot(field, meta["question"], _priority_of(meta))
+                    keyed.append(((slot.priority, pos, 0), field, slot))
+                continue
+            children = sorted(
+                meta["items"]["properties"].items(),
+                key=lambda i: _priority_of(i[1]),
             )
-            candidates.append(
-                (
-                    f"{prefix}{field}.{first_field}",
-                    first_meta["question"],
-                    _priority_of(first_meta),
+            for child_pos, (child, child_meta) in enumerate(children):
+                slot = _Slot(
+                    f"{field}.{child}",
+                    child_meta["question"],
+                    _priority_of(child_meta),
+                    field,
                 )
-            )
-            continue
-
-        for item in group_resume:
-            candidates.extend(
-                _iter_schema_props(
-                    group_items_schema, item, prefix=f"{prefix}{field}."
+                keyed.append(
+                    ((slot.priority, pos, child_pos + 1),
+                     f"{field}\0{child}", slot)
                 )
-            )
 
-    return candidates
+        keyed.sort(key=lambda k: k[0])
+        self.slots: Tuple[_Slot, ...] = tuple(k[2] for k in keyed)
+        bit = {name: 1 << i for i, (_, name, _) in enumerate(keyed)}
+
+        # слот поля группы → биты полей той же группы с тем же приоритетом;
+        # из них спрашивается поле самого раннего элемента, где оно пусто
+        tie_bits: Dict[Tuple[str, int], int] = {}
+        for i, slot in enumerate(self.slots):
+            if slot.group is not None:
+                key = (slot.group, slot.priority)
+                tie_bits[key] = tie_bits.get(key, 0) | 1 << i
+        self.ties: Tuple[int, ...] = tuple(
+            tie_bits.get((slot.group, slot.priority), 0)
+            for slot in self.slots
+        )
+
+        # поле верхнего уровня → бит
+        self.scalars: Dict[str, int] = {
+            f: b for f, b in bit.items() if "\0" not in f
+        }
+        # группа → (бит «группа пуста», {поле элемента: бит})
+        self.groups: Dict[str, Tuple[int, Dict[str, int]]] = {}
+        for field, meta in ordered:
+            if meta.get("type") != "array":
+                continue
+            children = sorted(
+                meta["items"]["properties"].items(),
+                key=lambda i: _priority_of(i[1]),
+            )
+            child_bits = {
+                child: bit[f"{field}\0{child}"]
+                for child, child_meta in children
+                if _is_askable(child_meta)
+            }
+            first = bit[f"{field}\0{children[0][0]}"] if children else 0
+            self.groups[field] = (first, child_bits)
+
+    def item_mask(self, gid: str, item: Any) -> int:
+        """Биты незаполненных полей одного элемента группы."""
+        _, child_bits = self.groups[gid]
+        if not isinstance(item, dict):
+            item = {}
+        mask = 0
+        for child, b in child_bits.items():
+            if not _is_filled(item.get(child)):
+                mask |= b
+        return mask
+
+    def missing(
+        self, current_resume: Dict[str, Any]
+    ) -> Tuple[int, Dict[str, List[int]]]:
+        """(маска пропусков резюме, маски элементов по группам)."""
+        mask = 0
+        for field, b in self.scalars.items():
+            if not _is_filled(current_resume.get(field)):
+                mask |= b
+        items: Dict[str, List[int]] = {}
+        for gid, (first, _) in self.groups.items():
+            value = current_resume.get(gid)
+            masks = [
+                self.item_mask(gid, item)
+                for item in (value if isinstance(value, list) else [])
+            ]
+            items[gid] = masks
+            if not masks:
+                mask |= first
+            for item_mask in masks:
+                mask |= item_mask
+        return mask, items
+
+    def next(self, current_resume: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ближайший по приоритету незаполненный вопрос резюме."""
+        mask, items = self.missing(current_resume)
+        if not mask:
+            return None
+        low = mask & -mask
+        slot = self.slots[low.bit_length() - 1]
+        ties = mask & self.ties[low.bit_length() - 1]
+        if ties != low and ties:
+            for item in items[slot.group]:
+                if item & ties:
+                    low = item & ties & -(item & ties)
+                    slot = self.slots[low.bit_length() - 1]
+                    break
+        return {
+            "field_name": slot.path,
+            "question": slot.question,
+            "priority": slot.priority,
+        }
+
+
+_PLANS: "OrderedDict[str, FieldPlan]" = OrderedDict()
+_PLANS_MAX = 8
+
+
+def plan_for(resume_schema: Dict[str, Any]) -> FieldPlan:
+    """FieldPlan для схемы (несколько последних версий в кэше)."""
+    key = _schema_key(resume_schema)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = FieldPlan(resume_schema)
+        _PLANS[key] = plan
+        while len(_PLANS) > _PLANS_MAX:
+            _PLANS.popitem(last=False)
+    else:
+        _PLANS.move_to_end(key)
+    return plan
 
 
 # public
@@ -96,20 +220,4 @@ def get_next_question(
     Возвращает ближайший незаполненный вопрос или None,
     если резюме полностью заполнено.
     """
-    props = resume_schema.get("properties", {})
-    # Игнорировать вопрос про PDF если есть специальный флаг
-    if current_resume.get("resume_pdf") == "ignored":
-        props = {k: v for k, v in props.items() if k != "resume_pdf"}
-    candidates = _iter_schema_props(props, current_resume)
-
-    if not candidates:
-        return None
-
-    next_field, next_question, next_priority = min(
-        candidates, key=lambda x: x[2]
-    )
-    return {
-        "field_name": next_field,
-        "question": next_question,
-        "priority": next_priority,
-    }
+    return plan_for(resume_schema).next(current_resume)
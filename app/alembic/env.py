@@ -10,6 +10,7 @@ from models import (
     session,
     answer,
     question_template,
+    question_sync,
 )
 from db.base import Base
 from core.config import settings
@@ -0,0 +1,128 @@
+"""initial schema
+
+Схема в том виде, в каком она была до первых миграций: users, resumes,
+sessions, answers (ещё не секционированная) и question_templates.
+Следующие ревизии строятся поверх неё.
+
+Базу, созданную раньше (create_all или собственными ревизиями), не
+пересоздают, а помечают этой ревизией:
+
+    alembic stamp --purge 0000_initial_schema
+    alembic upgrade head
+
+Revision ID: 0000_initial_schema
+Revises:
+Create Date: 2026-10-19 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0000_initial_schema"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tg_id", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=True),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("work_status", sa.Boolean(), nullable=True),
+        sa.Column("birthday", sa.Date(), nullable=True),
+        sa.Column("hideBirthday", sa.Boolean(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("pdn_agreed", sa.Boolean(), nullable=True),
+        sa.Column("offer_agreed", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_users_tg_id", "users", ["tg_id"], unique=True)
+
+    op.create_table(
+        "resumes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(),
+                  sa.ForeignKey("users.id", ondelete="CASCADE"),
+                  nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column("insights", postgresql.JSONB(), server_default="[]",
+                  nullable=False,
+                  comment="Скрытые факты / инсайты агента"),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("is_archived", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True,
+                  comment="Время создания записи"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True,
+                  comment="Время последнего обновления"),
+    )
+    op.create_index("ix_resumes_user_id", "resumes", ["user_id"])
+
+    op.create_table(
+        "sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(),
+                  sa.ForeignKey("users.id", ondelete="CASCADE"),
+                  nullable=False),
+        sa.Column("resume_id", sa.Integer(),
+                  sa.ForeignKey("resumes.id", ondelete="CASCADE"),
+                  nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("current_field", sa.String(), nullable=True),
+        sa.Column("loop_data", postgresql.JSONB(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_sessions_user_id", "sessions", ["user_id"])
+    op.create_index("ix_sessions_resume_id", "sessions", ["resume_id"])
+
+    # id — serial: 0002_partition_answers переиспользует answers_id_seq
+    op.create_table(
+        "answers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("session_id", sa.Integer(),
+                  sa.ForeignKey("sessions.id", ondelete="CASCADE"),
+                  nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("answer_raw", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_answers_session_id", "answers", ["session_id"])
+
+    op.create_table(
+        "question_templates",
+        sa.Column("field_name", sa.String(), primary_key=True),
+        sa.Column("label", sa.String(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("template", sa.String(), nullable=False),
+        sa.Column("inline_kb", sa.Boolean(), nullable=False),
+        sa.Column("multi_select", sa.Boolean(), nullable=False),
+        sa.Column("buttons", sa.JSON(), nullable=True),
+        sa.Column("destination", sa.String(), nullable=False),
+        sa.Column("group_id", sa.String(), nullable=True),
+        sa.Column("is_last", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_question_templates_priority",
+                    "question_templates", ["priority"])
+    op.create_index("ix_question_templates_group_id",
+                    "question_templates", ["group_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("question_templates")
+    op.drop_table("answers")
+    op.drop_table("sessions")
+    op.drop_table("resumes")
+    op.drop_table("users")
@@ -0,0 +1,76 @@
+"""dialog hot-path indexes
+
+Составные и частичные индексы под горячие запросы диалога:
+активное резюме пользователя (get_cv), незавершённый черновик
+(get_active_session), сессия по (user_id, resume_id) и последние
+сообщения сессии (get_conversation_history).
+
+Индексы строятся CONCURRENTLY и с IF NOT EXISTS, поэтому миграцию
+можно применять к уже работающей базе без долгих блокировок.
+
+Revision ID: 0001_dialog_hot_path_indexes
+Revises: 0000_initial_schema
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_dialog_hot_path_indexes"
+down_revision: Union[str, None] = "0000_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    dict(
+        index_name="ix_resumes_user_active_updated",
+        table_name="resumes",
+        columns=["user_id", sa.text("updated_at DESC")],
+        postgresql_where=sa.text("NOT is_archived"),
+    ),
+    dict(
+        index_name="ix_resumes_user_draft",
+        table_name="resumes",
+        columns=["user_id"],
+        postgresql_where=sa.text("NOT is_archived AND status = 'incomplete'"),
+    ),
+    dict(
+        index_name="ix_sessions_user_resume",
+        table_name="sessions",
+        columns=["user_id", "resume_id"],
+    ),
+    dict(
+        index_name="ix_answers_session_created",
+        table_name="answers",
+        columns=["session_id", sa.text("created_at DESC")],
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for spec in INDEXES:
+            op.create_index(
+                **spec,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for table in sorted({spec["table_name"] for spec in INDEXES}):
+            op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for spec in reversed(INDEXES):
+            op.drop_index(
+                spec["index_name"],
+                table_name=spec["table_name"],
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,117 @@
+"""partition answers by month
+
+answers превращается в таблицу, секционированную по RANGE (created_at)
+помесячно. Первичный ключ — (id, created_at), последовательность id
+сохраняется. Индекс (session_id, created_at DESC) создаётся на родителе
+и наследуется секциями; default-секция ловит строки вне диапазонов.
+Существующие строки переносятся, старая таблица удаляется.
+
+Revision ID: 0002_partition_answers
+Revises: 0001_dialog_hot_path_indexes
+Create Date: 2026-10-19 12:30:00
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_partition_answers"
+down_revision: Union[str, None] = "0001_dialog_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    op.execute("ALTER TABLE answers RENAME TO answers_legacy")
+    op.execute("ALTER INDEX IF EXISTS answers_pkey RENAME TO answers_legacy_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_answers_session_id")
+    op.execute("DROP INDEX IF EXISTS ix_answers_session_created")
+
+    op.execute(
+        """
+        CREATE TABLE answers (
+            id integer NOT NULL DEFAULT nextval('answers_id_seq'),
+            session_id integer NOT NULL
+                REFERENCES sessions (id) ON DELETE CASCADE,
+            role varchar NOT NULL,
+            answer_raw varchar NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT answers_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY answers.id")
+    op.execute(
+        "CREATE INDEX ix_answers_session_created "
+        "ON answers (session_id, created_at DESC)"
+    )
+
+    oldest = bind.execute(
+        sa.text("SELECT min(created_at) FROM answers_legacy")
+    ).scalar()
+    today = datetime.now(timezone.utc).date()
+    start = oldest.date() if oldest else today
+    month = date(start.year, start.month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE answers_y{month.year}m{month.month:02d} "
+            f"PARTITION OF answers FOR VALUES "
+            f"FROM ('{month.isoformat()}') "
+            f"TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE answers_default PARTITION OF answers DEFAULT")
+
+    op.execute(
+        "INSERT INTO answers (id, session_id, role, answer_raw, created_at) "
+        "SELECT id, session_id, role, answer_raw, created_at "
+        "FROM answers_legacy"
+    )
+    op.execute("DROP TABLE answers_legacy")
+    op.execute("ANALYZE answers")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE answers RENAME TO answers_partitioned")
+    op.execute("ALTER INDEX answers_pkey RENAME TO answers_partitioned_pkey")
+    op.execute("DROP INDEX ix_answers_session_created")
+    op.execute(
+        """
+        CREATE TABLE answers (
+            id integer NOT NULL DEFAULT nextval('answers_id_seq'),
+            session_id integer NOT NULL
+                REFERENCES sessions (id) ON DELETE CASCADE,
+            role varchar NOT NULL,
+            answer_raw varchar NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT answers_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO answers SELECT id, session_id, role, answer_raw, "
+        "created_at FROM answers_partitioned"
+    )
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY answers.id")
+    op.execute("DROP TABLE answers_partitioned")
+    op.execute("CREATE INDEX ix_answers_session_id ON answers (session_id)")
+    op.execute(
+        "CREATE INDEX ix_answers_session_created "
+        "ON answers (session_id, created_at DESC)"
+    )
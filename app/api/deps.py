@@ -4,8 +4,9 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from core.config import settings
-from db.session import get_db
+from db.session import SessionLocal, get_db, read_session, recent_writes
 from crud.user import get_user_by_tg_id
+from services.identity import user_ids
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/tg")
 
@@ -28,3 +29,20 @@ def get_current_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+
+def get_user_read_db(tg_id: int):
+    """
+    Сессия для чтений по tg_id: реплика, если пользователь недавно
+    ничего не писал (read-your-writes). Пользователь, которого реплика
+    ещё не видит, читается из primary.
+    """
+    db = read_session()
+    user_id = user_ids.get(db, tg_id)
+    if user_id is None or recent_writes.is_recent(user_id):
+        db.close()
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
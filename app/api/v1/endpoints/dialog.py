@@ -1,18 +1,19 @@
-from typing import Any, Union
+from typing import Any, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from crud.dialog import (
     continue_resume_flow,
     get_cv,
+    get_cv_etag,
     get_or_create_session,
     next_question,
     reset_resume_flow,
     save_answer,
 )
 from crud.user import get_user_by_tg_id
-from db.session import get_db
+from db.session import get_db, read_session
 from models.question_template import QuestionTemplate
 from schemas.dialog import (
     AnswerIn,
@@ -56,17 +57,33 @@ def _build_qo(
 )
 def dialog_next(
     payload: dict[str, Any],
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Выбирает этап диалога: новый вопрос,
     предпросмотр или готовое резюме.
+
+    Для готового и частичного резюме отдаёт ETag; при совпадении
+    If-None-Match отвечает 304 без отрисовки CV. Чтение CV идёт
+    через реплику (с окном read-your-writes).
     """
     user = get_user_by_tg_id(db, payload["user_id"])
     if not user:
         raise HTTPException(404, "User not found")
 
-    cv = get_cv(db, user.id)
+    with read_session(user.id) as read_db:
+        if if_none_match:
+            current = get_cv_etag(read_db, user.id)
+            if (current and current[0] in ("completed", "incomplete")
+                    and current[1] == if_none_match):
+                return Response(
+                    status_code=304, headers={"ETag": current[1]}
+                )
+        cv = get_cv(read_db, user.id)
+    if cv["status"] in ("completed", "incomplete"):
+        response.headers["ETag"] = cv["etag"]
 
     if cv["status"] == "completed":
         return CVOut(
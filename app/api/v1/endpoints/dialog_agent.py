@@ -2,8 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from schemas.agent import AgentRequest, AgentResponse
 from agent.llm_agent import get_assistant_response
-from crud.conversation_history import save_user_message, save_bot_message
+from crud.conversation_history import (
+    save_bot_message,
+    save_conversation_message,
+)
 from db.session import get_db
+from services.identity import resolve_identity
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,24 +20,27 @@ async def dialog_agent(request: AgentRequest, db: Session = Depends(get_db)):
     Возвращает ответ ассистента на произвольное сообщение пользователя.
     Сохраняет историю разговора в базу данных.
     """
+    identity = resolve_identity(db, request.user_id)
+    if identity is None:
+        raise HTTPException(404, "User not found")
+
     try:        
         logger.info(f"User {request.user_id} sent message: {request.message}")
-        answer = await get_assistant_response(
-            request.message, str(request.user_id), db
-        )
+        answer = await get_assistant_response(request.message, identity, db)
         
         if not answer:
             answer = "Извините, не удалось получить ответ."
             
-        session = save_user_message(
+        save_conversation_message(
             db=db,
-            tg_user_id=request.user_id,
+            session_id=identity.session_id,
+            role="human",
             message=request.message
         )
         
         save_bot_message(
             db=db,
-            session_id=session.id,
+            session_id=identity.session_id,
             message=answer
         )
         logger.info(f"Assistant answered to user {request.user_id}: {answer}")
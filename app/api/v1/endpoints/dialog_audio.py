@@ -1,7 +1,3 @@
-import io
-from typing import Final
-
-import aiohttp
 from fastapi import (
     APIRouter,
     File,
@@ -11,50 +7,27 @@ from fastapi import (
 )
 from pydantic import BaseModel
 
-from core.config import settings
+from services.asr import transcribe
+from services.speechkit import SpeechKitError
 
 router = APIRouter(prefix="/audio", tags=["Dialog Audio"])
 
-YANDEX_STT_URL: Final = (
-    "https://stt.api.cloud.yandex.net/speech/v1/stt:recognize"
-)
-ASR_TIMEOUT = aiohttp.ClientTimeout(total=120)
-
 
 class _TranscriptionResponse(BaseModel):
     text: str
 
 
-async def _recognize_with_yc(
+async def _recognize(
     audio_bytes: bytes,
 ) -> str:
-    """Отправляет запрос в Yandex SpeechKit и возвращает текст."""
-    params = {
-        "folderId": settings.YC_FOLDER_ID.get_secret_value(),
-        "lang": "ru-RU",
-        "format": "oggopus",
-        "model": settings.YC_MODEL_VERSION,
-    }
-    headers = {
-        "Authorization": f"Api-Key "
-        f"{settings.YC_API_KEY.get_secret_value()}",
-        "Content-Type": "application/octet-stream",
-    }
-
-    async with aiohttp.ClientSession(timeout=ASR_TIMEOUT) as session:
-        async with session.post(
-            YANDEX_STT_URL,
-            params=params,
-            data=io.BytesIO(audio_bytes),
-            headers=headers,
-        ) as resp:
-            data = await resp.json()
-            if resp.status != 200 or "error_code" in data:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"SpeechKit error: {data}",
-                )
-    return data.get("result", "")
+    """Распознаёт аудио (длинное — по фрагментам) и возвращает текст."""
+    try:
+        return await transcribe(audio_bytes)
+    except SpeechKitError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(exc),
+        ) from exc
 
 
 @router.post(
@@ -72,7 +45,7 @@ async def recognize_audio(
             detail="Empty file",
         )
 
-    text = await _recognize_with_yc(content)
+    text = await _recognize(content)
     if not text:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -2,7 +2,7 @@ import json
 import os
 import uuid
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import fitz  # PyMuPDF
 from fastapi import (
@@ -66,19 +66,22 @@ def extract_text_from_pdf(path: str) -> str:
             doc.close()
 
 
-async def extract_resume_data_with_llm(txt: str) -> BaseModel:
+async def extract_resume_data_with_llm(
+    txt: str
+) -> Tuple[BaseModel, Sequence[Dict[str, Any]]]:
     """
     Извлекает данные резюме из текста с помощью LLM.
+    Весь вызов работает с одним снимком модели, даже если шаблоны
+    вопросов поменяются по ходу. Возвращает результат и поля схемы
+    того же снимка.
     """
-    if not dynamic_resume_model_manager.initialized:
-        await dynamic_resume_model_manager.initialize_model()
-    if (not dynamic_resume_model_manager.initialized
-            or dynamic_resume_model_manager.model is None):
+    snapshot = await dynamic_resume_model_manager.current()
+    if snapshot is None:
         raise HTTPException(
             status_code=503,
             detail="Модель резюме не инициализирована"
         )
-    if not dynamic_resume_model_manager.resume_fields:
+    if not snapshot.resume_fields:
         logger.critical("Поля схемы пусты – LLM вызов отменён.")
         raise HTTPException(
             status_code=503,
@@ -94,9 +97,9 @@ async def extract_resume_data_with_llm(txt: str) -> BaseModel:
         prompt[:300].replace("\n", " ⏎ ")
     )
     try:
-        result = await dynamic_resume_model_manager.llm.ainvoke(prompt)
+        result = await snapshot.llm.ainvoke(prompt)
         logger.debug("LLM raw result: %s", result)
-        return result
+        return result, snapshot.resume_fields
     except Exception as exc:
         logger.error("Ошибка LLM: %s", exc, exc_info=True)
         raise HTTPException(
@@ -143,13 +146,15 @@ def merge_parsed_into_resume(
     return changed
 
 
-def collect_missing_fields(resume: Resume) -> List[str]:
+def collect_missing_fields(
+    resume: Resume,
+    resume_fields: Sequence[Dict[str, Any]]
+) -> List[str]:
     """
-    Составляет список отсутствующих полей резюме.
+    Составляет список отсутствующих полей резюме по полям схемы,
+    с которой его разбирала LLM.
     """
-    field_names = {
-        f["name"] for f in dynamic_resume_model_manager.resume_fields
-    }
+    field_names = {f["name"] for f in resume_fields}
     data = resume.data
     missing: List[str] = [
         name for name in field_names
@@ -198,7 +203,7 @@ async def process_pdf_resume(
         text = extract_text_from_pdf(tmp_path)
         logger.debug("Длина текста: %d", len(text))
 
-        llm_obj = await extract_resume_data_with_llm(text)
+        llm_obj, resume_fields = await extract_resume_data_with_llm(text)
         parsed = llm_obj.model_dump()
         logger.debug("Ключи распарсенного: %s", list(parsed.keys()))
 
@@ -227,7 +232,7 @@ async def process_pdf_resume(
         db.commit()
         db.refresh(resume)
 
-        missing = collect_missing_fields(resume)
+        missing = collect_missing_fields(resume, resume_fields)
         if not missing:
             resume.status = "completed"
             db.commit()
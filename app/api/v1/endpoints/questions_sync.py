@@ -1,56 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import Any, Dict
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+)
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from typing import List, Dict
 
 from core.config import settings
 from db.session import get_db
-from models.question_template import QuestionTemplate
+from models.question_sync import QuestionSync
+from services.questions_sync import enqueue_sync, run_sync
 
 router = APIRouter()
 
 
-def _read_sheet() -> List[Dict[str, str]]:
-    """Читает Google Sheets и возвращает список словарей по строкам."""
-    creds = Credentials.from_service_account_file(
-        settings.GSHEETS_CREDS_PATH,
-        scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"],
-    )
-    service = build("sheets", "v4", credentials=creds)
-    sheet = service.spreadsheets().values().get(
-        spreadsheetId=settings.GSHEETS_SHEET_ID,
-        range=settings.GSHEETS_FIRST_TAB,
-    ).execute()
-
-    values = sheet.get("values", [])
-    if not values:
-        raise RuntimeError("Пустой лист")
+def _job_out(job: QuestionSync) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "source": job.source,
+        "inserted": job.inserted,
+        "updated": job.updated,
+        "deleted": job.deleted,
+        "template_version": job.template_version,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
 
-    header = values[0]
-    rows = [dict(zip(header, r)) for r in values[1:] if any(r)]
-    return rows
 
-
-@router.post("/update-questions")
+@router.post("/update-questions", status_code=202)
 def update_questions(
+    background: BackgroundTasks,
     token: str = Body(..., embed=True),
     db: Session = Depends(get_db),
 ):
-    """Полностью пересоздаёт таблицу question_templates из Google Sheets."""
+    """
+    Запускает фоновую синхронизацию question_templates с источником
+    (Google Sheets или фикстура) и сразу возвращает id задачи.
+    Повторный вызов во время синхронизации вернёт ту же задачу.
+    """
     if token != settings.ADMIN_SYNC_TOKEN:
         raise HTTPException(403, detail="Forbidden")
 
-    try:
-        rows = _read_sheet()
-    except Exception as exc:
-        raise HTTPException(500, detail=f"Sheet read error: {exc}") from exc
-
-    db.execute(
-        text("TRUNCATE TABLE question_templates CASCADE")
-    )
-    objs = [QuestionTemplate.from_sheet_row(r) for r in rows]
-    db.bulk_save_objects(objs)
-    db.commit()
-    return {"status": "ok", "inserted": len(objs)}
+    job, created = enqueue_sync(db)
+    if created:
+        background.add_task(run_sync, job.id)
+    return _job_out(job)
+
+
+@router.get("/update-questions/{job_id}")
+def update_questions_status(
+    job_id: int,
+    x_admin_token: str = Header(...),
+    db: Session = Depends(get_db),
+):
+    """Статус и итог синхронизации вопросов."""
+    if x_admin_token != settings.ADMIN_SYNC_TOKEN:
+        raise HTTPException(403, detail="Forbidden")
+    job = db.get(QuestionSync, job_id)
+    if job is None:
+        raise HTTPException(404, detail="Sync job not found")
+    return _job_out(job)
@@ -9,6 +9,7 @@ from schemas.resume import (
     InsightListResponse,
 )
 from crud.resume import (
+    get_active_resume_for_user,
     get_or_create_active_resume,
     update_resume_field,
     append_resume_insight,
@@ -22,16 +23,29 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _read_active_resume(read_db: Session, db: Session, tg_id: int):
+    """
+    Active resume via the read session (replica); falls back to the
+    primary when it is not there yet and has to be created.
+    """
+    user = get_user_by_tg_id(db=read_db, tg_id=tg_id)
+    resume = user and get_active_resume_for_user(db=read_db, user_id=user.id)
+    if resume is None:
+        user = get_user_by_tg_id(db=db, tg_id=tg_id)
+        resume = get_or_create_active_resume(db=db, user_id=user.id)
+    return resume
+
+
 @router.get("/{tg_id}")
 async def get_resume(
     tg_id: int,
+    read_db: Session = Depends(deps.get_user_read_db),
     db: Session = Depends(deps.get_db),
 ):
     """
     Retrieve the user's active resume.
     """
-    current_user = get_user_by_tg_id(db=db, tg_id=tg_id)
-    resume = get_or_create_active_resume(db=db, user_id=current_user.id)
+    resume = _read_active_resume(read_db, db, tg_id)
     return resume.data
 
 
@@ -80,13 +94,13 @@ async def append_insight(
 @router.get("/{tg_id}/insight", response_model=InsightListResponse)
 async def list_insights(
     tg_id: int,
+    read_db: Session = Depends(deps.get_user_read_db),
     db: Session = Depends(deps.get_db),
 ):
     """
     List all insights for the user's active resume.
     """
-    user = get_user_by_tg_id(db=db, tg_id=tg_id)
-    resume = get_or_create_active_resume(db=db, user_id=user.id)
+    resume = _read_active_resume(read_db, db, tg_id)
 
-    insights = get_resume_insights(db=db, resume=resume)
+    insights = get_resume_insights(db=read_db, resume=resume)
     return InsightListResponse(tg_id=tg_id, insights=list(insights))
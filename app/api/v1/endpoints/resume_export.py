@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Iterator
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from core.config import settings
+from db.session import SessionLocal
+from services.resume_export import FORMATS, check_format, export_resumes
+
+router = APIRouter()
+
+
+def _stream(fmt: str, include_archived: bool) -> Iterator[bytes]:
+    """
+    Сессия живёт столько же, сколько поток: Starlette крутит
+    синхронный генератор в threadpool и закрывает его при обрыве.
+    """
+    db = SessionLocal()
+    try:
+        yield from export_resumes(db, fmt, include_archived)
+    finally:
+        db.close()
+
+
+@router.get("/resumes/export")
+def export_all_resumes(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    include_archived: bool = Query(True),
+    x_admin_token: str = Header(...),
+) -> StreamingResponse:
+    """
+    Выгрузка всех резюме с инсайтами и полями пользователя.
+    Ответ стримится пачками серверного курсора — память не растёт
+    с размером таблицы.
+    """
+    if x_admin_token != settings.ADMIN_SYNC_TOKEN:
+        raise HTTPException(403, detail="Forbidden")
+    try:
+        check_format(format)
+    except RuntimeError as exc:
+        raise HTTPException(501, detail=str(exc)) from exc
+
+    media_type, ext = FORMATS[format]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return StreamingResponse(
+        _stream(format, include_archived),
+        media_type=media_type,
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="resumes-{stamp}.{ext}"',
+        },
+    )
@@ -0,0 +1,275 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import uuid
+import zipfile
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from api.v1.endpoints.dialog_pdf import (
+    TEMP_UPLOAD_DIR,
+    extract_resume_data_with_llm,
+    extract_text_from_pdf,
+    merge_parsed_into_resume,
+)
+from core.config import settings
+from crud.resume import bulk_insert_resumes
+from crud.user import create, get_user_by_tg_id
+from db.session import SessionLocal
+from models.resume import Resume
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+PDF_CONTENT_TYPES = {"application/pdf"}
+ZIP_CONTENT_TYPES = {
+    "application/zip",
+    "application/x-zip-compressed",
+    "multipart/x-zip",
+}
+IMPORTED_STATUS = "imported"
+
+# (имя файла, функция чтения байтов) — читаем лениво, внутри воркера
+_PdfItem = Tuple[str, Callable[[], bytes]]
+
+
+def _is_zip(upload: UploadFile, raw: bytes) -> bool:
+    name = (upload.filename or "").lower()
+    return (
+        upload.content_type in ZIP_CONTENT_TYPES
+        or name.endswith(".zip")
+        or zipfile.is_zipfile(io.BytesIO(raw))
+    )
+
+
+def _is_pdf(upload: UploadFile) -> bool:
+    name = (upload.filename or "").lower()
+    return upload.content_type in PDF_CONTENT_TYPES or name.endswith(".pdf")
+
+
+def _too_large() -> bytes:
+    raise HTTPException(413, "Слишком большой файл")
+
+
+async def _read_upload(upload: UploadFile, limit: int) -> Optional[bytes]:
+    """
+    Байты загрузки или None, если она больше limit. Размер проверяется
+    до чтения, а читается не больше limit + 1 байт.
+    """
+    if upload.size is not None and upload.size > limit:
+        return None
+    raw = await upload.read(limit + 1)
+    return None if len(raw) > limit else raw
+
+
+def _zip_items(name: str, raw: bytes) -> List[_PdfItem]:
+    """
+    Возвращает PDF-файлы из архива; сами байты читаются по требованию.
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(raw))
+    except zipfile.BadZipFile as exc:
+        raise HTTPException(400, f"Повреждённый архив {name}") from exc
+
+    items: List[_PdfItem] = []
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+            continue
+        if info.file_size > settings.MAX_FILE_SIZE:
+            items.append((info.filename, _too_large))
+            continue
+        items.append(
+            (info.filename, lambda i=info: archive.read(i))
+        )
+    return items
+
+
+async def _collect_items(files: List[UploadFile]) -> List[_PdfItem]:
+    """
+    Разворачивает загруженные файлы и архивы в плоский список PDF.
+    """
+    items: List[_PdfItem] = []
+    for upload in files:
+        name = upload.filename or "file"
+        if _is_pdf(upload):
+            raw = await _read_upload(upload, settings.MAX_FILE_SIZE)
+            if raw is None:
+                items.append((name, _too_large))
+            elif raw:
+                items.append((name, lambda r=raw: r))
+            continue
+
+        raw = await _read_upload(upload, settings.BULK_IMPORT_MAX_ZIP_SIZE)
+        if raw is None:
+            raise HTTPException(413, f"Слишком большой архив: {name}")
+        if not raw:
+            continue
+        if _is_zip(upload, raw):
+            items.extend(_zip_items(name, raw))
+        else:
+            raise HTTPException(
+                400, f"Поддерживаются только PDF и ZIP: {name}"
+            )
+
+    if not items:
+        raise HTTPException(400, "Нет PDF-файлов для импорта")
+    if len(items) > settings.BULK_IMPORT_MAX_FILES:
+        raise HTTPException(
+            413,
+            f"Слишком много файлов: {len(items)} "
+            f"> {settings.BULK_IMPORT_MAX_FILES}",
+        )
+    return items
+
+
+def _parse_pdf_bytes(raw: bytes) -> str:
+    """
+    Извлекает текст из PDF через временный файл (как /dialog/pdf).
+    """
+    if len(raw) > settings.MAX_FILE_SIZE:
+        raise HTTPException(413, "Слишком большой файл")
+
+    tmp_path = os.path.join(TEMP_UPLOAD_DIR, f"{uuid.uuid4()}.pdf")
+    try:
+        with open(tmp_path, "wb") as buf:
+            buf.write(raw)
+        return extract_text_from_pdf(tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError as exc:
+                logger.error(
+                    "Не удалось удалить временный файл %s: %s",
+                    tmp_path,
+                    exc,
+                )
+
+
+async def _import_one(
+    name: str,
+    load: Callable[[], bytes],
+    owner_id: int,
+    sem: asyncio.Semaphore,
+) -> Tuple[str, Optional[Resume], Optional[str]]:
+    """
+    Прогоняет один PDF через извлечение текста и LLM.
+    Возвращает (имя, Resume | None, ошибка | None).
+    """
+    async with sem:
+        try:
+            text = await run_in_threadpool(
+                lambda: _parse_pdf_bytes(load())
+            )
+            llm_obj, _ = await extract_resume_data_with_llm(text)
+            resume = Resume(
+                user_id=owner_id,
+                status=IMPORTED_STATUS,
+                is_archived=True,
+                data={},
+            )
+            merge_parsed_into_resume(resume, llm_obj.model_dump())
+            resume.data["resume_pdf"] = name
+        except HTTPException as exc:
+            return name, None, str(exc.detail)
+        except Exception as exc:
+            logger.error("Импорт %s: %s", name, exc, exc_info=True)
+            return name, None, str(exc)
+    return name, resume, None
+
+
+def _line(payload: dict) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode()
+
+
+async def _import_stream(
+    items: List[_PdfItem],
+    owner_id: int,
+) -> AsyncIterator[bytes]:
+    """
+    Обрабатывает PDF с ограниченным параллелизмом, пишет Resume
+    пачками и отдаёт результат по каждому файлу строкой NDJSON.
+    """
+    sem = asyncio.Semaphore(settings.BULK_IMPORT_CONCURRENCY)
+    tasks = [
+        asyncio.create_task(_import_one(name, load, owner_id, sem))
+        for name, load in items
+    ]
+    pending: List[Tuple[str, Resume]] = []
+    db = SessionLocal()
+
+    def flush() -> List[bytes]:
+        # синхронная вставка — в пуле потоков, как и разбор PDF,
+        # чтобы не блокировать event loop на время INSERT
+        batch = [r for _, r in pending]
+        try:
+            ids = bulk_insert_resumes(db, batch)
+        except Exception as exc:
+            db.rollback()
+            logger.error("Ошибка пакетной вставки: %s", exc, exc_info=True)
+            lines = [
+                _line({"file": name, "status": "error", "detail": str(exc)})
+                for name, _ in pending
+            ]
+        else:
+            lines = [
+                _line({"file": name, "status": "ok", "resume_id": rid})
+                for (name, _), rid in zip(pending, ids)
+            ]
+        pending.clear()
+        return lines
+
+    try:
+        for fut in asyncio.as_completed(tasks):
+            name, resume, error = await fut
+            if error is not None:
+                yield _line({"file": name, "status": "error", "detail": error})
+                continue
+            pending.append((name, resume))
+            if len(pending) >= settings.BULK_IMPORT_BATCH_SIZE:
+                for line in await run_in_threadpool(flush):
+                    yield line
+        for line in await run_in_threadpool(flush):
+            yield line
+    finally:
+        for task in tasks:
+            task.cancel()
+        db.close()
+
+
+@router.post("/resumes/import")
+async def import_resumes(
+    token: str = Form(...),
+    tg_id: int = Form(...),
+    files: List[UploadFile] = File(...),
+) -> StreamingResponse:
+    """
+    Массовый импорт резюме из PDF-файлов и ZIP-архивов.
+
+    Резюме сохраняются архивными (status="imported") за пользователем
+    `tg_id` — рекрутером, загрузившим пачку, — и не попадают в его диалог.
+    Ответ — NDJSON, по строке на каждый файл.
+    """
+    if token != settings.ADMIN_SYNC_TOKEN:
+        raise HTTPException(403, detail="Forbidden")
+
+    items = await _collect_items(files)
+
+    db = SessionLocal()
+    try:
+        owner = get_user_by_tg_id(db, tg_id) or create(db, tg_id)
+        owner_id = owner.id
+    finally:
+        db.close()
+
+    logger.info("Импорт %d PDF для пользователя %s", len(items), tg_id)
+    return StreamingResponse(
+        _import_stream(items, owner_id),
+        media_type="application/x-ndjson",
+    )
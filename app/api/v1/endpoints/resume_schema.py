@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from db.session import get_db
+from db.session import get_read_db
 from services.schema_builder import build_resume_schema
 
 router = APIRouter()
 
 
 @router.get("/resume/schema", summary="Получить JSON-Schema резюме")
-def get_resume_schema(db: Session = Depends(get_db)) -> dict:
+def get_resume_schema(db: Session = Depends(get_read_db)) -> dict:
     """
     Возвращает актуальную JSON-схему резюме.
     """
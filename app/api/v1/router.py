@@ -9,6 +9,8 @@ from api.v1.endpoints import (
     questions_sync,
     resume_schema,
     resume,
+    resume_import,
+    resume_export,
     dialog_agent
 )
 
@@ -21,6 +23,8 @@ router.include_router(dialog_pdf.router, prefix="/dialog", tags=["Dialog PDF"])
 router.include_router(dialog_audio.router, prefix="/dialog",
                       tags=["Dialog Audio"])
 router.include_router(questions_sync.router, prefix="/admin", tags=["Admin"])
+router.include_router(resume_import.router, prefix="/admin", tags=["Admin"])
+router.include_router(resume_export.router, prefix="/admin", tags=["Admin"])
 router.include_router(resume_schema.router, tags=["Schema"])
 router.include_router(resume.router, prefix="/resume", tags=["Resume"])
 router.include_router(dialog_agent.router, tags=["Dialog Agent"])
@@ -0,0 +1,120 @@
+"""
+Время холодного импорта приложения по `python -X importtime`.
+
+Запускает импорт модуля (по умолчанию main — то же, что делает uvicorn
+при старте воркера) в отдельном процессе несколько раз, берёт лучший
+прогон и печатает самые тяжёлые пакеты. Заодно проверяет, что SDK
+LLM-провайдеров и Google API не импортируются при старте.
+
+Результат дописывается строкой JSON в --out, чтобы следить за
+стартом между релизами. Запуск из каталога app/ (нужны переменные
+окружения приложения):
+
+    python -m benchmarks.importtime --repeat 5 --out benchmarks/importtime.jsonl
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+ARTIFACT_VERSION = 1
+
+# пакеты, которые должны грузиться только при первом использовании
+FORBIDDEN_AT_STARTUP = (
+    "langchain_openai",
+    "langchain_google_genai",
+    "langchain_community",
+    "googleapiclient",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(module: str) -> Tuple[float, Dict[str, int], Dict[str, int]]:
+    """(секунды, cumulative по пакетам верхнего уровня, self по модулям)."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    cumulative: Dict[str, int] = {}
+    self_us: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        own, total, indent, name = match.groups()
+        self_us[name] = int(own)
+        if len(indent) == 1:  # импортирован напрямую, а не как зависимость
+            top = name.split(".")[0]
+            cumulative[top] = cumulative.get(top, 0) + int(total)
+    return elapsed, cumulative, self_us
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out", help="дописать результат (JSON Lines)")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.repeat)]
+    elapsed, cumulative, self_us = min(runs, key=lambda r: r[0])
+
+    total_ms = sum(self_us.values()) / 1000
+    print(f"import {args.module}: {elapsed * 1000:.0f} ms wall, "
+          f"{total_ms:.0f} ms in imports (best of {args.repeat})")
+    heaviest: List[Tuple[str, int]] = sorted(
+        cumulative.items(), key=lambda item: item[1], reverse=True
+    )[:args.top]
+    for name, us in heaviest:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+
+    loaded = {name.split(".")[0] for name in self_us}
+    leaked = sorted(set(FORBIDDEN_AT_STARTUP) & loaded)
+    for name in leaked:
+        print(f"  ✗ {name} импортируется при старте", file=sys.stderr)
+
+    if args.out:
+        record = {
+            "version": ARTIFACT_VERSION,
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": sys.version.split()[0],
+            "module": args.module,
+            "repeat": args.repeat,
+            "wall_ms": round(elapsed * 1000, 1),
+            "imports_ms": round(total_ms, 1),
+            "top": {name: round(us / 1000, 1) for name, us in heaviest},
+            "forbidden_loaded": leaked,
+        }
+        with open(args.out, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return 1 if leaked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,609 @@
+"""
+Нагрузочный прогон: одновременные пользователи Telegram против API.
+
+Каждый виртуальный пользователь повторяет то, что делает бот
+(utils/api_client): /auth/tg → согласие → /dialog/next → разговор с
+агентом, а дальше случайно по весам — реплики агенту, голосовые
+(/dialog/audio/ + агент), загрузка PDF, повторный /dialog/next с ETag и
+сброс диалога. Между действиями — «время на набор» (экспоненциальное).
+
+По умолчанию приложение поднимается в этом же процессе (ASGI без сети,
+настоящая БД), LLM и SpeechKit заменяются фейками с задержкой
+(llm_provider=fake, ASR_BACKEND=fake). С --url нагрузка идёт на уже
+запущенный сервер — его надо стартовать с теми же переменными
+LLM_PROVIDER=fake ASR_BACKEND=fake.
+
+Отчёт: пропускная способность, p50/p95/p99 по эндпоинтам, занятость пула
+SQLAlchemy (только in-process) и число соединений в pg_stat_activity.
+Результат дописывается строкой JSON в --out. Запуск из каталога app/:
+
+    python -m benchmarks.loadtest --users 50 --duration 120 --out benchmarks/loadtest.jsonl
+    python -m benchmarks.loadtest --url http://app:8000/api/v1 \\
+        --dsn postgresql://... --users 200
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import struct
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.ogg import OPUS_SAMPLE_RATE, OggPage
+
+ARTIFACT_VERSION = 1
+
+# tg_id виртуальных пользователей: отрицательные, как в test_explain_indexes,
+# чтобы не пересекаться с настоящими; свой диапазон на каждый прогон.
+# Диапазон случайный, а не от --seed: сервер с --url кэширует tg_id → id
+# пользователя (services.identity) и после cleanup, и повтор прогона с
+# теми же tg_id получил бы id уже удалённых пользователей
+TG_BASE = -2 * 10**12
+TG_SLOTS = 10**6
+
+# действие → вес при выборе следующего шага
+ACTIONS = {
+    "chat": 60,
+    "voice": 15,
+    "next": 12,
+    "pdf": 8,
+    "reset": 5,
+}
+
+ANSWERS = (
+    "Иван Петров",
+    "Москва, готов к переезду",
+    "Пять лет бэкенд-разработки на Python, последние два — тимлид",
+    "Postgres, FastAPI, Kafka, Kubernetes",
+    "МГТУ им. Баумана, прикладная математика, 2016",
+    "Хочу зарплату от 300 тысяч, удалёнка или гибрид",
+    "Английский B2, немецкий A2",
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Синтетические файлы
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """Одностраничный PDF с текстовым слоем (Helvetica, только ASCII)."""
+    stream = "BT /F1 11 Tf 72 770 Td 14 TL " + " ".join(
+        "({}) '".format(
+            line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        )
+        for line in lines
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return out
+
+
+RESUME_PDF = make_pdf([
+    "Ivan Petrov",
+    "Senior Python Developer, Moscow",
+    "Experience: 2019-2024 Acme Corp, backend team lead",
+    "2016-2019 Initech, Python developer",
+    "Skills: Python, FastAPI, PostgreSQL, Kafka, Kubernetes",
+    "Education: Bauman MSTU, applied mathematics, 2016",
+    "Languages: English B2",
+])
+
+
+def make_voice(seconds: float, rng: random.Random) -> bytes:
+    """
+    OggOpus из шума: заголовки настоящие, пакеты — случайные байты.
+    Фейковый ASR их не декодирует, а нарезка по гранулам
+    (split_oggopus) отрабатывает как на живом голосовом.
+    """
+    serial = rng.getrandbits(32)
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, OPUS_SAMPLE_RATE, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 8) + b"loadtest" + struct.pack("<I", 0)
+    pages = [
+        OggPage(0x02, 0, serial, bytes([len(head)]), head).encode(0, 0x02, 0),
+        OggPage(0, 0, serial, bytes([len(tags)]), tags).encode(1, 0, 0),
+    ]
+    # страница — секунда звука: 50 пакетов Opus по 20 мс (~24 кбит/с)
+    total = max(1, math.ceil(seconds))
+    granule = 0
+    for second in range(total):
+        granule += OPUS_SAMPLE_RATE
+        body = rng.randbytes(60 * 50)
+        flags = 0x04 if second == total - 1 else 0
+        page = OggPage(flags, granule, serial, bytes([60] * 50), body)
+        pages.append(page.encode(second + 2, flags, granule))
+    return b"".join(pages)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Статистика
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def add(self, seconds: float, status: str, ok: bool) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        values = sorted(self.latencies)
+        return {
+            "count": len(values),
+            "errors": self.errors,
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+@dataclass
+class Gauge:
+    samples: List[int] = field(default_factory=list)
+
+    def add(self, value: int) -> None:
+        self.samples.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"max": None, "avg": None}
+        return {
+            "max": max(self.samples),
+            "avg": round(sum(self.samples) / len(self.samples), 1),
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.flows_done = 0
+        self.flows_failed = 0
+
+    def add(self, name: str, seconds: float, status: str, ok: bool) -> None:
+        self.endpoints.setdefault(name, EndpointStats()).add(seconds, status, ok)
+
+    @property
+    def requests(self) -> int:
+        return sum(len(s.latencies) for s in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(s.errors for s in self.endpoints.values())
+
+
+class RequestFailed(Exception):
+    pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Виртуальный пользователь
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class VirtualUser:
+    """Один пользователь Telegram; вызовы — как у бота."""
+
+    def __init__(self, client, recorder: Recorder, tg_id: int,
+                 rng: random.Random, think: float):
+        self.client = client
+        self.recorder = recorder
+        self.tg_id = tg_id
+        self.rng = rng
+        self.think = think
+        self.etag: Optional[str] = None
+
+    async def call(self, name: str, method: str, path: str,
+                   **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, path, **kwargs)
+        except Exception as exc:  # noqa: BLE001
+            self.recorder.add(name, time.perf_counter() - started,
+                              f"exc:{type(exc).__name__}", False)
+            raise RequestFailed(name) from exc
+        elapsed = time.perf_counter() - started
+        ok = resp.is_success or resp.status_code == 304
+        self.recorder.add(name, elapsed, str(resp.status_code), ok)
+        if not ok:
+            raise RequestFailed(f"{name}: {resp.status_code}")
+        return resp
+
+    async def pause(self) -> None:
+        if self.think:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think))
+
+    # ── шаги ───────────────────────────────────────────────────────────
+
+    async def onboard(self) -> None:
+        await self.call("POST /auth/tg", "POST", "/auth/tg",
+                        json={"tg_id": self.tg_id})
+        await self.pause()
+        await self.call("POST /users/consent", "POST", "/users/consent",
+                        json={"tg_id": self.tg_id, "agree": True})
+        await self.dialog_next()
+        await self.ask("Начать заполнение резюме")
+
+    async def ask(self, text: str) -> None:
+        await self.call("POST /dialog/agent", "POST", "/dialog/agent",
+                        json={"user_id": self.tg_id, "message": text})
+
+    async def dialog_next(self) -> None:
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+        resp = await self.call("POST /dialog/next", "POST", "/dialog/next",
+                               json={"user_id": self.tg_id}, headers=headers)
+        if resp.status_code != 304:
+            self.etag = resp.headers.get("ETag")
+
+    async def chat(self) -> None:
+        await self.ask(self.rng.choice(ANSWERS))
+
+    async def voice(self) -> None:
+        audio = make_voice(self.rng.uniform(3, 40), self.rng)
+        resp = await self.call(
+            "POST /dialog/audio/", "POST", "/dialog/audio/",
+            files={"file": ("voice.ogg", audio, "application/octet-stream")},
+        )
+        await self.ask(resp.json().get("text") or "…")
+
+    async def pdf(self) -> None:
+        await self.call(
+            "POST /dialog/pdf", "POST", "/dialog/pdf",
+            data={"tg_id": str(self.tg_id)},
+            files={"file": ("resume.pdf", RESUME_PDF, "application/pdf")},
+        )
+
+    async def next(self) -> None:
+        await self.dialog_next()
+
+    async def reset(self) -> None:
+        await self.call("POST /dialog/reset", "POST", "/dialog/reset",
+                        json={"user_id": self.tg_id})
+        self.etag = None
+        await self.dialog_next()
+
+    async def run(self, deadline: float) -> None:
+        names = list(ACTIONS)
+        weights = list(ACTIONS.values())
+        try:
+            await self.onboard()
+        except RequestFailed:
+            self.recorder.flows_failed += 1
+            return
+        self.recorder.flows_done += 1
+        while time.monotonic() < deadline:
+            await self.pause()
+            if time.monotonic() >= deadline:
+                break
+            action = self.rng.choices(names, weights)[0]
+            try:
+                await getattr(self, action)()
+            except RequestFailed:
+                self.recorder.flows_failed += 1
+            else:
+                self.recorder.flows_done += 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Соединения с БД
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+_PG_ACTIVITY = """
+SELECT count(*),
+       count(*) FILTER (WHERE state = 'active'),
+       count(*) FILTER (WHERE state LIKE 'idle in transaction%')
+FROM pg_stat_activity
+WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+class DbSampler:
+    """
+    Раз в interval секунд снимает занятость пулов приложения
+    (in-process) и соединения к базе по pg_stat_activity (если есть DSN).
+    """
+
+    def __init__(self, dsn: Optional[str], pools: Dict[str, Any],
+                 interval: float):
+        self.dsn = dsn
+        self.pools = pools
+        self.interval = interval
+        self.checked_out = {name: Gauge() for name in pools}
+        self.pg_total = Gauge()
+        self.pg_active = Gauge()
+        self.pg_idle_in_tx = Gauge()
+        self._conn = None
+        self._stop = asyncio.Event()
+
+    def _open(self) -> None:
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        engine = create_engine(self.dsn, poolclass=NullPool)
+        self._conn = engine.connect()
+
+    def _pg_sample(self) -> Tuple[int, int, int]:
+        from sqlalchemy import text
+
+        row = self._conn.execute(text(_PG_ACTIVITY)).one()
+        self._conn.rollback()
+        return tuple(row)
+
+    async def run(self) -> None:
+        if self.dsn:
+            try:
+                await asyncio.to_thread(self._open)
+            except Exception as exc:  # noqa: BLE001
+                print(f"pg_stat_activity недоступен: {exc}", file=sys.stderr)
+                self.dsn = None
+        try:
+            while not self._stop.is_set():
+                await self._sample()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+
+    async def _sample(self) -> None:
+        for name, pool in self.pools.items():
+            self.checked_out[name].add(pool.checkedout())
+        if self._conn is not None:
+            # сам сэмплер в счёт не идёт (pid <> pg_backend_pid())
+            total, active, idle_tx = await asyncio.to_thread(self._pg_sample)
+            self.pg_total.add(total)
+            self.pg_active.add(active)
+            self.pg_idle_in_tx.add(idle_tx)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "pool_checked_out": {
+                name: {"size": self.pools[name].size(), **gauge.summary()}
+                for name, gauge in self.checked_out.items()
+            },
+            "pg_connections": self.pg_total.summary(),
+            "pg_active": self.pg_active.summary(),
+            "pg_idle_in_transaction": self.pg_idle_in_tx.summary(),
+        }
+
+
+def cleanup(dsn: str, tg_from: int, tg_to: int) -> int:
+    """Удаляет пользователей прогона (резюме и сессии — каскадом)."""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.pool import NullPool
+
+    engine = create_engine(dsn, poolclass=NullPool)
+    with engine.begin() as conn:
+        return conn.execute(
+            text("DELETE FROM users WHERE tg_id BETWEEN :lo AND :hi"),
+            {"lo": tg_from, "hi": tg_to},
+        ).rowcount
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Прогон
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _use_fake_backends(args: argparse.Namespace) -> None:
+    """До импорта приложения: settings читаются один раз при импорте."""
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["FAKE_LLM_JITTER"] = str(args.llm_jitter)
+    os.environ["ASR_BACKEND"] = "fake"
+    os.environ["ASR_FAKE_LATENCY"] = str(args.asr_latency)
+
+
+async def _open_client(args: argparse.Namespace, stack: AsyncExitStack
+                       ) -> Tuple[Any, Optional[str], Dict[str, Any]]:
+    """(httpx-клиент, DSN для pg_stat_activity, пулы для сэмплера)."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.users,
+                          max_keepalive_connections=args.users)
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits,
+                                   timeout=timeout)
+        return await stack.enter_async_context(client), args.dsn, {}
+
+    if not args.real_backends:
+        _use_fake_backends(args)
+    from core.config import settings
+    from db.session import DATABASE_URL, engine, replica_engine
+    from main import app
+
+    await stack.enter_async_context(app.router.lifespan_context(app))
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=f"http://loadtest{settings.API_V1_STR}",
+        limits=limits,
+        timeout=timeout,
+    )
+    pools = {"primary": engine.pool}
+    if replica_engine is not engine:
+        pools["replica"] = replica_engine.pool
+    return await stack.enter_async_context(client), args.dsn or DATABASE_URL, pools
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    tg_from = TG_BASE - uuid.uuid4().int % TG_SLOTS * 10**6
+    tg_ids = [tg_from - i for i in range(args.users)]
+
+    async with AsyncExitStack() as stack:
+        client, dsn, pools = await _open_client(args, stack)
+        sampler = DbSampler(dsn, pools, args.sample_interval)
+        sampler_task = asyncio.create_task(sampler.run())
+
+        started = time.monotonic()
+        deadline = started + args.ramp + args.duration
+
+        async def start_user(index: int, tg_id: int) -> None:
+            await asyncio.sleep(args.ramp * index / max(1, args.users))
+            user = VirtualUser(client, recorder, tg_id,
+                               random.Random(rng.random()), args.think)
+            await user.run(deadline)
+
+        await asyncio.gather(*(
+            start_user(i, tg_id) for i, tg_id in enumerate(tg_ids)
+        ))
+        elapsed = time.monotonic() - started
+
+        sampler.stop()
+        await sampler_task
+
+    removed = None
+    if dsn and not args.keep_users:
+        removed = await asyncio.to_thread(cleanup, dsn, tg_ids[-1], tg_ids[0])
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "python": sys.version.split()[0],
+        "target": args.url or "in-process",
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "ramp_s": args.ramp,
+            "think_s": args.think,
+            "seed": args.seed,
+            "tg_range": [tg_ids[-1], tg_ids[0]],
+            "actions": ACTIONS,
+            "llm": None if args.url or args.real_backends else {
+                "latency_s": args.llm_latency, "jitter_s": args.llm_jitter,
+            },
+            "asr_latency_s": None if args.url or args.real_backends
+            else args.asr_latency,
+        },
+        "elapsed_s": round(elapsed, 1),
+        "requests": recorder.requests,
+        "errors": recorder.errors,
+        "throughput_rps": round(recorder.requests / elapsed, 2),
+        "flows": {"done": recorder.flows_done, "failed": recorder.flows_failed},
+        "endpoints": {
+            name: stats.summary(elapsed)
+            for name, stats in sorted(recorder.endpoints.items())
+        },
+        "db": sampler.summary(),
+        "users_removed": removed,
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(result: Dict[str, Any], out: Callable[[str], None] = print) -> None:
+    out(f"{result['target']}: {result['config']['users']} users, "
+        f"{result['elapsed_s']} s, {result['requests']} requests "
+        f"({result['errors']} errors), {result['throughput_rps']} req/s")
+    out(f"  {'endpoint':<24}{'count':>7}{'err':>5}{'rps':>8}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, s in result["endpoints"].items():
+        out(f"  {name:<24}{s['count']:>7}{s['errors']:>5}{s['rps']:>8}"
+            f"{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}")
+    db = result["db"]
+    for name, pool in db["pool_checked_out"].items():
+        out(f"  pool {name}: checked out max {pool['max']}, "
+            f"avg {pool['avg']} (size {pool['size']})")
+    if db["pg_connections"]["max"] is not None:
+        out(f"  pg_stat_activity: max {db['pg_connections']['max']}, "
+            f"avg {db['pg_connections']['avg']}; "
+            f"idle in transaction max {db['pg_idle_in_transaction']['max']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20,
+                        help="одновременных пользователей")
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="секунд нагрузки после разгона")
+    parser.add_argument("--ramp", type=float, default=10.0,
+                        help="секунд на подключение всех пользователей")
+    parser.add_argument("--think", type=float, default=3.0,
+                        help="среднее время на ответ пользователя, с")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--url", help="базовый URL API (…/api/v1); "
+                                      "по умолчанию — in-process")
+    parser.add_argument("--dsn", help="Postgres для pg_stat_activity и "
+                                      "очистки (in-process — из настроек)")
+    parser.add_argument("--real-backends", action="store_true",
+                        help="in-process с настоящими LLM и SpeechKit")
+    parser.add_argument("--llm-latency", type=float, default=1.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.5)
+    parser.add_argument("--asr-latency", type=float, default=0.8,
+                        help="секунд на фрагмент распознавания")
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--keep-users", action="store_true",
+                        help="не удалять созданных пользователей")
+    parser.add_argument("--out", help="дописать результат (JSON Lines)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report(result)
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
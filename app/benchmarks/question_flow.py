@@ -0,0 +1,115 @@
+"""
+Бенчмарк выбора следующего вопроса: прежний проход по шаблонам
+против скомпилированного QuestionFlow.
+
+Запуск из каталога app/:
+
+    python -m benchmarks.question_flow --templates 60 --resumes 2000
+
+БД не нужна: шаблоны и резюме генерируются в памяти, прежний алгоритм
+воспроизведён без SQL-запросов (т.е. сравнение в его пользу).
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from services.question_flow import QuestionFlow
+
+
+def make_templates(count: int, group_size: int = 6) -> List[SimpleNamespace]:
+    """Плоские поля + одна повторяемая группа work_experience с intro."""
+    rows = []
+    flat = max(count - group_size - 1, 1)
+    for i in range(flat):
+        rows.append(SimpleNamespace(
+            field_name=f"field_{i}", label=f"Поле {i}", priority=i * 10,
+            template=f"Вопрос {i}?", inline_kb=False, multi_select=False,
+            buttons=None, destination="resume", group_id=None, is_last=False,
+        ))
+    base = flat * 10
+    gid = "work_experience"
+    group = ["work_experience_intro", "exp_company", "exp_position"]
+    group += [f"exp_extra_{i}" for i in range(group_size - 2)]
+    for j, name in enumerate(group):
+        rows.append(SimpleNamespace(
+            field_name=name, label=name, priority=base + j,
+            template=f"{name}?", inline_kb=False, multi_select=False,
+            buttons=None, destination=gid, group_id=gid,
+            is_last=j == len(group) - 1,
+        ))
+    random.shuffle(rows)
+    return rows
+
+
+def make_resume(templates: List[SimpleNamespace]) -> Dict[str, Any]:
+    flat = [t.field_name for t in templates if not t.group_id]
+    filled = random.randint(0, len(flat))
+    data: Dict[str, Any] = {
+        name: "значение" for name in random.sample(flat, filled)
+    }
+    if filled == len(flat) and random.random() < 0.5:
+        data["work_experience"] = [{"exp_company": "A", "exp_position": "B"}]
+        data["work_experience_ok"] = True
+    return data
+
+
+def legacy_next(
+    templates: List[SimpleNamespace], data: Dict[str, Any]
+) -> Optional[str]:
+    """Прежний crud.dialog.next_question: сортировка + проход по всем."""
+    filled = {k for k, v in data.items() if v not in (None, "", [], {})}
+    for q in sorted(templates, key=lambda t: t.priority):
+        if q.group_id and data.get(f"{q.group_id}_ok"):
+            continue
+        if q.group_id and q.field_name.endswith("_intro"):
+            return q.field_name
+        if q.field_name in filled:
+            continue
+        return q.field_name
+    return None
+
+
+def _timeit(fn, resumes: List[Dict[str, Any]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for data in resumes:
+            fn(data)
+        best = min(best, time.perf_counter() - started)
+    return best / len(resumes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--templates", type=int, default=60)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    templates = make_templates(args.templates)
+    resumes = [make_resume(templates) for _ in range(args.resumes)]
+
+    started = time.perf_counter()
+    flow = QuestionFlow.compile(templates)
+    compile_time = time.perf_counter() - started
+
+    for data in resumes:
+        assert legacy_next(templates, data) == flow.next_field(data), data
+
+    legacy = _timeit(lambda d: legacy_next(templates, d), resumes,
+                     args.repeat)
+    compiled = _timeit(flow.next_field, resumes, args.repeat)
+
+    print(f"templates={len(templates)} resumes={len(resumes)}")
+    print(f"compile:  {compile_time * 1e3:8.2f} ms (один раз на версию)")
+    print(f"legacy:   {legacy * 1e6:8.2f} µs/вызов")
+    print(f"compiled: {compiled * 1e6:8.2f} µs/вызов "
+          f"(x{legacy / compiled:.1f})")
+
+
+if __name__ == "__main__":
+    main()
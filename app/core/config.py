@@ -16,6 +16,11 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_HOST: str = "postgres"
     POSTGRES_PORT: int = 5432
+    # Реплика для чтения; пусто — все запросы идут в primary
+    POSTGRES_REPLICA_HOST: str | None = None
+    POSTGRES_REPLICA_PORT: int = 5432
+    # после записи чтения пользователя идут в primary столько секунд
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
 
     # JWT
     SECRET_KEY: str = "CHANGE_ME"
@@ -28,6 +33,28 @@ class Settings(BaseSettings):
     TEMP_UPLOAD_DIR: str = "temp_uploads_pdf"
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5 MB
 
+    # Bulk import (HR batches)
+    BULK_IMPORT_CONCURRENCY: int = 4        # одновременных PDF → LLM
+    BULK_IMPORT_BATCH_SIZE: int = 50        # строк Resume на один INSERT
+    BULK_IMPORT_MAX_FILES: int = 500        # PDF в одном запросе
+    BULK_IMPORT_MAX_ZIP_SIZE: int = 100 * 1024 * 1024  # 100 MB на архив
+
+    # Кэш отрисованных резюме (get_cv)
+    CV_CACHE_SIZE: int = 4096
+
+    # История диалога (answers): секции и архив
+    ANSWERS_PARTITIONS_AHEAD: int = 2       # месяцев вперёд
+    ANSWERS_RETENTION_MONTHS: int = 12      # сколько месяцев держать в БД
+    ANSWERS_ARCHIVE_DIR: str = "archive/answers"
+    ANSWERS_ARCHIVE_LEVEL: int = 10         # уровень zstd
+
+    # Выгрузка резюме (/admin/resumes/export)
+    RESUME_EXPORT_BATCH_SIZE: int = 1000    # строк на fetch серверного курсора
+
+    # tg_id → users.id
+    USER_ID_CACHE_TTL: float = 600.0
+    USER_ID_CACHE_SIZE: int = 10000
+
     # LLM
     llm_provider: str = "google"
     llm_model_name: str = "gemini-2.5-flash-preview-05-20"
@@ -36,21 +63,52 @@ class Settings(BaseSettings):
     temperature: float = 0.25
     top_p: float = 0.9
     openai_proxy: str | None = None
+    # llm_provider="fake" — нагрузочные прогоны (benchmarks/loadtest.py)
+    FAKE_LLM_LATENCY: float = 1.5       # секунд на ответ
+    FAKE_LLM_JITTER: float = 0.5        # ± равномерный разброс
 
     # Yandex
     YC_API_KEY: SecretStr
     YC_FOLDER_ID: SecretStr
     YC_MODEL_VERSION: str = "latest"
+    YC_STT_URL: str = (
+        "https://stt.api.cloud.yandex.net/speech/v1/stt:recognize"
+    )
+    YC_STT_POOL_SIZE: int = 20          # соединений в пуле
+    YC_STT_KEEPALIVE: float = 60.0      # секунд держим idle-соединение
+    YC_STT_TIMEOUT: float = 120.0
+    YC_STT_RETRIES: int = 3             # повторов на 5xx / обрыв связи
+    YC_STT_BACKOFF: float = 0.5         # базовая задержка, удваивается
+
+    # ASR
+    ASR_BACKEND: str = "yandex"             # "yandex" | "fake"
+    ASR_FAKE_LATENCY: float = 0.0
+    ASR_CHUNK_SECONDS: float = 25.0         # stt:recognize ≤ 30 с
+    ASR_CHUNK_MAX_BYTES: int = 1000 * 1000  # stt:recognize ≤ 1 МБ
+    ASR_CONCURRENCY: int = 4
 
     # Google Sheets
     GSHEETS_CREDS_PATH: str = "creds.json"          # путь к creds.json
     GSHEETS_SHEET_ID: str                               # ID таблицы
     GSHEETS_FIRST_TAB: str = "Sheet1"                   # имя вкладки
     ADMIN_SYNC_TOKEN: str                               # секрет
+    # откуда синхронизировать вопросы: "gsheets" или путь к .csv / .json
+    QUESTIONS_SOURCE: str = "gsheets"
+    QUESTIONS_SYNC_TIMEOUT: int = 600                   # секунд на задачу
 
     # API
     APP_URL: str = "http://app:8000"
 
+    # Gunicorn (gunicorn.conf.py)
+    WEB_WORKERS: int = 0                # 0 — по числу CPU
+    WEB_TIMEOUT: int = 300              # зависший воркер перезапускается
+    WEB_GRACEFUL_TIMEOUT: int = 120     # дождаться LLM-вызовов при остановке
+    WEB_PRELOAD: bool = True            # шаблоны/модель грузятся до fork
+
+    # Сброс кэшей воркеров через Postgres LISTEN/NOTIFY
+    CACHE_BUS_ENABLED: bool = True
+    CACHE_BUS_CHANNEL: str = "app_cache"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
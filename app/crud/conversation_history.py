@@ -36,6 +36,15 @@ def save_conversation_message(
     return answer
 
 
+def _history_query(db: Session, session_id: int, limit: int):
+    return (
+        db.query(Answer)
+        .filter(Answer.session_id == session_id)
+        .order_by(Answer.created_at.desc())
+        .limit(limit)
+    )
+
+
 def get_conversation_history(
     db: Session,
     session_id: int,
@@ -52,13 +61,7 @@ def get_conversation_history(
     Returns:
         Список сообщений в формате [{"role": str, "content": str, "timestamp": datetime}, ...]
     """
-    answers = (
-        db.query(Answer)
-        .filter(Answer.session_id == session_id)
-        .order_by(Answer.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+    answers = _history_query(db, session_id, limit).all()
     
     return [
         {
@@ -11,6 +11,9 @@ from models.question_template import QuestionTemplate
 from models.resume import Resume
 from models.session import Session as DSession
 from models.user import User
+from crud.resume import append_resume_list_item, patch_resume_data
+from services.cv_cache import cv_cache, cv_etag, cv_key
+from services.question_flow import REQUIRED_FIELDS, QuestionFlow, question_flow
 
 logger = logging.getLogger(__name__)
 if not logger.handlers:
@@ -21,11 +24,6 @@ if not logger.handlers:
     handler.setFormatter(logging.Formatter(fmt))
     logger.addHandler(handler)
 
-REQUIRED_FIELDS: Dict[str, set] = {
-    "work_experience": {"exp_company", "exp_position"},
-}
-
-
 def session_has_answers(db: Session, session_id: int) -> bool:
     """
     Проверяет, есть ли в сессии ответы пользователя.
@@ -42,24 +40,7 @@ def session_has_answers(db: Session, session_id: int) -> bool:
     return count > 0
 
 
-def _group_is_complete(data: Dict[str, Any], gid: str) -> bool:
-    """
-    Проверяет, заполнены ли обязательные поля группы gid.
-    """
-    items = data.get(gid, [])
-    if not items:
-        return False
-    required = REQUIRED_FIELDS.get(gid, set())
-    return all(
-        all(item.get(field) for field in required)
-        for item in items
-    )
-
-
-def get_active_session(db: Session, user_id: int) -> Optional[DSession]:
-    """
-    Возвращает активную сессию пользователя или None.
-    """
+def _active_session_query(db: Session, user_id: int):
     return (
         db.query(DSession)
         .join(Resume, DSession.resume_id == Resume.id)
@@ -68,51 +49,14 @@ def get_active_session(db: Session, user_id: int) -> Optional[DSession]:
             Resume.is_archived.is_(False),
             Resume.status == "incomplete",
         )
-        .first()
     )
 
 
-def _first_group_question(db: Session, gid: str) -> QuestionTemplate:
+def get_active_session(db: Session, user_id: int) -> Optional[DSession]:
     """
-    Возвращает первый вопрос группы без суффикса _intro.
+    Возвращает активную сессию пользователя или None.
     """
-    return (
-        db.query(QuestionTemplate)
-        .filter(
-            QuestionTemplate.group_id == gid,
-            QuestionTemplate.is_last.is_(False),
-            ~QuestionTemplate.field_name.like("%_intro"),
-        )
-        .order_by(QuestionTemplate.priority)
-        .first()
-    )
-
-
-def _next_group_question(
-    db: Session, gid: str, priority: int
-) -> Optional[QuestionTemplate]:
-    """Возвращает следующий по приоритету вопрос группы."""
-    return (
-        db.query(QuestionTemplate)
-        .filter(
-            QuestionTemplate.group_id == gid,
-            QuestionTemplate.priority > priority,
-        )
-        .order_by(QuestionTemplate.priority)
-        .first()
-    )
-
-
-def _intro_question(db: Session, gid: str) -> QuestionTemplate:
-    """Возвращает вводный вопрос группы gid."""
-    return (
-        db.query(QuestionTemplate)
-        .filter(
-            QuestionTemplate.group_id == gid,
-            QuestionTemplate.field_name.like("%_intro"),
-        )
-        .first()
-    )
+    return _active_session_query(db, user_id).first()
 
 
 def _work_item_summary(item: dict, idx: int, labels: dict) -> str:
@@ -185,14 +129,15 @@ def _work_summary(items: list, labels: dict) -> str:
 
 
 def _build_intro_reply(
-    base: QuestionTemplate,
+    base: SimpleNamespace,
     work: List[Dict[str, str]],
     add_error: Optional[str] = None,
+    labels: Optional[Dict[str, str]] = None,
 ) -> SimpleNamespace:
     """
     Создает объект ответа для вводного вопроса опыта работы.
     """
-    summary = _work_summary(work)
+    summary = _work_summary(work, labels or {})
     text = base.template
     if summary:
         text += f"\n\n<b>Вы ответили:</b>\n{summary}"
@@ -266,46 +211,34 @@ def get_question_by_field_name(
 
 def next_question(
     db: Session, sess: DSession
-) -> Optional[QuestionTemplate]:
+) -> Optional[SimpleNamespace]:
     """
     Определяет следующий вопрос по данным сессии.
+
+    Возвращает копию шаблона из скомпилированного QuestionFlow.
     """
+    flow = question_flow.get(db)
     data = sess.resume.data
-    updated = False
-    for gid in REQUIRED_FIELDS:
-        if _group_is_complete(data, gid) and not data.get(f"{gid}_ok"):
-            data[f"{gid}_ok"] = True
-            updated = True
-    if updated:
-        flag_modified(sess.resume, "data")
-        db.flush()
+    completed = {
+        f"{gid}_ok": True
+        for gid in REQUIRED_FIELDS
+        if flow.group_is_complete(data, gid) and not data.get(f"{gid}_ok")
+    }
+    if completed:
+        patch_resume_data(db, sess.resume, completed)
 
     if sess.loop_data:
-        gid = sess.loop_data["group"]
-        curr = db.get(QuestionTemplate, sess.current_field)
-        nxt = _next_group_question(db, gid, curr.priority)
+        nxt = flow.node(flow.next_group_field(sess.current_field))
         if nxt:
             sess.current_field = nxt.field_name
             db.flush()
         return nxt
 
-    filled = {
-        k for k, v in data.items() if v not in (None, "", [], {})
-    }
-    for q in db.query(QuestionTemplate).order_by(
-        QuestionTemplate.priority
-    ):
-        if q.group_id and data.get(f"{q.group_id}_ok"):
-            continue
-        if q.group_id and q.field_name.endswith("_intro"):
-            sess.current_field = q.field_name
-            db.flush()
-            return q
-        if q.field_name in filled:
-            continue
-        sess.current_field = q.field_name
+    nxt = flow.node(flow.next_field(data))
+    if nxt is not None:
+        sess.current_field = nxt.field_name
         db.flush()
-        return q
+        return nxt
 
     sess.state = "CONFIRM"
     db.flush()
@@ -318,7 +251,7 @@ def save_answer(
     user_id: int,
     field_name: str,
     answer_raw: str,
-) -> Optional[QuestionTemplate]:
+) -> Optional[SimpleNamespace]:
     """
     Сохраняет ответ, обновляет данные и возвращает следующий вопрос.
     Также сохраняет в историю разговора.
@@ -326,7 +259,8 @@ def save_answer(
     sess = db.get(DSession, session_id)
     resume = sess.resume
     user = db.get(User, user_id)
-    tmpl = db.get(QuestionTemplate, field_name)
+    flow = question_flow.get(db)
+    tmpl = flow.node(field_name)
 
     logger.debug(
         "save_answer(sess=%s field=%s) answer=%r",
@@ -346,8 +280,7 @@ def save_answer(
 
     if tmpl.group_id is None:
         _store_user_field(user, field_name, answer_raw)
-        resume.data[field_name] = answer_raw
-        flag_modified(resume, "data")
+        patch_resume_data(db, resume, {field_name: answer_raw})
         nxt = next_question(db, sess)
         if nxt is None:
             resume.status = "completed"
@@ -355,16 +288,17 @@ def save_answer(
         return nxt
 
     if field_name.endswith("_intro"):
-        return _handle_intro(db, sess, tmpl, answer_raw)
-    return _handle_group_flow(db, sess, tmpl, answer_raw)
+        return _handle_intro(db, flow, sess, tmpl, answer_raw)
+    return _handle_group_flow(db, flow, sess, tmpl, answer_raw)
 
 
 def _handle_intro(
     db: Session,
+    flow: QuestionFlow,
     sess: DSession,
-    tmpl: QuestionTemplate,
+    tmpl: SimpleNamespace,
     answer: str,
-) -> QuestionTemplate:
+) -> SimpleNamespace:
     """
     Обрабатывает ввод на этапе intro: создание/сброс/
     подтверждение записи в группе.
@@ -375,16 +309,16 @@ def _handle_intro(
     if answer.startswith("+"):
         sess.loop_data = {"group": gid, "item": {}}
         flag_modified(sess, "loop_data")
-        first_q = _first_group_question(db, gid)
+        first_q = flow.node(flow.group_entry[gid])
         sess.current_field = first_q.field_name
         db.commit()
         logger.debug("loop_data после '+': %s", sess.loop_data)
         return first_q
 
     if answer.startswith("Ответить"):
-        data[gid] = []
-        data.pop(f"{gid}_ok", None)
-        flag_modified(sess.resume, "data")
+        patch_resume_data(
+            db, sess.resume, {gid: []}, remove_fields=[f"{gid}_ok"]
+        )
         sess.loop_data = None
         db.commit()
         return next_question(db, sess)
@@ -392,12 +326,12 @@ def _handle_intro(
     if answer == "Подтвердить":
         if not data.get(gid):
             return _build_intro_reply(
-                _intro_question(db, gid),
+                flow.node(flow.intro[gid]),
                 data.get(gid, []),
                 add_error="\n\n⚠️ Сначала добавьте запись.",
+                labels=flow.labels,
             )
-        data[f"{gid}_ok"] = True
-        flag_modified(sess.resume, "data")
+        patch_resume_data(db, sess.resume, {f"{gid}_ok": True})
         nxt = next_question(db, sess)
         if nxt is None:
             sess.resume.status = "completed"
@@ -406,18 +340,20 @@ def _handle_intro(
 
     # некорректный ввод
     return _build_intro_reply(
-        _intro_question(db, gid),
+        flow.node(flow.intro[gid]),
         data.get(gid, []),
         add_error="\n\n⚠️ Используйте кнопки ниже.",
+        labels=flow.labels,
     )
 
 
 def _handle_group_flow(
     db: Session,
+    flow: QuestionFlow,
     sess: DSession,
-    tmpl: QuestionTemplate,
+    tmpl: SimpleNamespace,
     answer: str,
-) -> QuestionTemplate:
+) -> Optional[SimpleNamespace]:
     """
     Обрабатывает ввод внутри группы: сбор полей, валидацию
     и сохранение в данные резюме.
@@ -433,57 +369,45 @@ def _handle_group_flow(
     logger.debug("loop_data после commit: %s", sess.loop_data)
 
     if not tmpl.is_last:
-        nxt = _next_group_question(db, gid, tmpl.priority)
+        nxt = flow.node(flow.next_group_field(tmpl.field_name))
         sess.current_field = nxt.field_name
         db.commit()
         return nxt
 
     # проверка обязательных полей
-    miss = [
-        f for f in REQUIRED_FIELDS.get(gid, set())
-        if not item.get(f)
-    ]
+    miss = flow.missing_required(gid, item)
     if miss:
-        intro = _intro_question(db, gid)
+        intro = flow.node(flow.intro[gid])
         intro.template += "\n⚠️ Заполните обязательные поля."
         sess.current_field = intro.field_name
         db.commit()
         return intro
 
     # сохраняем запись в resume.data
+    count = append_resume_list_item(db, sess.resume, gid, item)
+    if count is None:
+        # резюме удалили параллельно (сессия ушла каскадом) —
+        # отвечаем текущим состоянием, как после завершения
+        resume_id = sess.resume_id  # после rollback объект не прочитать
+        db.rollback()
+        logger.warning("Резюме %s удалено во время диалога", resume_id)
+        return None
     work = sess.resume.data.get(gid, [])
-    work.append(item)
-    sess.resume.data[gid] = work
-    flag_modified(sess.resume, "data")
     sess.loop_data = None
     db.commit()
-    logger.debug("work_experience теперь %s записей", len(work))
+    logger.debug("work_experience теперь %s записей", count)
 
-    intro_base = _intro_question(db, gid)
-    reply = _build_intro_reply(intro_base, work)
+    intro_base = flow.node(flow.intro[gid])
+    reply = _build_intro_reply(intro_base, work, labels=flow.labels)
     sess.current_field = reply.field_name
     db.commit()
     return reply
 
 
-def get_cv(db: Session, user_id: int) -> Dict[str, Any]:
-    resume = (
-        db.query(Resume)
-        .filter_by(user_id=user_id, is_archived=False)
-        .order_by(Resume.updated_at.desc())
-        .first()
-    )
-    if not resume:
-        return {
-            "status": "not_started",
-            "cv_markdown": "Резюме ещё не начинали заполнять.",
-            "fields": {},
-        }
-
-    templates = list(db.query(QuestionTemplate).all())
-    labels = {qt.field_name: qt.label for qt in templates}
-    priorities = {qt.field_name: qt.priority for qt in templates}
-    data = resume.data
+def _render_cv(data: Dict[str, Any], flow: QuestionFlow) -> str:
+    """Отрисовывает cv_markdown по данным резюме."""
+    labels = flow.labels
+    priorities = flow.priorities
     lines: list[str] = ["📄 <b>Ваше резюме</b>\n"]
 
     # Базовые поля (без work_experience)
@@ -507,11 +431,55 @@ def get_cv(db: Session, user_id: int) -> Dict[str, Any]:
             lines.append("\n• <b>Опыт работы:</b>")
             lines.append(summary)
 
+    return "\n".join(lines)
+
+
+def _current_resume_query(db: Session, user_id: int):
+    return (
+        db.query(Resume)
+        .filter_by(user_id=user_id, is_archived=False)
+        .order_by(Resume.updated_at.desc())
+    )
+
+
+def get_cv_etag(db: Session, user_id: int) -> Optional[Tuple[str, str]]:
+    """
+    (status, ETag) текущего резюме без загрузки его данных —
+    для условного /dialog/next.
+    """
+    row = (
+        _current_resume_query(db, user_id)
+        .with_entities(Resume.id, Resume.status, Resume.updated_at)
+        .first()
+    )
+    if not row:
+        return None
+    key = cv_key(row.updated_at, question_flow.get(db).version)
+    return row.status, cv_etag(row.id, key)
+
+
+def get_cv(db: Session, user_id: int) -> Dict[str, Any]:
+    resume = _current_resume_query(db, user_id).first()
+    if not resume:
+        return {
+            "status": "not_started",
+            "cv_markdown": "Резюме ещё не начинали заполнять.",
+            "fields": {},
+        }
+
+    flow = question_flow.get(db)
+    key = cv_key(resume.updated_at, flow.version)
+    cv_markdown = cv_cache.get(resume.id, key)
+    if cv_markdown is None:
+        cv_markdown = _render_cv(resume.data, flow)
+        cv_cache.set(resume.id, key, cv_markdown)
+
     return {
         "status": resume.status,
-        "cv_markdown": "\n".join(lines),
-        "fields": data,
+        "cv_markdown": cv_markdown,
+        "fields": resume.data,
         "resume_id": resume.id,
+        "etag": cv_etag(resume.id, key),
     }
 
 
@@ -1,9 +1,13 @@
-from typing import Optional, Any, Iterable
+from typing import Optional, Any, Callable, Dict, Iterable, List, Union
 
+from sqlalchemy import ARRAY, Text, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.attributes import set_committed_value
 
+from db.session import note_write
 from models.resume import Resume
+from services.cv_cache import cv_cache
 
 
 def get_active_resume_for_user(db: Session, user_id: int) -> Optional[Resume]:
@@ -37,19 +41,185 @@ def get_or_create_active_resume(db: Session, user_id: int) -> Resume:
     return resume
 
 
+# ---------------------------------------------------------------------------
+# Partial JSONB updates
+#
+# Each helper issues one UPDATE that touches only the changed key / list
+# item (jsonb_set, ||, -, #-) instead of sending the whole document back,
+# and returns just updated_at (plus what the caller needs). The already
+# loaded Resume.data is patched in place and its history reset, so the
+# ORM does not rewrite the column on the next flush. A bare resume id
+# may be passed instead of the object when nothing is loaded. Helpers
+# do not commit.
+# ---------------------------------------------------------------------------
+
+def _path(*parts: Any):
+    return literal([str(p) for p in parts], ARRAY(Text))
+
+
+def _jsonb(value: Any):
+    return literal(value, JSONB)
+
+
+ResumeRef = Union[Resume, int]
+
+
+def _execute_patch(
+    db: Session,
+    resume: ResumeRef,
+    data_expr,
+    apply: Callable[[Dict[str, Any]], None],
+    *where,
+    returning=(),
+):
+    """Runs the UPDATE and mirrors the change on the loaded object."""
+    db.flush()  # pending ORM changes first, otherwise they would be lost
+    resume_id = resume if isinstance(resume, int) else resume.id
+    stmt = (
+        update(Resume)
+        .where(Resume.id == resume_id, *where)
+        .values(data=data_expr, updated_at=func.now())
+        .returning(Resume.updated_at, *returning, Resume.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+
+    if not isinstance(resume, int):
+        if "data" in resume.__dict__ and resume.data is not None:
+            apply(resume.data)
+            set_committed_value(resume, "data", resume.data)
+        set_committed_value(resume, "updated_at", row[0])
+    cv_cache.invalidate(resume_id)
+    note_write(db, row[-1])  # read-your-writes: the replica may lag
+    return row
+
+
+def patch_resume_data(
+    db: Session,
+    resume: ResumeRef,
+    set_fields: Optional[Dict[str, Any]] = None,
+    remove_fields: Iterable[str] = (),
+) -> bool:
+    """
+    Sets and/or removes top-level keys: data = (data - remove) || set.
+    """
+    set_fields = dict(set_fields or {})
+    remove_fields = [k for k in remove_fields if k not in set_fields]
+    if not set_fields and not remove_fields:
+        return False
+
+    expr = func.coalesce(Resume.data, cast("{}", JSONB))
+    if remove_fields:
+        expr = expr.op("-")(_path(*remove_fields))
+    if set_fields:
+        expr = expr.op("||")(_jsonb(set_fields))
+
+    def apply(data: Dict[str, Any]) -> None:
+        for key in remove_fields:
+            data.pop(key, None)
+        data.update(set_fields)
+
+    return _execute_patch(db, resume, expr, apply) is not None
+
+
+def append_resume_list_item(
+    db: Session,
+    resume: ResumeRef,
+    list_name: str,
+    item: Dict[str, Any],
+    prepend: bool = False,
+) -> Optional[int]:
+    """
+    Adds one item to a list field without rewriting the other items.
+    Returns the new list length, or None if the resume no longer exists.
+    """
+    current = func.coalesce(Resume.data[list_name], cast("[]", JSONB))
+    new_item = _jsonb([item])
+    merged = (new_item.op("||")(current) if prepend
+              else current.op("||")(new_item))
+    expr = func.jsonb_set(
+        Resume.data, _path(list_name), merged, True, type_=JSONB
+    )
+
+    def apply(data: Dict[str, Any]) -> None:
+        items = data.get(list_name) or []
+        if prepend:
+            items.insert(0, item)
+        else:
+            items.append(item)
+        data[list_name] = items
+
+    row = _execute_patch(
+        db, resume, expr, apply,
+        # RETURNING sees the updated row
+        returning=(func.jsonb_array_length(Resume.data[list_name]),),
+    )
+    return None if row is None else row[1]
+
+
+def _entry_guard(list_name: str, index: int, entry_id: Optional[str]):
+    """Optimistic check that list[index] is still the expected entry."""
+    if entry_id is None:
+        return ()
+    return (Resume.data[(list_name, str(index), "id")].astext == entry_id,)
+
+
+def update_resume_list_item(
+    db: Session,
+    resume: ResumeRef,
+    list_name: str,
+    index: int,
+    field_name: str,
+    value: Any,
+    entry_id: Optional[str] = None,
+) -> bool:
+    """
+    Sets one field of list[index]. With entry_id the update only applies
+    if that item still has this id; returns False otherwise.
+    """
+    expr = func.jsonb_set(
+        Resume.data, _path(list_name, index, field_name), _jsonb(value), True,
+        type_=JSONB,
+    )
+
+    def apply(data: Dict[str, Any]) -> None:
+        data[list_name][index][field_name] = value
+
+    row = _execute_patch(
+        db, resume, expr, apply, *_entry_guard(list_name, index, entry_id)
+    )
+    return row is not None
+
+
+def remove_resume_list_item(
+    db: Session,
+    resume: ResumeRef,
+    list_name: str,
+    index: int,
+    entry_id: Optional[str] = None,
+) -> bool:
+    """Removes list[index] (data #- '{list,index}')."""
+    expr = Resume.data.op("#-")(_path(list_name, index))
+
+    def apply(data: Dict[str, Any]) -> None:
+        data[list_name].pop(index)
+
+    row = _execute_patch(
+        db, resume, expr, apply, *_entry_guard(list_name, index, entry_id)
+    )
+    return row is not None
+
+
 def update_resume_field(
     db: Session, resume: Resume, field_name: str, value: Any
 ) -> Resume:
     """
     Updates a specific field in the resume's data JSONB object.
     """
-    if resume.data is None:
-        resume.data = {}
-    resume.data[field_name] = value
-    flag_modified(resume, "data")
-    db.add(resume)
+    patch_resume_data(db, resume, {field_name: value})
     db.commit()
-    db.refresh(resume)
     return resume
 
 
@@ -71,6 +241,20 @@ def append_resume_insight(
     return resume
 
 
+def bulk_insert_resumes(db: Session, resumes: List[Resume]) -> List[int]:
+    """
+    Inserts a batch of resumes in one round trip and returns their ids.
+    Ids are read after flush, so commit does not trigger per-row refreshes.
+    """
+    if not resumes:
+        return []
+    db.add_all(resumes)
+    db.flush()
+    ids = [r.id for r in resumes]
+    db.commit()
+    return ids
+
+
 def get_resume_insights(db: Session, resume: Resume) -> Iterable[str]:
     """
     Retrieves all insights from the resume.
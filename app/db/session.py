@@ -1,16 +1,133 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
 
 from core.config import settings
+from services.cache_bus import EVENT_WRITES, cache_bus, notify
 
-DATABASE_URL = (
-    f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
-    f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
-)
+
+def _url(host: str, port: int) -> str:
+    return (
+        f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+        f"@{host}:{port}/{settings.POSTGRES_DB}"
+    )
+
+
+DATABASE_URL = _url(settings.POSTGRES_HOST, settings.POSTGRES_PORT)
 
 engine = create_engine(DATABASE_URL, future=True, echo=False)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Реплика только для чтения. Без POSTGRES_REPLICA_HOST это тот же engine.
+if settings.POSTGRES_REPLICA_HOST:
+    replica_engine = create_engine(
+        _url(settings.POSTGRES_REPLICA_HOST, settings.POSTGRES_REPLICA_PORT),
+        future=True,
+        echo=False,
+    )
+else:
+    replica_engine = engine
+ReadSessionLocal = sessionmaker(
+    bind=replica_engine, autoflush=False, autocommit=False
+)
+
+
+class RecentWrites:
+    """
+    users.id, писавшие в primary за последние `window` секунд.
+    Их чтения не отправляются на реплику, пока она может отставать.
+    Учёт — в пределах процесса.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._lock = threading.Lock()
+        self._until: dict[int, float] = {}
+
+    def mark(self, user_ids: Iterable[int]) -> None:
+        until = time.monotonic() + self.window
+        with self._lock:
+            for user_id in user_ids:
+                self._until[user_id] = until
+            if len(self._until) > 10000:
+                self._prune()
+
+    def is_recent(self, user_id: int) -> bool:
+        with self._lock:
+            until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for user_id in [u for u, t in self._until.items() if t <= now]:
+            del self._until[user_id]
+
+
+recent_writes = RecentWrites(settings.DB_READ_YOUR_WRITES_SECONDS)
+
+_WRITTEN = "written_user_ids"
+
+
+def note_write(db: Session, user_id: Optional[int]) -> None:
+    """
+    Отмечает запись данных пользователя, сделанную в обход ORM
+    (UPDATE ... RETURNING). Учитывается после commit.
+    """
+    if user_id is not None:
+        db.info.setdefault(_WRITTEN, set()).add(user_id)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _collect_written_users(db, flush_context, instances) -> None:
+    for obj in (*db.new, *db.dirty, *db.deleted):
+        if getattr(obj, "__tablename__", None) == "users":
+            note_write(db, obj.id)
+        else:
+            note_write(db, getattr(obj, "user_id", None))
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _broadcast_written_users(db) -> None:
+    """С репликой окно должно действовать во всех воркерах."""
+    if replica_engine is engine:
+        return
+    db.flush()  # чтобы before_flush успел собрать id
+    written = db.info.get(_WRITTEN)
+    if written:
+        notify(db, EVENT_WRITES, users=sorted(written))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_written_users(db) -> None:
+    written = db.info.pop(_WRITTEN, None)
+    if written:
+        recent_writes.mark(written)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_written_users(db) -> None:
+    db.info.pop(_WRITTEN, None)
+
+
+cache_bus.subscribe(
+    EVENT_WRITES, lambda event: recent_writes.mark(event["users"])
+)
+
+
+def read_session(user_id: Optional[int] = None) -> Session:
+    """
+    Сессия для чистого чтения: реплика, если она настроена и
+    пользователь `user_id` недавно ничего не писал, иначе primary.
+    """
+    if replica_engine is engine or (
+        user_id is not None and recent_writes.is_recent(user_id)
+    ):
+        return SessionLocal()
+    return ReadSessionLocal()
+
 
 def get_db():
     db = SessionLocal()
@@ -18,3 +135,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Зависимость для чтений, не привязанных к пользователю."""
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -6,4 +6,4 @@ echo "📦 Применяем миграции..."
 alembic -c alembic.ini upgrade head
 
 echo "🚀 Запускаем приложение..."
-exec gunicorn main:app -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --workers 1 --timeout 300
\ No newline at end of file
+exec gunicorn main:app -c gunicorn.conf.py
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+Боевой профиль: gunicorn + uvicorn-воркеры.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+Число воркеров и тайм-ауты берутся из Settings (WEB_*). При остановке
+воркер перестаёт принимать соединения и до WEB_GRACEFUL_TIMEOUT ждёт
+начатые запросы (долгие вызовы LLM), только потом его убивают.
+"""
+import multiprocessing
+
+from core.config import settings
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.WEB_WORKERS or multiprocessing.cpu_count()
+timeout = settings.WEB_TIMEOUT
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT
+keepalive = 30  # бот держит пул keep-alive соединений
+preload_app = settings.WEB_PRELOAD
+
+if settings.DEBUG:
+    # debugpy слушает один порт: только один процесс и без preload
+    workers = 1
+    preload_app = False
+
+
+def when_ready(server):
+    """Мастер загрузил приложение и вот-вот запустит воркеры."""
+    if preload_app:
+        from main import preload_shared_state
+
+        preload_shared_state()
+        server.log.info("Shared state preloaded")
+
+
+def post_fork(server, worker):
+    """Пулы соединений мастера воркеру не нужны (и опасны)."""
+    from db.session import engine, replica_engine
+
+    engine.dispose(close=False)
+    if replica_engine is not engine:
+        replica_engine.dispose(close=False)
@@ -1,18 +1,50 @@
 from fastapi import FastAPI
-from fastapi.concurrency import asynccontextmanager
+from fastapi.concurrency import asynccontextmanager, run_in_threadpool
 from core.config import settings
 from api.v1.router import router as api_v1_router
-from resume.dynamic_resume_model_manager import (
-    initialize_dynamic_resume_model,
-)
+from db.session import DATABASE_URL, SessionLocal, engine, replica_engine
+from resume.dynamic_resume_model_manager import dynamic_resume_model_manager
+from services.answer_archive import ensure_answer_partitions
+from services.cache_bus import cache_bus
+from services.question_flow import question_flow
+from services.speechkit import speechkit_client
 
 import logging
 
+_preloaded = False
+
+
+def preload_shared_state() -> None:
+    """
+    Вызывается в мастере gunicorn до fork (preload_app): каталог
+    шаблонов и модель разбора PDF (без LLM-клиента) достаются воркерам
+    готовыми. Соединения с БД закрываются, чтобы не делить их после fork.
+    """
+    global _preloaded
+    ensure_answer_partitions()
+    db = SessionLocal()
+    try:
+        dynamic_resume_model_manager.preload(question_flow.get(db))
+    finally:
+        db.close()
+    engine.dispose()
+    if replica_engine is not engine:
+        replica_engine.dispose()
+    _preloaded = True
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await initialize_dynamic_resume_model()
-    yield
+    # LLM-клиенты строятся при первом запросе
+    if not _preloaded:
+        await run_in_threadpool(ensure_answer_partitions)
+    cache_bus.start(DATABASE_URL)
+    await speechkit_client.start()
+    try:
+        yield
+    finally:
+        await speechkit_client.close()
+        await run_in_threadpool(cache_bus.stop)
 
 
 logger = logging.getLogger(__name__)
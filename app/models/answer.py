@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from db.base import Base
 
@@ -13,10 +13,23 @@ class Answer(Base):
         role: Роль отправителя (human/bot).
         answer_raw: Текст сообщения.
         created_at: Дата и время создания записи.
+
+    Таблица секционирована по месяцам (RANGE по created_at), поэтому
+    created_at входит в первичный ключ. Секции создаёт и архивирует
+    services.answer_archive.
     """
     __tablename__ = "answers"
+    __table_args__ = (
+        # get_conversation_history: последние сообщения сессии
+        Index(
+            "ix_answers_session_created",
+            "session_id",
+            text("created_at DESC"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(
         Integer,
         ForeignKey(
@@ -24,7 +37,6 @@ class Answer(Base):
             ondelete="CASCADE"
         ),
         nullable=False,
-        index=True
     )
     role = Column(
         String,
@@ -38,4 +50,5 @@ class Answer(Base):
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False,
+        primary_key=True,
     )
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class QuestionSync(Base):
+    """
+    Запуск синхронизации шаблонов вопросов (фоновая задача).
+
+    Attributes:
+        id: Идентификатор задачи (его отдаёт POST /admin/update-questions).
+        status: pending | running | done | failed.
+        source: Откуда читались шаблоны (gsheets, путь к фикстуре).
+        inserted: Сколько шаблонов добавлено.
+        updated: Сколько шаблонов изменено.
+        deleted: Сколько шаблонов удалено.
+        template_version: Версия шаблонов после синхронизации; None,
+            если ничего не изменилось. Текущая версия — максимум по
+            таблице, по ней сбрасываются кэши вопросов и CV.
+        error: Текст ошибки для status="failed".
+        created_at: Время постановки задачи.
+        finished_at: Время завершения.
+    """
+    __tablename__ = "question_syncs"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False, default="pending")
+    source = Column(String, nullable=True)
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
+    template_version = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    finished_at = Column(DateTime(timezone=True), nullable=True)
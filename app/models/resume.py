@@ -3,8 +3,10 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict
@@ -29,6 +31,23 @@ class Resume(Base):
         sessions: Сессии, связанные с резюме.
     """
     __tablename__ = "resumes"
+    __table_args__ = (
+        # get_cv / get_active_resume_for_user: активное резюме пользователя
+        Index(
+            "ix_resumes_user_active_updated",
+            "user_id",
+            text("updated_at DESC"),
+            postgresql_where=text("NOT is_archived"),
+        ),
+        # get_active_session: незавершённый черновик пользователя
+        Index(
+            "ix_resumes_user_draft",
+            "user_id",
+            postgresql_where=text(
+                "NOT is_archived AND status = 'incomplete'"
+            ),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(
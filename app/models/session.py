@@ -2,6 +2,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -30,6 +31,10 @@ class Session(Base):
         user: Связь с моделью пользователя.
     """
     __tablename__ = "sessions"
+    __table_args__ = (
+        # get_active_session (join к resumes) и поиск сессии резюме
+        Index("ix_sessions_user_resume", "user_id", "resume_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(
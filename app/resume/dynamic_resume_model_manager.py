@@ -1,85 +1,184 @@
 
+import asyncio
+from dataclasses import dataclass
 from typing import Optional, Type, List, Dict, Any, Tuple
+
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, create_model
-from sqlalchemy.orm import Session
+
 from db.session import SessionLocal
-from crud.dialog import get_resume_parse_fields
 from agent.llm import create_precise_llm
+from services.question_flow import QuestionFlow, question_flow
 
 from logging import getLogger
 
 logger = getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ResumeModelSnapshot:
+    """
+    Parsing model and structured-output LLM built for one template version.
+    Never mutated: a rebuild produces a new snapshot, so a request that
+    already holds one keeps a consistent (model, llm, fields) triple.
+    """
+
+    version: int
+    model: Type[BaseModel]
+    llm: Any  # None for a preloaded snapshot, see preload()
+    resume_fields: Tuple[Dict[str, Any], ...]
+
+
+def _parse_fields(flow: QuestionFlow) -> Tuple[Dict[str, Any], ...]:
+    """Field definitions for the PDF parser, in question priority order."""
+    return tuple(
+        {"name": name, "label": flow.labels[name],
+         "group": flow.nodes[name].group_id}
+        for name in flow.order
+    )
+
+
+def _current_flow() -> QuestionFlow:
+    db = SessionLocal()
+    try:
+        # cached flow: no query unless the templates were invalidated
+        return question_flow.get(db)
+    finally:
+        db.close()
+
+
 class DynamicResumeModelManager:
     """
     Manages the lifecycle of a dynamically created Pydantic model for resume parsing.
     This model's structure is determined at runtime based on database field definitions.
+
+    The model is rebuilt when the question template version changes.
+    Rebuilds are single-flight (one per version, concurrent callers wait
+    for it) and swap the snapshot atomically.
     """
 
     def __init__(self):
-        self.model: Optional[Type[BaseModel]] = None
-        self.initialized: bool = False
-        self.resume_fields: List[Dict[str, Any]] = []
-        self.llm = None
+        self._snapshot: Optional[ResumeModelSnapshot] = None
+        self._lock = asyncio.Lock()
 
-    async def initialize_model(self):
+    # Read-only views of the current snapshot (backwards compatible).
+    @property
+    def initialized(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def model(self) -> Optional[Type[BaseModel]]:
+        return self._snapshot.model if self._snapshot else None
+
+    @property
+    def llm(self):
+        return self._snapshot.llm if self._snapshot else None
+
+    @property
+    def resume_fields(self) -> List[Dict[str, Any]]:
+        return list(self._snapshot.resume_fields) if self._snapshot else []
+
+    def preload(self, flow: QuestionFlow) -> None:
         """
-        Initializes the dynamic Pydantic model for resume parsing.
-        Fetches field definitions from the database, builds Pydantic field definitions,
-        and creates the model.
+        Builds the model without an LLM client. Used in the gunicorn
+        master before fork: workers inherit the model, and each creates
+        its own client (network clients must not cross a fork).
         """
+        self._snapshot = self._build(flow, with_llm=False)
+
+    async def initialize_model(self):
+        """Builds the first snapshot at startup."""
         logger.info("Attempting to initialize dynamic resume model...")
-        if not SessionLocal:
+        await self.current()
+
+    async def current(self) -> Optional[ResumeModelSnapshot]:
+        """
+        Snapshot for the current template version, rebuilding it if the
+        templates changed. On a failed rebuild the previous snapshot is
+        kept; None only if no model could be built at all.
+        """
+        try:
+            flow = await run_in_threadpool(_current_flow)
+        except Exception as e:
             logger.error(
-                "SessionLocal not available from db.session. Cannot initialize dynamic model at startup.",
-                exc_info=True,
+                f"Failed to read question templates: {e}", exc_info=True
             )
-            self.initialized = False
-            return
+            return self._usable()
+
+        snapshot = self._snapshot
+        if self._is_current(snapshot, flow):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if self._is_current(snapshot, flow):
+                return snapshot  # built by the request we waited for
+            try:
+                snapshot = await run_in_threadpool(
+                    self._build, flow, True, snapshot
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to initialize dynamic resume model: {e}",
+                    exc_info=True,
+                )
+                return self._usable()
+            self._snapshot = snapshot
+            return snapshot
+
+    def _usable(self) -> Optional[ResumeModelSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.llm is None:
+            return None
+        return snapshot
+
+    @staticmethod
+    def _is_current(
+        snapshot: Optional[ResumeModelSnapshot], flow: QuestionFlow
+    ) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == flow.version
+            and snapshot.llm is not None
+        )
 
-        db: Optional[Session] = None
-        try:
-            db = SessionLocal()
-            self.resume_fields = get_resume_parse_fields(db)
-            if not self.resume_fields:
+    @staticmethod
+    def _build(
+        flow: QuestionFlow,
+        with_llm: bool = True,
+        base: Optional[ResumeModelSnapshot] = None,
+    ) -> ResumeModelSnapshot:
+        if base is not None and base.version == flow.version:
+            # preloaded model of the same version: only the client is missing
+            resume_fields, model = base.resume_fields, base.model
+        else:
+            resume_fields = _parse_fields(flow)
+            if not resume_fields:
                 logger.warning(
-                    "No fields returned from get_resume_parse_fields. Dynamic model will be empty or minimal."
+                    "No question templates found. Dynamic model will be empty or minimal."
                 )
 
             pydantic_model_fields = _build_dynamic_model_field_definitions(
-                self.resume_fields
+                list(resume_fields)
             )
-
-            self.model = create_model(
+            model = create_model(
                 "GlobalDynamicResumeModel",  # Name of the dynamically created Pydantic model
                 **pydantic_model_fields,
             )
-
-            self.llm = create_precise_llm().with_structured_output(self.model)
-
-            self.initialized = True
-            if self.model:
-                logger.info(
-                    f"Dynamic resume model '{self.model.__name__}' initialized successfully "
-                    f"with fields: {list(pydantic_model_fields.keys())}"
-                )
-            else:
-                logger.error(
-                    "Dynamic resume model creation resulted in None, though no exception was raised.",
-                    exc_info=True,
-                )
-                self.initialized = False
-
-        except Exception as e:
-            logger.error(
-                f"Failed to initialize dynamic resume model: {e}", exc_info=True
+            logger.info(
+                f"Dynamic resume model v{flow.version} '{model.__name__}' initialized "
+                f"with fields: {list(pydantic_model_fields.keys())}"
             )
-            self.initialized = False
-            self.model = None  # Ensure model is reset on failure
-        finally:
-            if db:
-                db.close()
+        llm = (
+            create_precise_llm().with_structured_output(model)
+            if with_llm else None
+        )
+        return ResumeModelSnapshot(
+            version=flow.version,
+            model=model,
+            llm=llm,
+            resume_fields=resume_fields,
+        )
 
 
 def _build_dynamic_model_field_definitions(
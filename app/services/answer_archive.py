@@ -0,0 +1,292 @@
+"""
+Помесячные секции таблицы answers и их архивирование.
+
+История диалога только дописывается, а читаются последние сообщения
+сессии, поэтому answers секционирована по месяцам created_at:
+
+* ensure_partitions() заранее создаёт секции текущего и следующих
+  месяцев (вызывается при старте приложения и задачей ретенции); строки,
+  которые успели попасть в default-секцию, переносятся в их месяц;
+* archive_cold_partitions() выгружает секции старше ANSWERS_RETENTION_MONTHS
+  в NDJSON.zst, проверяет число строк и отсоединяет/удаляет секцию.
+
+Задачу ретенции нужно запускать по cron (хотя бы раз в месяц): если
+процесс живёт дольше ANSWERS_PARTITIONS_AHEAD месяцев без рестарта, секции
+вперёд создаёт только она. Код возврата ≠ 0, если секции создать не
+удалось. Запуск из каталога app/:
+
+    python -m services.answer_archive --keep-months 6 --dir /data/archive
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT = "answers"
+DEFAULT_PARTITION = "answers_default"
+_NAME_RE = re.compile(r"^answers_y(\d{4})m(\d{2})$")
+COLUMNS = ("id", "session_id", "role", "answer_raw", "created_at")
+
+# ключ pg_advisory_xact_lock: воркеры создают секции по очереди
+_PARTITIONS_LOCK_KEY = 0x414E_5357  # "ANSW"
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"answers_y{month.year}m{month.month:02d}"
+
+
+def _default_months(conn: Connection) -> List[date]:
+    """Месяцы строк, осевших в default-секции."""
+    if conn.execute(
+        text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}
+    ).scalar() is None:
+        return []
+    rows = conn.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at)::date "
+        f"FROM {DEFAULT_PARTITION}"
+    )).scalars()
+    return sorted(rows)
+
+
+def _create_partition(conn: Connection, month: date) -> int:
+    """
+    Создаёт секцию месяца. Если в default-секции уже есть строки этого
+    месяца, обычный CREATE … PARTITION OF упадёт («updated partition
+    constraint for default partition would be violated»), поэтому секция
+    создаётся отдельной таблицей, строки переносятся в неё и она
+    присоединяется к answers. Возвращает число перенесённых строк.
+    """
+    name = partition_name(month)
+    bounds = (
+        f"FROM ('{month.isoformat()}') "
+        f"TO ('{add_months(month, 1).isoformat()}')"
+    )
+    if month not in _default_months(conn):
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+            f"FOR VALUES {bounds}"
+        ))
+        return 0
+
+    conn.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"
+    ))
+    moved = conn.execute(text(
+        f"WITH moved AS ("
+        f"  DELETE FROM {DEFAULT_PARTITION} "
+        f"  WHERE created_at >= '{month.isoformat()}' "
+        f"    AND created_at < '{add_months(month, 1).isoformat()}' "
+        f"  RETURNING {', '.join(COLUMNS)}) "
+        f"INSERT INTO {name} ({', '.join(COLUMNS)}) "
+        f"SELECT {', '.join(COLUMNS)} FROM moved"
+    )).rowcount
+    # первичный ключ и индекс (session_id, created_at) ATTACH создаст сам
+    conn.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}"
+    ))
+    logger.warning(
+        "Moved %d answers rows from %s to %s", moved, DEFAULT_PARTITION, name
+    )
+    return moved
+
+
+def ensure_partitions(
+    conn: Connection, ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Создаёт недостающие секции от текущего месяца на `ahead` вперёд,
+    а также для месяцев, строки которых лежат в default-секции.
+    """
+    ahead = settings.ANSWERS_PARTITIONS_AHEAD if ahead is None else ahead
+    conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"),
+        {"key": _PARTITIONS_LOCK_KEY},
+    )
+    current = month_start(datetime.now(timezone.utc).date())
+    existing = {name for name, _ in list_partitions(conn)}
+    months = {add_months(current, offset) for offset in range(ahead + 1)}
+    months.update(_default_months(conn))
+    created = []
+    for month in sorted(months):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        _create_partition(conn, month)
+        created.append(name)
+    if created:
+        logger.info("Created answers partitions: %s", ", ".join(created))
+    return created
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """Помесячные секции answers (без default), по возрастанию месяца."""
+    rows = conn.execute(text(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :parent
+        """
+    ), {"parent": PARENT}).scalars()
+    result = []
+    for name in rows:
+        match = _NAME_RE.match(name)
+        if match:
+            result.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(result, key=lambda item: item[1])
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError(
+            "Archiving answers requires the 'zstandard' package"
+        ) from exc
+    return zstandard
+
+
+def _row_json(row) -> str:
+    item = dict(zip(COLUMNS, row))
+    item["created_at"] = item["created_at"].isoformat()
+    return json.dumps(item, ensure_ascii=False)
+
+
+def export_partition(engine: Engine, name: str, archive_dir: Path) -> Tuple[Path, int]:
+    """
+    Потоково пишет секцию в <dir>/<name>.ndjson.zst.
+    Файл появляется под итоговым именем только после fsync.
+    """
+    zstd = _zstd()
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.ndjson.zst"
+    # месяц мог архивироваться раньше (строки пришли позже через default)
+    suffix = 1
+    while path.exists():
+        path = archive_dir / f"{name}.{suffix}.ndjson.zst"
+        suffix += 1
+    tmp = path.with_name(path.name + ".part")
+
+    count = 0
+    with engine.connect() as conn, open(tmp, "wb") as raw:
+        result = conn.execution_options(
+            stream_results=True, yield_per=5000
+        ).execute(text(
+            f"SELECT {', '.join(COLUMNS)} FROM {name} ORDER BY id"
+        ))
+        writer = zstd.ZstdCompressor(level=settings.ANSWERS_ARCHIVE_LEVEL)
+        with writer.stream_writer(raw, closefd=False) as out:
+            for row in result:
+                out.write(_row_json(row).encode())
+                out.write(b"\n")
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return path, count
+
+
+def archive_cold_partitions(
+    engine: Engine,
+    keep_months: Optional[int] = None,
+    archive_dir: Optional[Path] = None,
+    dry_run: bool = False,
+) -> List[Path]:
+    """
+    Архивирует и удаляет секции, целиком лежащие раньше
+    (текущий месяц − keep_months).
+    """
+    keep_months = (settings.ANSWERS_RETENTION_MONTHS
+                   if keep_months is None else keep_months)
+    archive_dir = Path(archive_dir or settings.ANSWERS_ARCHIVE_DIR)
+    cutoff = add_months(
+        month_start(datetime.now(timezone.utc).date()), -keep_months
+    )
+
+    with engine.connect() as conn:
+        cold = [(n, m) for n, m in list_partitions(conn) if m < cutoff]
+
+    archived = []
+    for name, _ in cold:
+        if dry_run:
+            logger.info("Would archive %s", name)
+            continue
+        path, count = export_partition(engine, name, archive_dir)
+        with engine.begin() as conn:
+            expected = conn.execute(
+                text(f"SELECT count(*) FROM {name}")
+            ).scalar_one()
+            if expected != count:
+                raise RuntimeError(
+                    f"{name}: exported {count} rows, table has {expected}"
+                )
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        logger.info("Archived %s: %d rows → %s", name, count, path)
+        archived.append(path)
+    return archived
+
+
+def ensure_answer_partitions() -> None:
+    """Хук старта приложения: секции на ближайшие месяцы."""
+    from db.session import engine
+
+    try:
+        with engine.begin() as conn:
+            ensure_partitions(conn)
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Answers partitions were not ensured: %s", exc,
+                     exc_info=True)
+
+
+def main() -> int:
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Ретенция таблицы answers")
+    parser.add_argument("--keep-months", type=int,
+                        default=settings.ANSWERS_RETENTION_MONTHS)
+    parser.add_argument("--dir", default=settings.ANSWERS_ARCHIVE_DIR)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if not args.dry_run:
+        try:
+            with engine.begin() as conn:
+                created = ensure_partitions(conn)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Answers partitions were not ensured: %s", exc,
+                         exc_info=True)
+            return 1
+        print(f"created partitions: {len(created)}")
+
+    archived = archive_cold_partitions(
+        engine, args.keep_months, Path(args.dir), dry_run=args.dry_run
+    )
+    print(f"archived partitions: {len(archived)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
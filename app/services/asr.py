@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import logging
+from typing import List, Protocol
+
+from fastapi.concurrency import run_in_threadpool
+
+from core.config import settings
+from services.ogg import split_oggopus
+from services.speechkit import speechkit_client
+
+logger = logging.getLogger(__name__)
+
+
+class Recognizer(Protocol):
+    """Бэкенд распознавания речи: OggOpus → текст."""
+
+    async def recognize(self, audio_bytes: bytes) -> str:
+        ...
+
+
+class FakeRecognizer:
+    """
+    Офлайн-бэкенд для локальной разработки и нагрузочных прогонов:
+    ничего не распознаёт, но детерминированно отвечает по содержимому.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def recognize(self, audio_bytes: bytes) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha1(audio_bytes).hexdigest()[:8]
+        return f"фрагмент {digest}"
+
+
+def get_recognizer() -> Recognizer:
+    """Возвращает бэкенд распознавания по настройке ASR_BACKEND."""
+    backend = settings.ASR_BACKEND.lower()
+    if backend == "yandex":
+        return speechkit_client
+    if backend == "fake":
+        return FakeRecognizer(latency=settings.ASR_FAKE_LATENCY)
+    raise ValueError(f"Unknown ASR backend: {settings.ASR_BACKEND}")
+
+
+async def transcribe(
+    audio_bytes: bytes,
+    recognizer: Recognizer | None = None,
+) -> str:
+    """
+    Распознаёт аудио произвольной длины: режет OggOpus на окна,
+    распознаёт фрагменты параллельно (не больше ASR_CONCURRENCY
+    одновременно) и склеивает текст в исходном порядке.
+    """
+    recognizer = recognizer or get_recognizer()
+    chunks: List[bytes] = await run_in_threadpool(
+        split_oggopus,
+        audio_bytes,
+        settings.ASR_CHUNK_SECONDS,
+        settings.ASR_CHUNK_MAX_BYTES,
+    )
+    if len(chunks) == 1:
+        return await recognizer.recognize(chunks[0])
+
+    sem = asyncio.Semaphore(settings.ASR_CONCURRENCY)
+
+    async def run(chunk: bytes) -> str:
+        async with sem:
+            return await recognizer.recognize(chunk)
+
+    parts = await asyncio.gather(*(run(c) for c in chunks))
+    logger.debug("Распознано %d фрагментов", len(parts))
+    return " ".join(p.strip() for p in parts if p and p.strip())
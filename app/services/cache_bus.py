@@ -0,0 +1,119 @@
+"""
+Сброс кэшей воркеров через Postgres LISTEN/NOTIFY.
+
+Кэши (QuestionFlow, окно read-your-writes) живут в памяти каждого
+процесса gunicorn. Тот, кто меняет данные, отправляет NOTIFY в своей
+транзакции — событие уходит подписчикам только после commit. Каждый
+воркер держит отдельное соединение с LISTEN в фоновом потоке и вызывает
+обработчики, которые модули-владельцы кэшей регистрируют через
+subscribe(). После каждого LISTEN, включая первый, вызываются
+обработчики on_reconnect: всё, что случилось до подписки, надо считать
+пропущенным. Это касается и первого подключения воркера — он унаследовал
+кэши мастера (WEB_PRELOAD), которые могли устареть до fork, особенно
+если gunicorn перезапустил воркер спустя дни после старта.
+"""
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_QUESTIONS = "questions"   # шаблоны вопросов пересинхронизированы
+EVENT_WRITES = "writes"         # пользователи писали в primary
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+def notify(db: Session, kind: str, **data: Any) -> None:
+    """NOTIFY в текущей транзакции; без commit никто его не получит."""
+    if not settings.CACHE_BUS_ENABLED:
+        return
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {
+            "channel": settings.CACHE_BUS_CHANNEL,
+            "payload": json.dumps({"kind": kind, **data}),
+        },
+    )
+
+
+class CacheBus:
+    """Подписка процесса на канал CACHE_BUS_CHANNEL."""
+
+    def __init__(self, channel: str, retry_delay: float = 5.0):
+        self.channel = channel
+        self.retry_delay = retry_delay
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._reconnect: List[Callable[[], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_reconnect(self, handler: Callable[[], None]) -> None:
+        self._reconnect.append(handler)
+
+    def start(self, dsn: str) -> None:
+        if not settings.CACHE_BUS_ENABLED or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(dsn,), name="cache-bus", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Cache bus: bad payload %r", payload)
+            return
+        for handler in self._handlers.get(event.get("kind"), ()):
+            try:
+                handler(event)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Cache bus handler failed: %s", exc,
+                             exc_info=True)
+
+    def _run(self, dsn: str) -> None:
+        import psycopg2
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                for handler in self._reconnect:
+                    handler()
+                logger.info("Cache bus listening on %s", self.channel)
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            self.dispatch(conn.notifies.pop(0).payload)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Cache bus connection lost: %s", exc)
+                self._stop.wait(self.retry_delay)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+cache_bus = CacheBus(settings.CACHE_BUS_CHANNEL)
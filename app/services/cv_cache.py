@@ -0,0 +1,79 @@
+"""
+Кэш отрисованного резюме (cv_markdown).
+
+Ключ версии — (resume.updated_at, версия шаблонов): любая запись в
+резюме двигает updated_at, смена шаблонов — версию QuestionFlow, так
+что устаревшая запись просто не совпадёт. Дополнительно запись
+удаляется сразу после UPDATE строки resumes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Hashable, Optional, Tuple
+
+from sqlalchemy import event
+
+from core.config import settings
+from models.resume import Resume
+
+CVKey = Tuple[Optional[str], int]
+
+
+def cv_key(updated_at: Optional[datetime], template_version: int) -> CVKey:
+    return (
+        updated_at.isoformat() if updated_at else None,
+        template_version,
+    )
+
+
+def cv_etag(resume_id: int, key: CVKey) -> str:
+    """Слабый ETag для условного /dialog/next."""
+    raw = f"{resume_id}:{key[0]}:{key[1]}".encode()
+    return f'W/"cv-{hashlib.sha1(raw).hexdigest()[:16]}"'
+
+
+class CVCache:
+    """LRU resume_id → (ключ версии, отрисованный CV)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[CVKey, str]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, resume_id: int, key: CVKey) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(resume_id)
+            if item is None or item[0] != key:
+                self.misses += 1
+                return None
+            self._data.move_to_end(resume_id)
+            self.hits += 1
+            return item[1]
+
+    def set(self, resume_id: int, key: CVKey, value: str) -> None:
+        with self._lock:
+            self._data[resume_id] = (key, value)
+            self._data.move_to_end(resume_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, resume_id: int) -> None:
+        with self._lock:
+            self._data.pop(resume_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+cv_cache = CVCache(maxsize=settings.CV_CACHE_SIZE)
+
+
+@event.listens_for(Resume, "after_update")
+def _invalidate_on_update(mapper, connection, target: Resume) -> None:
+    cv_cache.invalidate(target.id)
@@ -0,0 +1,85 @@
+"""
+Разрешение tg_id → пользователь / резюме / сессия один раз на запрос.
+
+RequestIdentity создаётся в эндпоинте и передаётся агенту, инструментам
+и записи истории, чтобы они не искали пользователя заново. Сопоставление
+tg_id → users.id дополнительно кэшируется на процесс с TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from crud.dialog import get_or_create_session
+from crud.resume import get_or_create_active_resume
+from models.user import User
+
+
+@dataclass(frozen=True)
+class RequestIdentity:
+    """Кто делает запрос и с какими резюме/сессией работаем."""
+
+    tg_id: int
+    user_id: int
+    session_id: int
+    resume_id: int
+
+
+class UserIdCache:
+    """TTL + LRU кэш tg_id → users.id (id пользователя не меняется)."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[int, tuple[float, int]]" = OrderedDict()
+
+    def get(self, db: Session, tg_id: int) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(tg_id)
+            if item is not None and item[0] > now:
+                self._data.move_to_end(tg_id)
+                return item[1]
+
+        user_id = db.query(User.id).filter(User.tg_id == tg_id).scalar()
+        if user_id is None:
+            return None
+        with self._lock:
+            self._data[tg_id] = (now + self.ttl, user_id)
+            self._data.move_to_end(tg_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return user_id
+
+    def invalidate(self, tg_id: int) -> None:
+        with self._lock:
+            self._data.pop(tg_id, None)
+
+
+user_ids = UserIdCache(
+    ttl=settings.USER_ID_CACHE_TTL, maxsize=settings.USER_ID_CACHE_SIZE
+)
+
+
+def resolve_identity(db: Session, tg_id: int) -> Optional[RequestIdentity]:
+    """
+    Находит пользователя, его диалоговую сессию и активное резюме.
+    Сессия разрешается первой: если она создаёт новый черновик, агент
+    и инструменты работают уже с ним. None — пользователь не найден.
+    """
+    user_id = user_ids.get(db, tg_id)
+    if user_id is None:
+        return None
+    session = get_or_create_session(db, user_id)
+    resume = get_or_create_active_resume(db, user_id)
+    return RequestIdentity(
+        tg_id=tg_id,
+        user_id=user_id,
+        session_id=session.id,
+        resume_id=resume.id,
+    )
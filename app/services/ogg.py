@@ -0,0 +1,177 @@
+import logging
+import struct
+from dataclasses import dataclass
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+OPUS_SAMPLE_RATE = 48000            # гранула Opus всегда в 48 кГц
+_CAPTURE = b"OggS"
+_HEADER = struct.Struct("<4sBBqIIIB")
+_FLAG_CONTINUED = 0x01
+_FLAG_BOS = 0x02
+_FLAG_EOS = 0x04
+
+
+def _crc_table() -> List[int]:
+    table = []
+    for i in range(256):
+        r = i << 24
+        for _ in range(8):
+            r = ((r << 1) ^ 0x04C11DB7) if r & 0x80000000 else (r << 1)
+        table.append(r & 0xFFFFFFFF)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def ogg_crc(data: bytes) -> int:
+    """CRC-32 Ogg: полином 0x04C11DB7, без отражения, init = 0."""
+    crc = 0
+    for b in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[((crc >> 24) & 0xFF) ^ b]
+    return crc
+
+
+@dataclass
+class OggPage:
+    """
+    Одна страница Ogg.
+
+    Attributes:
+        flags: header_type (continued / BOS / EOS).
+        granule: Позиция гранулы в конце страницы (-1 — нет конца пакета).
+        serial: Серийный номер логического потока.
+        segments: Таблица сегментов (lacing values).
+        body: Полезная нагрузка страницы.
+    """
+    flags: int
+    granule: int
+    serial: int
+    segments: bytes
+    body: bytes
+
+    @property
+    def continued(self) -> bool:
+        return bool(self.flags & _FLAG_CONTINUED)
+
+    def encode(self, seqno: int, flags: int, granule: int) -> bytes:
+        header = _HEADER.pack(
+            _CAPTURE, 0, flags, granule, self.serial, seqno, 0,
+            len(self.segments),
+        )
+        raw = header + self.segments + self.body
+        crc = ogg_crc(raw)
+        return raw[:22] + struct.pack("<I", crc) + raw[26:]
+
+
+def parse_pages(data: bytes) -> List[OggPage]:
+    """
+    Разбирает поток Ogg на страницы.
+    Бросает ValueError, если данные — не Ogg.
+    """
+    pages: List[OggPage] = []
+    pos = 0
+    while pos < len(data):
+        if data[pos:pos + 4] != _CAPTURE:
+            raise ValueError(f"Ogg capture pattern not found at {pos}")
+        (_, _, flags, granule, serial, _, _, nsegs) = _HEADER.unpack_from(
+            data, pos
+        )
+        seg_start = pos + _HEADER.size
+        segments = data[seg_start:seg_start + nsegs]
+        body_start = seg_start + nsegs
+        body_end = body_start + sum(segments)
+        if body_end > len(data):
+            raise ValueError("Truncated Ogg page")
+        pages.append(
+            OggPage(flags, granule, serial, segments, data[body_start:body_end])
+        )
+        pos = body_end
+    return pages
+
+
+def _write_stream(
+    header_pages: List[OggPage],
+    audio_pages: List[OggPage],
+    base_granule: int,
+) -> bytes:
+    """
+    Собирает самостоятельный поток OggOpus: заголовки + аудио-страницы
+    с перенумерацией, смещёнными гранулами, флагами BOS/EOS и CRC.
+    """
+    out = bytearray()
+    pages = header_pages + audio_pages
+    last = len(pages) - 1
+    for seqno, page in enumerate(pages):
+        flags = page.flags & _FLAG_CONTINUED
+        if seqno == 0:
+            flags |= _FLAG_BOS
+        if seqno == last:
+            flags |= _FLAG_EOS
+        granule = page.granule
+        if seqno >= len(header_pages) and granule != -1:
+            granule -= base_granule
+        out += page.encode(seqno, flags, granule)
+    return bytes(out)
+
+
+def split_oggopus(
+    data: bytes,
+    window_seconds: float,
+    max_bytes: int,
+) -> List[bytes]:
+    """
+    Режет OggOpus на независимые потоки не длиннее `window_seconds`
+    и не больше `max_bytes`. Разрез только по границе страницы, с которой
+    не продолжается пакет. Не-Ogg данные возвращаются одним куском.
+    """
+    try:
+        pages = parse_pages(data)
+    except ValueError as exc:
+        logger.debug("Не OggOpus, без нарезки: %s", exc)
+        return [data]
+
+    header_pages: List[OggPage] = []
+    idx = 0
+    while idx < len(pages) and pages[idx].granule <= 0:
+        header_pages.append(pages[idx])
+        idx += 1
+    audio = pages[idx:]
+    if not header_pages or not audio:
+        return [data]
+
+    header_size = sum(
+        _HEADER.size + len(p.segments) + len(p.body) for p in header_pages
+    )
+    window = int(window_seconds * OPUS_SAMPLE_RATE)
+
+    chunks: List[bytes] = []
+    current: List[OggPage] = []
+    base = 0
+    size = header_size
+    for page in audio:
+        page_size = _HEADER.size + len(page.segments) + len(page.body)
+        end = page.granule if page.granule != -1 else base
+        too_long = end - base > window or size + page_size > max_bytes
+        if current and too_long and not page.continued:
+            chunks.append(_write_stream(header_pages, current, base))
+            base = _last_granule(current, base)
+            current, size = [], header_size
+        current.append(page)
+        size += page_size
+    if current:
+        chunks.append(_write_stream(header_pages, current, base))
+
+    if len(chunks) == 1:
+        return [data]
+    logger.info("OggOpus разрезан на %d фрагментов", len(chunks))
+    return chunks
+
+
+def _last_granule(pages: List[OggPage], default: int) -> int:
+    for page in reversed(pages):
+        if page.granule != -1:
+            return page.granule
+    return default
@@ -0,0 +1,223 @@
+"""
+Скомпилированный граф переходов анкеты.
+
+Шаблоны вопросов редко меняются, а выбираются на каждом шаге диалога,
+поэтому таблица question_templates один раз превращается в неизменяемый
+QuestionFlow: порядок полей, битовые маски групп, переходы внутри групп,
+intro-узлы и обязательные поля. Следующий вопрос — это младший
+установленный бит маски «ещё не заполнено», а не проход по всем шаблонам.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.question_sync import QuestionSync
+from services.cache_bus import EVENT_QUESTIONS, cache_bus
+from models.question_template import QuestionTemplate
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS: Dict[str, set] = {
+    "work_experience": {"exp_company", "exp_position"},
+}
+
+EMPTY_VALUES = (None, "", [], {})
+
+TEMPLATE_ATTRS = (
+    "field_name", "label", "priority", "template", "inline_kb",
+    "multi_select", "buttons", "destination", "group_id", "is_last",
+)
+
+
+def snapshot(qt: Any) -> SimpleNamespace:
+    """Отвязанная от сессии копия шаблона (изменения не попадут в БД)."""
+    data = {name: getattr(qt, name) for name in TEMPLATE_ATTRS}
+    data["buttons"] = list(data["buttons"]) if data["buttons"] else None
+    return SimpleNamespace(**data)
+
+
+def _is_intro(qt: Any) -> bool:
+    return bool(qt.group_id) and qt.field_name.endswith("_intro")
+
+
+@dataclass(frozen=True)
+class QuestionFlow:
+    """
+    Таблица переходов для одной версии шаблонов.
+
+    Бит i соответствует i-му шаблону в порядке приоритета.
+    """
+
+    version: int
+    order: Tuple[str, ...]
+    nodes: Mapping[str, SimpleNamespace]
+    bits: Mapping[str, int]              # поле верхнего уровня → бит
+    group_masks: Mapping[str, int]       # group_id → биты всех его шаблонов
+    next_in_group: Mapping[str, Optional[str]]
+    group_entry: Mapping[str, Optional[str]]
+    intro: Mapping[str, Optional[str]]
+    required: Mapping[str, frozenset]
+    labels: Mapping[str, str]
+    priorities: Mapping[str, int]
+    all_mask: int
+
+    @classmethod
+    def compile(
+        cls, templates: Iterable[Any], version: int = 0
+    ) -> "QuestionFlow":
+        rows = sorted(
+            (snapshot(qt) for qt in templates), key=lambda q: q.priority
+        )
+        order = tuple(q.field_name for q in rows)
+        nodes = {q.field_name: q for q in rows}
+        bits: Dict[str, int] = {}
+        group_masks: Dict[str, int] = {}
+        next_in_group: Dict[str, Optional[str]] = {}
+        group_entry: Dict[str, Optional[str]] = {}
+        intro: Dict[str, Optional[str]] = {}
+
+        members: Dict[str, list] = {}
+        for i, q in enumerate(rows):
+            if q.group_id:
+                group_masks[q.group_id] = (
+                    group_masks.get(q.group_id, 0) | (1 << i)
+                )
+                members.setdefault(q.group_id, []).append(q)
+            if not _is_intro(q):
+                # intro-узел не «заполняется» ответом, поэтому бита
+                # заполненности у него нет
+                bits[q.field_name] = 1 << i
+
+        for gid, group in members.items():
+            for q in group:
+                nxt = next(
+                    (o for o in group if o.priority > q.priority), None
+                )
+                next_in_group[q.field_name] = nxt.field_name if nxt else None
+            entry = next(
+                (q for q in group if not q.is_last and not _is_intro(q)),
+                None,
+            )
+            group_entry[gid] = entry.field_name if entry else None
+            first_intro = next((q for q in group if _is_intro(q)), None)
+            intro[gid] = first_intro.field_name if first_intro else None
+
+        return cls(
+            version=version,
+            order=order,
+            nodes=MappingProxyType(nodes),
+            bits=MappingProxyType(bits),
+            group_masks=MappingProxyType(group_masks),
+            next_in_group=MappingProxyType(next_in_group),
+            group_entry=MappingProxyType(group_entry),
+            intro=MappingProxyType(intro),
+            required=MappingProxyType(
+                {gid: frozenset(f) for gid, f in REQUIRED_FIELDS.items()}
+            ),
+            labels=MappingProxyType({q.field_name: q.label for q in rows}),
+            priorities=MappingProxyType(
+                {q.field_name: q.priority for q in rows}
+            ),
+            all_mask=(1 << len(rows)) - 1,
+        )
+
+    # ────────────────────────── маски ────────────────────────────
+
+    def filled_mask(self, data: Dict[str, Any]) -> int:
+        """Битовая карта заполненных полей резюме (+ закрытых групп)."""
+        mask = 0
+        for key, value in data.items():
+            bit = self.bits.get(key)
+            if bit and value not in EMPTY_VALUES:
+                mask |= bit
+        for gid, gmask in self.group_masks.items():
+            if data.get(f"{gid}_ok"):
+                mask |= gmask
+        return mask
+
+    # ───────────────────────── переходы ──────────────────────────
+
+    def node(self, field_name: Optional[str]) -> Optional[SimpleNamespace]:
+        """Новая копия шаблона, её можно менять без последствий."""
+        if field_name is None or field_name not in self.nodes:
+            return None
+        return SimpleNamespace(**vars(self.nodes[field_name]))
+
+    def next_field(self, data: Dict[str, Any]) -> Optional[str]:
+        pending = self.all_mask & ~self.filled_mask(data)
+        if not pending:
+            return None
+        return self.order[(pending & -pending).bit_length() - 1]
+
+    def next_group_field(self, field_name: str) -> Optional[str]:
+        return self.next_in_group.get(field_name)
+
+    def missing_required(self, gid: str, item: Dict[str, Any]) -> list:
+        return [f for f in self.required.get(gid, ()) if not item.get(f)]
+
+    def group_is_complete(self, data: Dict[str, Any], gid: str) -> bool:
+        items = data.get(gid, [])
+        if not items:
+            return False
+        return all(not self.missing_required(gid, it) for it in items)
+
+
+def current_template_version(db: Session) -> int:
+    """Версия шаблонов из журнала синхронизаций (0 — ещё не было)."""
+    return db.query(func.max(QuestionSync.template_version)).scalar() or 0
+
+
+class QuestionFlowRegistry:
+    """
+    Кэш скомпилированного QuestionFlow на процесс.
+
+    Компилируется лениво при первом обращении вместе с версией шаблонов
+    из БД; invalidate() помечает кэш устаревшим, и следующий запрос
+    перечитает question_templates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flow: Optional[QuestionFlow] = None
+        self._generation = 0       # растёт при каждом invalidate()
+        self._compiled = -1        # поколение, из которого собран _flow
+
+    @property
+    def version(self) -> int:
+        flow = self._flow
+        return flow.version if flow is not None else 0
+
+    def get(self, db: Session) -> QuestionFlow:
+        flow = self._flow
+        if flow is not None and self._compiled == self._generation:
+            return flow
+        with self._lock:
+            generation = self._generation
+            if self._flow is None or self._compiled != generation:
+                version = current_template_version(db)
+                self._flow = QuestionFlow.compile(
+                    db.query(QuestionTemplate).all(), version=version
+                )
+                self._compiled = generation
+                logger.info(
+                    "Question flow v%s compiled: %d templates",
+                    version, len(self._flow.order),
+                )
+            return self._flow
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+
+question_flow = QuestionFlowRegistry()
+
+# синхронизация в другом воркере; после каждого LISTEN (и первого тоже:
+# воркер мог унаследовать от мастера уже устаревший набор шаблонов)
+cache_bus.subscribe(EVENT_QUESTIONS, lambda event: question_flow.invalidate())
+cache_bus.on_reconnect(question_flow.invalidate)
@@ -0,0 +1,121 @@
+"""
+Источники шаблонов вопросов для синхронизации question_templates.
+
+Каждый источник отдаёт строки в формате листа Google Sheets: словари
+«заголовок колонки → строка», которые понимает
+QuestionTemplate.from_sheet_row. Кроме Google Sheets есть локальные
+CSV/JSON-фикстуры — для разработки и проверок без доступа к API.
+"""
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List
+
+from core.config import settings
+
+Row = Dict[str, str]
+
+
+class QuestionSource(ABC):
+    """Откуда берутся шаблоны вопросов."""
+
+    name: str
+
+    @abstractmethod
+    def read_rows(self) -> List[Row]:
+        """Все непустые строки источника."""
+
+
+class GoogleSheetsSource(QuestionSource):
+    """Вкладка Google Sheets; первая строка — заголовки колонок."""
+
+    name = "gsheets"
+
+    def __init__(self, creds_path: str, sheet_id: str, tab: str):
+        self.creds_path = creds_path
+        self.sheet_id = sheet_id
+        self.tab = tab
+
+    def read_rows(self) -> List[Row]:
+        from google.oauth2.service_account import Credentials
+        from googleapiclient.discovery import build
+
+        creds = Credentials.from_service_account_file(
+            self.creds_path,
+            scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"],
+        )
+        service = build("sheets", "v4", credentials=creds)
+        sheet = service.spreadsheets().values().get(
+            spreadsheetId=self.sheet_id,
+            range=self.tab,
+        ).execute()
+
+        values = sheet.get("values", [])
+        if not values:
+            return []
+        header = values[0]
+        return [dict(zip(header, r)) for r in values[1:] if any(r)]
+
+
+class CsvFileSource(QuestionSource):
+    """CSV-выгрузка того же листа (UTF-8, первая строка — заголовки)."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.name = str(self.path)
+
+    def read_rows(self) -> List[Row]:
+        with open(self.path, newline="", encoding="utf-8") as fh:
+            return [
+                {k: v or "" for k, v in row.items()}
+                for row in csv.DictReader(fh)
+                if any(row.values())
+            ]
+
+
+def _sheet_cell(value: Any) -> str:
+    """Значение JSON-фикстуры в том виде, в каком оно было бы в листе."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+class JsonFileSource(QuestionSource):
+    """JSON-массив объектов с теми же ключами, что колонки листа."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.name = str(self.path)
+
+    def read_rows(self) -> List[Row]:
+        with open(self.path, encoding="utf-8") as fh:
+            items = json.load(fh)
+        return [
+            {k: _sheet_cell(v) for k, v in item.items()}
+            for item in items
+            if item
+        ]
+
+
+def source_from_settings() -> QuestionSource:
+    """
+    QUESTIONS_SOURCE: "gsheets" (по умолчанию) или путь к .csv / .json.
+    """
+    source = settings.QUESTIONS_SOURCE
+    if source == "gsheets":
+        return GoogleSheetsSource(
+            settings.GSHEETS_CREDS_PATH,
+            settings.GSHEETS_SHEET_ID,
+            settings.GSHEETS_FIRST_TAB,
+        )
+    suffix = Path(source).suffix.lower()
+    if suffix == ".csv":
+        return CsvFileSource(source)
+    if suffix == ".json":
+        return JsonFileSource(source)
+    raise ValueError(f"Unsupported QUESTIONS_SOURCE: {source}")
@@ -0,0 +1,181 @@
+"""
+Инкрементальная синхронизация question_templates.
+
+Вместо TRUNCATE + полной вставки считается дифф по field_name
+(добавить / изменить / удалить), и он применяется одной транзакцией:
+идущие диалоги видят либо старый, либо новый набор шаблонов, но никогда
+пустую таблицу. Если что-то изменилось, в журнале question_syncs
+появляется новая template_version, а кэш QuestionFlow сбрасывается.
+
+Синхронизация выполняется фоновой задачей: эндпоинт только ставит её
+в журнал и сразу отвечает, статус читается по id задачи.
+"""
+import logging
+from datetime import timedelta
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from core.config import settings
+from db.session import SessionLocal
+from models.question_sync import QuestionSync
+from models.question_template import QuestionTemplate
+from services.cache_bus import EVENT_QUESTIONS, notify
+from services.question_flow import (
+    TEMPLATE_ATTRS,
+    current_template_version,
+    question_flow,
+)
+from services.question_sources import QuestionSource, source_from_settings
+
+logger = logging.getLogger(__name__)
+
+# ключ pg_advisory_xact_lock: одна синхронизация за раз на всю БД
+_SYNC_LOCK_KEY = 0x5157_5359  # "QWSY"
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+@dataclass
+class TemplateDiff:
+    insert: List[Dict[str, Any]] = field(default_factory=list)
+    update: List[Dict[str, Any]] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.insert or self.update or self.delete)
+
+
+def _values(qt: Any) -> Dict[str, Any]:
+    return {name: getattr(qt, name) for name in TEMPLATE_ATTRS}
+
+
+def diff_templates(
+    current: Iterable[Any], rows: Iterable[Dict[str, str]]
+) -> TemplateDiff:
+    """
+    Сравнивает шаблоны в БД со строками источника по field_name.
+    """
+    incoming: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        values = _values(QuestionTemplate.from_sheet_row(row))
+        name = values["field_name"]
+        if name in incoming:
+            raise ValueError(f"Повторяется field_name: {name}")
+        incoming[name] = values
+    if not incoming:
+        raise ValueError("Пустой лист")
+
+    existing = {qt.field_name: _values(qt) for qt in current}
+    diff = TemplateDiff()
+    for name, values in incoming.items():
+        old = existing.get(name)
+        if old is None:
+            diff.insert.append(values)
+        elif old != values:
+            diff.update.append(values)
+    diff.delete = sorted(set(existing) - set(incoming))
+    return diff
+
+
+def apply_diff(db: Session, diff: TemplateDiff) -> None:
+    """Применяет дифф в текущей транзакции (без commit)."""
+    if diff.delete:
+        db.query(QuestionTemplate).filter(
+            QuestionTemplate.field_name.in_(diff.delete)
+        ).delete(synchronize_session=False)
+    if diff.update:
+        db.bulk_update_mappings(QuestionTemplate, diff.update)
+    if diff.insert:
+        db.bulk_insert_mappings(QuestionTemplate, diff.insert)
+
+
+def enqueue_sync(db: Session) -> Tuple[QuestionSync, bool]:
+    """
+    Ставит синхронизацию в журнал: (задача, создана ли новая).
+    Если уже есть незавершённая задача, возвращает её, а не запускает
+    вторую. Задачи старше QUESTIONS_SYNC_TIMEOUT считаются брошенными
+    (воркер перезапустили посреди синхронизации).
+    """
+    active = (
+        db.query(QuestionSync)
+        .filter(
+            QuestionSync.status.in_(ACTIVE_STATUSES),
+            QuestionSync.created_at > func.now() - timedelta(
+                seconds=settings.QUESTIONS_SYNC_TIMEOUT
+            ),
+        )
+        .order_by(QuestionSync.id.desc())
+        .first()
+    )
+    if active is not None:
+        return active, False
+    job = QuestionSync(status="pending")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job, True
+
+
+def _finish(db: Session, job_id: int, **values: Any) -> None:
+    db.query(QuestionSync).filter(QuestionSync.id == job_id).update(
+        {**values, "finished_at": func.now()}, synchronize_session=False
+    )
+
+
+def run_sync(job_id: int, source: Optional[QuestionSource] = None) -> None:
+    """
+    Тело фоновой задачи. Источник читается до начала транзакции
+    с шаблонами, поэтому медленный API не держит блокировок.
+    """
+    db = SessionLocal()
+    changed = False
+    try:
+        source = source or source_from_settings()
+        db.query(QuestionSync).filter(QuestionSync.id == job_id).update(
+            {"status": "running", "source": source.name},
+            synchronize_session=False,
+        )
+        db.commit()
+
+        rows = source.read_rows()
+
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": _SYNC_LOCK_KEY},
+        )
+        diff = diff_templates(db.query(QuestionTemplate).all(), rows)
+        apply_diff(db, diff)
+        changed = bool(diff)
+        version = current_template_version(db) + 1 if changed else None
+        _finish(
+            db,
+            job_id,
+            status="done",
+            inserted=len(diff.insert),
+            updated=len(diff.update),
+            deleted=len(diff.delete),
+            template_version=version,
+        )
+        if changed:
+            notify(db, EVENT_QUESTIONS, version=version)
+        db.commit()
+        logger.info(
+            "Question sync #%s: +%d ~%d -%d",
+            job_id, len(diff.insert), len(diff.update), len(diff.delete),
+        )
+    except Exception as exc:
+        db.rollback()
+        changed = False
+        logger.error("Question sync #%s failed: %s", job_id, exc,
+                     exc_info=True)
+        _finish(db, job_id, status="failed", error=str(exc)[:1000])
+        db.commit()
+    finally:
+        db.close()
+
+    if changed:
+        question_flow.invalidate()  # остальные воркеры — через NOTIFY
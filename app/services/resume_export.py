@@ -0,0 +1,303 @@
+"""
+Потоковая выгрузка всех резюме (данные, инсайты, поля пользователя).
+
+Строки читаются серверным курсором пачками по RESUME_EXPORT_BATCH_SIZE
+(yield_per), без ORM-объектов и identity map, поэтому память не зависит
+от размера таблицы. Поля резюме раскладываются по колонкам согласно
+build_resume_schema: скалярное поле — своя колонка, повторяющаяся группа
+(work_experience и т.п.) — одна колонка с JSON-массивом. Колонки полей
+резюме называются data.<поле>, чтобы поле шаблона вроде status или
+created_at не совпало со служебной колонкой.
+
+Форматы: ndjson, csv, parquet (нужен pyarrow). Запуск из каталога app/:
+
+    python -m services.resume_export --format csv --out resumes.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.resume import Resume
+from models.user import User
+from services.schema_builder import build_resume_schema
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# (колонка выгрузки, выражение) — служебные поля резюме и пользователя
+META_COLUMNS = (
+    ("resume_id", Resume.id),
+    ("user_id", Resume.user_id),
+    ("tg_id", User.tg_id),
+    ("user_first_name", User.first_name),
+    ("user_last_name", User.last_name),
+    ("user_phone", User.phone),
+    ("user_birthday", User.birthday),
+    ("status", Resume.status),
+    ("is_archived", Resume.is_archived),
+    ("created_at", Resume.created_at),
+    ("updated_at", Resume.updated_at),
+)
+
+# префикс колонок с полями резюме (Resume.data)
+DATA_PREFIX = "data."
+
+
+class ExportLayout:
+    """Порядок колонок выгрузки, вычисленный из схемы резюме один раз."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        props = schema.get("properties", {})
+        self.fields = [
+            name for name, prop in props.items()
+            if prop.get("type") != "array"
+        ]
+        self.groups = [
+            name for name, prop in props.items()
+            if prop.get("type") == "array"
+        ]
+        self.columns: List[str] = (
+            [name for name, _ in META_COLUMNS]
+            + [DATA_PREFIX + name for name in self.fields + self.groups]
+            + ["insights"]
+        )
+
+    def flatten(self, row) -> Dict[str, Any]:
+        meta = row[:len(META_COLUMNS)]
+        data, insights = row[len(META_COLUMNS):]
+        data = data or {}
+        item = {name: value for (name, _), value in zip(META_COLUMNS, meta)}
+        for name in self.fields:
+            item[DATA_PREFIX + name] = data.get(name)
+        for name in self.groups:
+            item[DATA_PREFIX + name] = data.get(name) or []
+        item["insights"] = insights or []
+        return item
+
+
+def iter_rows(
+    db: Session,
+    layout: ExportLayout,
+    include_archived: bool = True,
+    batch_size: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Отдаёт пачки плоских строк, читая resumes серверным курсором."""
+    batch_size = batch_size or settings.RESUME_EXPORT_BATCH_SIZE
+    stmt = (
+        select(*(col for _, col in META_COLUMNS), Resume.data, Resume.insights)
+        .join(User, User.id == Resume.user_id)
+        .order_by(Resume.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if not include_archived:
+        stmt = stmt.where(Resume.is_archived.is_(False))
+
+    result = db.execute(stmt)
+    try:
+        for part in result.partitions():
+            yield [layout.flatten(row) for row in part]
+    finally:
+        result.close()
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _cell(value: Any) -> Any:
+    """Значение ячейки для CSV/Parquet: вложенное — JSON-строкой."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def write_ndjson(
+    batches: Iterable[List[Dict[str, Any]]], layout: ExportLayout
+) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(item, ensure_ascii=False, default=_json_default) + "\n"
+            for item in batch
+        ).encode()
+
+
+def write_csv(
+    batches: Iterable[List[Dict[str, Any]]], layout: ExportLayout
+) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(layout.columns)
+    for batch in batches:
+        for item in batch:
+            writer.writerow([_cell(item[c]) for c in layout.columns])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet export requires the 'pyarrow' package"
+        ) from exc
+    return pyarrow
+
+
+class _Spool(io.RawIOBase):
+    """Приёмник для ParquetWriter: копит байты до очередного drain()."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(pa, layout: ExportLayout):
+    types = {
+        "resume_id": pa.int64(),
+        "user_id": pa.int64(),
+        "tg_id": pa.int64(),
+        "user_birthday": pa.date32(),
+        "is_archived": pa.bool_(),
+        "created_at": pa.timestamp("us", tz="UTC"),
+        "updated_at": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema(
+        [(c, types.get(c, pa.string())) for c in layout.columns]
+    )
+
+
+def write_parquet(
+    batches: Iterable[List[Dict[str, Any]]], layout: ExportLayout
+) -> Iterator[bytes]:
+    """Одна row group на пачку; футер дописывается в конце потока."""
+    pa = _pyarrow()
+    schema = _arrow_schema(pa, layout)
+    typed = {f.name for f in schema if not pa.types.is_string(f.type)}
+    sink = _Spool()
+    writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            columns = {
+                c: [
+                    item[c] if c in typed else _str_cell(item[c])
+                    for item in batch
+                ]
+                for c in layout.columns
+            }
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _str_cell(value: Any) -> Optional[str]:
+    value = _cell(value)
+    return None if value is None else str(value)
+
+
+WRITERS = {
+    "ndjson": write_ndjson,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def check_format(fmt: str) -> None:
+    """
+    Проверяет формат до начала потока, чтобы ошибка не пришла
+    посреди ответа. ValueError — неизвестный формат,
+    RuntimeError — нет нужной библиотеки.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet":
+        _pyarrow()
+
+
+def export_resumes(
+    db: Session,
+    fmt: str,
+    include_archived: bool = True,
+    batch_size: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Готовый поток байтов выгрузки в формате fmt."""
+    check_format(fmt)
+    layout = ExportLayout(build_resume_schema(db))
+    batches = iter_rows(db, layout, include_archived, batch_size)
+    return WRITERS[fmt](batches, layout)
+
+
+def _write(chunks: Iterable[bytes], out: BinaryIO) -> int:
+    total = 0
+    for chunk in chunks:
+        out.write(chunk)
+        total += len(chunk)
+    return total
+
+
+def main() -> None:
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Выгрузка резюме")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--out", help="файл (по умолчанию stdout)")
+    parser.add_argument("--active-only", action="store_true",
+                        help="без архивных резюме")
+    parser.add_argument("--batch-size", type=int,
+                        default=settings.RESUME_EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        chunks = export_resumes(
+            db, args.format, not args.active_only, args.batch_size
+        )
+        if args.out:
+            with open(args.out, "wb") as out:
+                size = _write(chunks, out)
+            print(f"{args.out}: {size} bytes", file=sys.stderr)
+        else:
+            _write(chunks, sys.stdout.buffer)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
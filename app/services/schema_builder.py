@@ -1,6 +1,6 @@
 from typing import Dict, Any
 from sqlalchemy.orm import Session
-from models.question_template import QuestionTemplate
+from services.question_flow import question_flow
 
 
 def build_resume_schema(db: Session) -> Dict[str, Any]:
@@ -8,6 +8,7 @@ def build_resume_schema(db: Session) -> Dict[str, Any]:
     Генерирует JSON-Schema по текущему содержимому question_templates.
     Группы (work_experience и т.п.) превращаются во вложенные объекты/массивы.
     """
+    flow = question_flow.get(db)
     root: Dict[str, Any] = {
         "$schema": "https://json-schema.org/draft/2020-12/schema",
         "title": "Resume schema",
@@ -16,7 +17,8 @@ def build_resume_schema(db: Session) -> Dict[str, Any]:
     }
     group_props: Dict[str, Dict[str, Any]] = {}
 
-    for qt in db.query(QuestionTemplate).order_by(QuestionTemplate.priority):
+    for name in flow.order:
+        qt = flow.nodes[name]
         prop = {
             "question": qt.template,
             "priority": qt.priority,
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechKitError(RuntimeError):
+    """Ошибка распознавания на стороне Yandex SpeechKit."""
+
+
+def _parse_body(status: int, body: bytes) -> Dict[str, Any]:
+    """
+    JSON-ответ SpeechKit. HTML-страница прокси (502) или любое другое
+    не-JSON тело превращается в SpeechKitError, а не в 500 приложения.
+    """
+    text = body.decode("utf-8", "replace")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        raise SpeechKitError(f"SpeechKit {status}: {text[:200]!r}")
+    return data
+
+
+class SpeechKitClient:
+    """
+    Клиент Yandex SpeechKit с одной aiohttp-сессией на всё время жизни
+    приложения: keep-alive, ограничение пула и повторы на 5xx.
+
+    Сессия открывается в `lifespan` FastAPI (`start`) и закрывается при
+    остановке (`close`). URL берётся из настроек, поэтому для локальной
+    проверки клиент можно направить на заглушку.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or settings.YC_STT_URL
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=settings.YC_STT_POOL_SIZE,
+            keepalive_timeout=settings.YC_STT_KEEPALIVE,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.YC_STT_TIMEOUT),
+            headers={
+                "Authorization": "Api-Key "
+                f"{settings.YC_API_KEY.get_secret_value()}",
+                "Content-Type": "application/octet-stream",
+            },
+        )
+        logger.info("SpeechKit session opened (%s)", self.url)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("SpeechKit session closed")
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    async def recognize(self, audio_bytes: bytes) -> str:
+        """
+        Отправляет OggOpus в `stt:recognize` и возвращает текст.
+        5xx и обрывы соединения повторяются с экспоненциальной задержкой.
+        """
+        params = {
+            "folderId": settings.YC_FOLDER_ID.get_secret_value(),
+            "lang": "ru-RU",
+            "format": "oggopus",
+            "model": settings.YC_MODEL_VERSION,
+        }
+        session = await self._get_session()
+        attempts = settings.YC_STT_RETRIES + 1
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                async with session.post(
+                    self.url, params=params, data=audio_bytes
+                ) as resp:
+                    if resp.status >= 500 and not last:
+                        logger.warning(
+                            "SpeechKit %s, повтор %d/%d",
+                            resp.status, attempt + 1, attempts - 1,
+                        )
+                    else:
+                        data = _parse_body(resp.status, await resp.read())
+                        if resp.status != 200 or "error_code" in data:
+                            raise SpeechKitError(f"SpeechKit error: {data}")
+                        return data.get("result", "")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                if last:
+                    raise SpeechKitError(f"SpeechKit unavailable: {exc}") from exc
+                logger.warning(
+                    "SpeechKit connection error: %s, повтор %d/%d",
+                    exc, attempt + 1, attempts - 1,
+                )
+            await asyncio.sleep(settings.YC_STT_BACKOFF * 2 ** attempt)
+
+        raise SpeechKitError("SpeechKit: повторы исчерпаны")
+
+
+speechkit_client = SpeechKitClient()
@@ -0,0 +1,49 @@
+"""
+Общие настройки тестов. Запуск из каталога app/:
+
+    pip install -r requirements-dev.txt
+    python -m pytest
+
+Тесты, которым нужна Postgres, берут подключение из тех же переменных
+POSTGRES_*, что и приложение, и пропускаются, если база недоступна.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+# обязательные поля Settings, чтобы core.config импортировался без .env
+for _name in (
+    "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB",
+    "YC_API_KEY", "YC_FOLDER_ID", "GSHEETS_SHEET_ID", "ADMIN_SYNC_TOKEN",
+):
+    os.environ.setdefault(_name, "test")
+os.environ.setdefault("CACHE_BUS_ENABLED", "false")
+os.environ.setdefault("PGCONNECT_TIMEOUT", "3")
+
+
+@pytest.fixture
+def pg_db():
+    """Сессия SQLAlchemy к Postgres; всё, что сделал тест, откатывается."""
+    pytest.importorskip("pydantic_settings")
+    pytest.importorskip("psycopg2")
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+    except OperationalError as exc:
+        db.close()
+        pytest.skip(f"Postgres недоступен: {exc.orig}")
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
@@ -0,0 +1,166 @@
+"""
+Регрессия планов горячих запросов диалога.
+
+Наполняет таблицы синтетическими данными (в транзакции, которая в конце
+откатывается), делает ANALYZE и для каждого запроса из crud смотрит
+EXPLAIN: по таблицам с индексами из 0001_dialog_hot_path_indexes не
+должно быть Seq Scan. Нужна Postgres с применёнными миграциями; без
+неё тесты пропускаются.
+"""
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+import pytest
+
+from conftest import APP_DIR
+
+SEED_TG_BASE = -10**12  # заведомо не пересекается с реальными tg_id
+SEED_USERS = 20000
+SEED_RESUMES_PER_USER = 3
+SEED_MESSAGES = 10
+
+EXPECTED_INDEXES = {
+    "ix_resumes_user_active_updated",
+    "ix_resumes_user_draft",
+    "ix_sessions_user_resume",
+    "ix_answers_session_created",
+}
+
+SEED_SQL = (
+    """
+    INSERT INTO users (tg_id, created_at)
+    SELECT :base - g, now() FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO resumes
+        (user_id, data, insights, status, is_archived, created_at, updated_at)
+    SELECT u.id, '{}'::jsonb, '[]'::jsonb,
+           CASE WHEN k = :per_user THEN 'incomplete' ELSE 'completed' END,
+           k < :per_user,
+           now() - (:per_user - k) * interval '1 day',
+           now() - (:per_user - k) * interval '1 day'
+    FROM users u, generate_series(1, :per_user) k
+    WHERE u.tg_id < :base
+    """,
+    """
+    INSERT INTO sessions (user_id, resume_id, state, created_at)
+    SELECT r.user_id, r.id, 'EMPTY_FLOW', now()
+    FROM resumes r JOIN users u ON u.id = r.user_id
+    WHERE u.tg_id < :base
+    """,
+    """
+    INSERT INTO answers (session_id, role, answer_raw, created_at)
+    SELECT s.id, 'human', 'ответ', now() - g * interval '1 minute'
+    FROM sessions s JOIN users u ON u.id = s.user_id,
+         generate_series(1, :messages) g
+    WHERE u.tg_id < :base
+    """,
+)
+
+
+def _seed(db) -> Tuple[int, int]:
+    from sqlalchemy import text
+
+    params = {
+        "base": SEED_TG_BASE,
+        "users": SEED_USERS,
+        "per_user": SEED_RESUMES_PER_USER,
+        "messages": SEED_MESSAGES,
+    }
+    for sql in SEED_SQL:
+        db.execute(text(sql), params)
+    for table in ("users", "resumes", "sessions", "answers"):
+        db.execute(text(f"ANALYZE {table}"))
+
+    user_id = db.execute(
+        text("SELECT id FROM users WHERE tg_id = :tg"),
+        {"tg": SEED_TG_BASE - SEED_USERS // 2},
+    ).scalar_one()
+    session_id = db.execute(
+        text("SELECT id FROM sessions WHERE user_id = :u LIMIT 1"),
+        {"u": user_id},
+    ).scalar_one()
+    return user_id, session_id
+
+
+def _sql(query) -> str:
+    from sqlalchemy.dialects import postgresql
+
+    return str(query.statement.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True},
+    ))
+
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def _explain(db, sql: str) -> Dict[str, Any]:
+    from sqlalchemy import text
+
+    raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    return raw[0]["Plan"]
+
+
+def _hot_queries(db, user_id: int, session_id: int):
+    from crud.conversation_history import _history_query
+    from crud.dialog import _active_session_query, _current_resume_query
+
+    # запрос → таблицы, где Seq Scan недопустим
+    return {
+        "get_active_session": (
+            _active_session_query(db, user_id).limit(1),
+            {"sessions", "resumes"},
+        ),
+        "get_cv": (
+            _current_resume_query(db, user_id).limit(1),
+            {"resumes"},
+        ),
+        "get_conversation_history": (
+            _history_query(db, session_id, 50),
+            {"answers"},
+        ),
+    }
+
+
+def test_migrations_have_single_root_and_head():
+    pytest.importorskip("alembic.config")  # не каталог app/alembic
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(APP_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(APP_DIR / "alembic"))
+    script = ScriptDirectory.from_config(config)
+    assert script.get_bases() == ["0000_initial_schema"]
+    assert len(script.get_heads()) == 1
+
+
+def test_hot_path_indexes_exist(pg_db):
+    from sqlalchemy import text
+
+    present = set(pg_db.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"
+    )).scalars())
+    assert EXPECTED_INDEXES <= present
+
+
+def test_hot_queries_avoid_seq_scan(pg_db):
+    user_id, session_id = _seed(pg_db)
+    failures = []
+    for name, (query, tables) in _hot_queries(pg_db, user_id,
+                                              session_id).items():
+        plan = _explain(pg_db, _sql(query))
+        # секции answers_yYYYYmMM считаются таблицей answers
+        seq = sorted({
+            n["Relation Name"] for n in _walk(plan)
+            if n["Node Type"] == "Seq Scan"
+            and n.get("Relation Name", "").split("_y")[0] in tables
+        })
+        if seq:
+            failures.append(f"{name}: Seq Scan по {', '.join(seq)}")
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,189 @@
+"""
+FieldPlan против исходного рекурсивного обхода схемы.
+
+Эталон — get_next_question в том виде, в каком он был до FieldPlan:
+сортирует схему и обходит резюме целиком на каждый вызов. На случайных
+схемах (с совпадающими приоритетами, неспрашиваемыми полями, группами)
+и случайных последовательностях правок резюме ответ должен совпадать.
+"""
+import copy
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from agent.utils import _is_filled, _priority_of, get_next_question, plan_for
+
+
+def _reference_props(
+    schema_props: Dict[str, Any],
+    resume_fragment: Dict[str, Any],
+    prefix: str = "",
+) -> List[Tuple[str, str, int]]:
+    candidates: List[Tuple[str, str, int]] = []
+    for field, meta in sorted(
+        schema_props.items(), key=lambda item: _priority_of(item[1])
+    ):
+        if meta.get("type") != "array":
+            if (not _is_filled(resume_fragment.get(field))
+                    and meta["question"] not in ["", "-"]):
+                candidates.append(
+                    (f"{prefix}{field}", meta["question"], _priority_of(meta))
+                )
+            continue
+        group_items_schema = meta["items"]["properties"]
+        group_resume = resume_fragment.get(field, [])
+        if not group_resume:
+            first_field, first_meta = min(
+                group_items_schema.items(), key=lambda i: _priority_of(i[1])
+            )
+            candidates.append((
+                f"{prefix}{field}.{first_field}",
+                first_meta["question"],
+                _priority_of(first_meta),
+            ))
+            continue
+        for item in group_resume:
+            candidates.extend(_reference_props(
+                group_items_schema, item, prefix=f"{prefix}{field}."
+            ))
+    return candidates
+
+
+def reference_next_question(
+    current_resume: Dict[str, Any], resume_schema: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    props = resume_schema.get("properties", {})
+    if current_resume.get("resume_pdf") == "ignored":
+        props = {k: v for k, v in props.items() if k != "resume_pdf"}
+    candidates = _reference_props(props, current_resume)
+    if not candidates:
+        return None
+    field, question, priority = min(candidates, key=lambda x: x[2])
+    return {"field_name": field, "question": question, "priority": priority}
+
+
+VALUES = (None, "", "  ", "значение", 0, 7, False, True, [], ["a"], {}, {"k": 1})
+
+
+def _meta(rng: random.Random, name: str) -> Dict[str, Any]:
+    meta: Dict[str, Any] = {
+        "type": "string",
+        "question": rng.choice([f"Вопрос {name}?"] * 6 + ["", "-"]),
+    }
+    if rng.random() < 0.9:
+        meta["priority"] = rng.randint(1, 6)  # много совпадений
+    return meta
+
+
+def random_schema(rng: random.Random) -> Dict[str, Any]:
+    props: Dict[str, Any] = {}
+    for i in range(rng.randint(1, 8)):
+        name = f"f{i}"
+        if rng.random() < 0.3:
+            props[name] = {
+                "type": "array",
+                "items": {"type": "object", "properties": {
+                    f"c{j}": _meta(rng, f"{name}.c{j}")
+                    for j in range(rng.randint(1, 4))
+                }},
+            }
+        else:
+            props[name] = _meta(rng, name)
+    return {"type": "object", "properties": props}
+
+
+def _groups(schema: Dict[str, Any]) -> Dict[str, List[str]]:
+    return {
+        name: list(meta["items"]["properties"])
+        for name, meta in schema["properties"].items()
+        if meta.get("type") == "array"
+    }
+
+
+def _item(rng: random.Random, children: List[str]) -> Dict[str, Any]:
+    return {c: rng.choice(VALUES) for c in children if rng.random() < 0.8}
+
+
+def random_resume(rng: random.Random, schema: Dict[str, Any]) -> Dict[str, Any]:
+    groups = _groups(schema)
+    resume: Dict[str, Any] = {}
+    for name in schema["properties"]:
+        if rng.random() < 0.2:
+            continue
+        if name in groups:
+            resume[name] = [
+                _item(rng, groups[name]) for _ in range(rng.randint(0, 3))
+            ]
+        else:
+            resume[name] = rng.choice(VALUES)
+    return resume
+
+
+def random_edit(
+    rng: random.Random, schema: Dict[str, Any], resume: Dict[str, Any]
+) -> None:
+    """Одна правка резюме — как её делают инструменты агента."""
+    groups = _groups(schema)
+    name = rng.choice(list(schema["properties"]))
+    if name not in groups:
+        value = rng.choice(VALUES)
+        resume[name] = value
+        return
+
+    items = resume.setdefault(name, [])
+    op = rng.choice(("add", "remove", "set", "replace"))
+    if op == "add":
+        item = _item(rng, groups[name])
+        index = rng.randint(0, len(items))
+        items.insert(index, item)
+    elif op == "remove" and items:
+        index = rng.randrange(len(items))
+        items.pop(index)
+    elif op == "set" and items:
+        index = rng.randrange(len(items))
+        child = rng.choice(groups[name])
+        value = rng.choice(VALUES)
+        items[index][child] = value
+    else:
+        new_items = [_item(rng, groups[name]) for _ in range(rng.randint(0, 3))]
+        resume[name] = new_items
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_reference_scan(seed):
+    rng = random.Random(seed)
+    schema = random_schema(rng)
+    resume = random_resume(rng, schema)
+    assert get_next_question(resume, schema) == reference_next_question(
+        resume, schema
+    )
+
+    for _ in range(40):
+        random_edit(rng, schema, resume)
+        assert get_next_question(resume, schema) == reference_next_question(
+            resume, schema
+        )
+
+
+def test_tie_inside_group_follows_item_order():
+    schema = {"properties": {"jobs": {
+        "type": "array",
+        "items": {"properties": {
+            "a": {"question": "A?", "priority": 5},
+            "b": {"question": "B?", "priority": 5},
+        }},
+    }}}
+    resume = {"jobs": [{"a": "есть"}, {"b": "есть"}]}
+    assert get_next_question(resume, schema)["field_name"] == "jobs.b"
+    assert reference_next_question(resume, schema)["field_name"] == "jobs.b"
+
+
+def test_plan_is_cached_by_schema_content():
+    schema = random_schema(random.Random(1))
+    assert plan_for(schema) is plan_for(copy.deepcopy(schema))
+
+    changed = copy.deepcopy(schema)
+    changed["properties"]["extra"] = {"question": "Ещё?", "priority": 0}
+    assert plan_for(changed) is not plan_for(schema)
+    assert get_next_question({}, changed)["field_name"] == "extra"
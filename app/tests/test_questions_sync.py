@@ -0,0 +1,139 @@
+"""
+Дифф шаблонов вопросов: diff_templates и apply_diff.
+
+Строки берутся из локальных фикстур через те же источники, что и при
+синхронизации (CsvFileSource / JsonFileSource), поэтому проверяется и
+разбор листа. apply_diff проверяется на Postgres в откатываемой
+транзакции.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("psycopg2")  # db.session создаёт engine при импорте
+
+from models.question_template import QuestionTemplate  # noqa: E402
+from services.question_flow import TEMPLATE_ATTRS  # noqa: E402
+from services.question_sources import (  # noqa: E402
+    CsvFileSource,
+    JsonFileSource,
+)
+from services.questions_sync import apply_diff, diff_templates  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures"
+CSV_FIXTURE = FIXTURES / "questions.csv"
+JSON_FIXTURE = FIXTURES / "questions.json"
+
+
+def _rows() -> List[Dict[str, str]]:
+    return CsvFileSource(str(CSV_FIXTURE)).read_rows()
+
+
+def _templates(rows: List[Dict[str, str]]) -> List[QuestionTemplate]:
+    return [QuestionTemplate.from_sheet_row(row) for row in rows]
+
+
+def _values(qt: Any) -> Dict[str, Any]:
+    return {name: getattr(qt, name) for name in TEMPLATE_ATTRS}
+
+
+def test_csv_and_json_fixtures_match():
+    csv_rows = CsvFileSource(str(CSV_FIXTURE)).read_rows()
+    json_rows = JsonFileSource(str(JSON_FIXTURE)).read_rows()
+    assert ([_values(qt) for qt in _templates(csv_rows)]
+            == [_values(qt) for qt in _templates(json_rows)])
+
+
+def test_empty_table_inserts_everything():
+    diff = diff_templates([], _rows())
+    assert [v["field_name"] for v in diff.insert] == [
+        "first_name", "work_status", "work_experience.company", "skills",
+    ]
+    assert diff.update == [] and diff.delete == []
+    skills = diff.insert[-1]
+    assert skills["buttons"] == ["Python", "SQL", "Docker"]
+    assert skills["multi_select"] is True and skills["is_last"] is True
+
+
+def test_unchanged_sheet_gives_empty_diff():
+    rows = _rows()
+    assert not diff_templates(_templates(rows), rows)
+
+
+def test_changed_row_is_updated():
+    rows = _rows()
+    current = _templates(rows)
+    rows[1] = {**rows[1], "label": "Статус поиска", "buttons": ""}
+    diff = diff_templates(current, rows)
+    assert diff.insert == [] and diff.delete == []
+    assert [v["field_name"] for v in diff.update] == ["work_status"]
+    assert diff.update[0]["label"] == "Статус поиска"
+    assert diff.update[0]["buttons"] is None
+
+
+def test_missing_row_is_deleted_and_new_row_inserted():
+    rows = _rows()
+    current = _templates(rows)
+    rows = [r for r in rows if r["field_name"] != "skills"]
+    rows.append({**rows[0], "field_name": "last_name", "label": "Фамилия",
+                 "priority": "15", "template": "Ваша фамилия?"})
+    diff = diff_templates(current, rows)
+    assert diff.delete == ["skills"]
+    assert [v["field_name"] for v in diff.insert] == ["last_name"]
+    assert diff.update == []
+
+
+def test_duplicate_field_name_is_rejected(tmp_path):
+    items = json.loads(JSON_FIXTURE.read_text(encoding="utf-8"))
+    items.append({**items[0], "label": "Имя ещё раз"})
+    path = tmp_path / "questions.json"
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(ValueError, match="first_name"):
+        diff_templates([], JsonFileSource(str(path)).read_rows())
+
+
+@pytest.mark.parametrize("name, content", [
+    ("questions.csv", CSV_FIXTURE.read_text(encoding="utf-8").splitlines()[0]),
+    ("questions.json", "[]"),
+])
+def test_empty_sheet_is_rejected(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content + "\n", encoding="utf-8")
+    source = (CsvFileSource if name.endswith(".csv") else JsonFileSource)(
+        str(path)
+    )
+    assert source.read_rows() == []
+    current = _templates(_rows())
+    with pytest.raises(ValueError, match="Пустой лист"):
+        diff_templates(current, source.read_rows())
+
+
+def test_apply_diff_brings_table_to_sheet(pg_db):
+    rows = _rows()
+    pg_db.query(QuestionTemplate).delete(synchronize_session=False)
+    # в таблице: одна лишняя строка и одна устаревшая
+    stale = {**rows[0], "label": "Старое имя"}
+    extra = {**rows[0], "field_name": "obsolete", "priority": "99"}
+    apply_diff(pg_db, diff_templates([], [stale, extra]))
+    pg_db.flush()
+
+    diff = diff_templates(pg_db.query(QuestionTemplate).all(), rows)
+    assert diff.delete == ["obsolete"]
+    assert [v["field_name"] for v in diff.update] == ["first_name"]
+    assert len(diff.insert) == len(rows) - 1
+
+    apply_diff(pg_db, diff)
+    pg_db.flush()
+    pg_db.expire_all()
+    stored = {
+        qt.field_name: _values(qt)
+        for qt in pg_db.query(QuestionTemplate).all()
+    }
+    assert stored == {
+        qt.field_name: _values(qt) for qt in _templates(rows)
+    }
+    assert not diff_templates(pg_db.query(QuestionTemplate).all(), rows)
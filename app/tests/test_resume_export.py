@@ -0,0 +1,85 @@
+"""
+Раскладка выгрузки резюме по колонкам (ExportLayout) и CSV без БД.
+"""
+import csv
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("sqlalchemy")
+
+# все модели, как в alembic/env.py: у Resume связи на Session и др.
+from models import (  # noqa: E402,F401
+    user,
+    resume,
+    session,
+    answer,
+    question_template,
+    question_sync,
+)
+from services.resume_export import (  # noqa: E402
+    META_COLUMNS,
+    ExportLayout,
+    write_csv,
+)
+
+# поля шаблона, названные как служебные колонки
+SCHEMA = {"properties": {
+    "first_name": {"type": "string"},
+    "status": {"type": "string"},
+    "created_at": {"type": "string"},
+    "insights": {"type": "string"},
+    "work_experience": {"type": "array", "items": {"properties": {}}},
+}}
+
+CREATED = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+META = {
+    "resume_id": 1, "user_id": 2, "tg_id": 3,
+    "user_first_name": "Иван", "user_last_name": None, "user_phone": None,
+    "user_birthday": None, "status": "completed", "is_archived": False,
+    "created_at": CREATED, "updated_at": CREATED,
+}
+DATA = {
+    "first_name": "Ваня",
+    "status": "ищу работу",
+    "created_at": "вчера",
+    "insights": "поле шаблона",
+    "work_experience": [{"company": "Рога и копыта"}],
+}
+
+
+def _row():
+    return tuple(META[name] for name, _ in META_COLUMNS) + (DATA, ["факт"])
+
+
+def test_columns_are_unique():
+    layout = ExportLayout(SCHEMA)
+    assert len(layout.columns) == len(set(layout.columns))
+    assert layout.columns[len(META_COLUMNS):] == [
+        "data.first_name", "data.status", "data.created_at",
+        "data.insights", "data.work_experience", "insights",
+    ]
+
+
+def test_resume_fields_do_not_overwrite_metadata():
+    item = ExportLayout(SCHEMA).flatten(_row())
+    assert item["status"] == "completed"
+    assert item["created_at"] == CREATED
+    assert item["insights"] == ["факт"]
+    assert item["data.status"] == "ищу работу"
+    assert item["data.created_at"] == "вчера"
+    assert item["data.insights"] == "поле шаблона"
+    assert item["data.work_experience"] == [{"company": "Рога и копыта"}]
+
+
+def test_csv_header_matches_rows():
+    layout = ExportLayout(SCHEMA)
+    out = b"".join(write_csv([[layout.flatten(_row())]], layout))
+    header, row = list(csv.reader(io.StringIO(out.decode())))
+    assert header == layout.columns
+    record = dict(zip(header, row))
+    assert record["status"] == "completed"
+    assert record["data.status"] == "ищу работу"
+    assert record["created_at"] == CREATED.isoformat()
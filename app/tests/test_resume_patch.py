@@ -0,0 +1,55 @@
+"""
+Частичные JSONB-обновления резюме (crud.resume) на Postgres.
+"""
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+# все модели, как в alembic/env.py: у Resume связи на Session и др.
+from models import (  # noqa: E402,F401
+    user,
+    resume,
+    session,
+    answer,
+    question_template,
+    question_sync,
+)
+
+
+def _resume(db):
+    from models.resume import Resume
+    from models.user import User
+
+    owner = User(tg_id=-10**12 - 1)
+    db.add(owner)
+    db.flush()
+    cv = Resume(user_id=owner.id, status="incomplete", is_archived=False,
+                data={"work_experience": [{"id": "a"}]})
+    db.add(cv)
+    db.flush()
+    return cv
+
+
+def test_append_returns_new_length(pg_db):
+    from crud.resume import append_resume_list_item
+
+    cv = _resume(pg_db)
+    assert append_resume_list_item(
+        pg_db, cv, "work_experience", {"id": "b"}, prepend=True
+    ) == 2
+    assert [i["id"] for i in cv.data["work_experience"]] == ["b", "a"]
+
+
+def test_append_to_missing_resume_returns_none(pg_db):
+    from crud.resume import (
+        append_resume_list_item,
+        remove_resume_list_item,
+    )
+
+    cv = _resume(pg_db)
+    missing_id = cv.id + 10**6
+    assert append_resume_list_item(
+        pg_db, missing_id, "work_experience", {"id": "b"}
+    ) is None
+    assert remove_resume_list_item(pg_db, missing_id,
+                                   "work_experience", 0) is False
@@ -0,0 +1,144 @@
+"""
+SpeechKitClient против локальной заглушки stt:recognize (aiohttp.web).
+
+Заглушка отвечает по сценарию: 5xx, затем 200; обрыв соединения, затем
+200; HTML вместо JSON. Задержка между повторами обнулена.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+pytest.importorskip("pydantic_settings")
+
+from aiohttp import web  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from services.speechkit import SpeechKitClient, SpeechKitError  # noqa: E402
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+HTML_502 = (
+    "<html><head><title>502 Bad Gateway</title></head>"
+    "<body><center><h1>502 Bad Gateway</h1></center></body></html>"
+)
+
+
+@pytest.fixture(autouse=True)
+def _fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "YC_STT_BACKOFF", 0.0)
+    monkeypatch.setattr(settings, "YC_STT_RETRIES", 3)
+
+
+@asynccontextmanager
+async def stub_server(script: List[Handler]):
+    """
+    Заглушка stt:recognize: i-й запрос обслуживает script[i] (последний
+    обработчик — для всех остальных). Отдаёт (url, список запросов).
+    """
+    calls: List[web.Request] = []
+
+    async def recognize(request: web.Request) -> web.StreamResponse:
+        await request.read()
+        calls.append(request)
+        handler = script[min(len(calls), len(script)) - 1]
+        return await handler(request)
+
+    app = web.Application()
+    app.router.add_post("/speech/v1/stt:recognize", recognize)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/speech/v1/stt:recognize", calls
+    finally:
+        await runner.cleanup()
+
+
+async def ok(request: web.Request) -> web.Response:
+    return web.json_response({"result": "привет"})
+
+
+async def unavailable(request: web.Request) -> web.Response:
+    return web.json_response({"error_code": "UNAVAILABLE"}, status=503)
+
+
+async def drop(request: web.Request) -> web.Response:
+    request.transport.abort()  # клиент получит ServerDisconnectedError
+    return web.Response()
+
+
+async def bad_gateway(request: web.Request) -> web.Response:
+    return web.Response(text=HTML_502, status=502, content_type="text/html")
+
+
+async def forbidden(request: web.Request) -> web.Response:
+    return web.Response(text="<h1>Forbidden</h1>", status=403,
+                        content_type="text/html")
+
+
+async def _recognize(url: str) -> str:
+    client = SpeechKitClient(url)
+    try:
+        return await client.recognize(b"OggS")
+    finally:
+        await client.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_retries_5xx_then_succeeds():
+    async def scenario():
+        async with stub_server([unavailable, unavailable, ok]) as (url, calls):
+            assert await _recognize(url) == "привет"
+            assert len(calls) == 3
+
+    run(scenario())
+
+
+def test_retries_dropped_connection():
+    async def scenario():
+        async with stub_server([drop, ok]) as (url, calls):
+            assert await _recognize(url) == "привет"
+            assert len(calls) == 2
+
+    run(scenario())
+
+
+def test_html_502_after_retries_is_speechkit_error():
+    async def scenario():
+        async with stub_server([bad_gateway]) as (url, calls):
+            with pytest.raises(SpeechKitError, match="502"):
+                await _recognize(url)
+            assert len(calls) == settings.YC_STT_RETRIES + 1
+
+    run(scenario())
+
+
+def test_html_4xx_is_speechkit_error_without_retry():
+    async def scenario():
+        async with stub_server([forbidden]) as (url, calls):
+            with pytest.raises(SpeechKitError, match="403"):
+                await _recognize(url)
+            assert len(calls) == 1
+
+    run(scenario())
+
+
+def test_error_code_in_json_is_speechkit_error():
+    async def error(request: web.Request) -> web.Response:
+        return web.json_response({"error_code": "BAD_REQUEST",
+                                  "error_message": "audio"}, status=400)
+
+    async def scenario():
+        async with stub_server([error]) as (url, _):
+            with pytest.raises(SpeechKitError, match="BAD_REQUEST"):
+                await _recognize(url)
+
+    run(scenario())
@@ -1,13 +1,18 @@
+import asyncio
+
 from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
-import httpx
 
 from settings import settings
 from filters.chat_filters import AdminFilter
+from middlewares.outbound import outbound_scheduler
+from utils.api_client import ApiError, api_client
 
 router = Router()
-INSIGHTS_URL = f"{settings.bots.app_url}/api/v1/resume"
+
+SYNC_POLL_INTERVAL = 2.0    # секунд между запросами статуса
+SYNC_POLL_ATTEMPTS = 150
 
 
 @router.message(AdminFilter(), Command("admin"))
@@ -15,6 +20,7 @@ async def admin_cmd(msg: Message):
     txt = ('Доступные команды:\n' +
            '/update_questions -> Обновить базу вопросов\n'
            '/health -> Проверить состояние API\n'
+           '/queue -> Метрики очереди исходящих\n'
            )
     await msg.answer(txt)
 
@@ -22,28 +28,52 @@ async def admin_cmd(msg: Message):
 @router.message(AdminFilter(), Command("update_questions"))
 async def update_questions_cmd(msg: Message):
     bot_msg = await msg.answer("⏳ Обновляю вопросы из Google Sheets…")
-    async with httpx.AsyncClient(timeout=30.0) as cli:
-        resp = await cli.post(
-            f"{settings.bots.app_url}/api/v1/admin/update-questions",
-            json={"token": str(settings.bots.admin_id)},
-        )
+    token = str(settings.bots.admin_id)
+    try:
+        job = await api_client.update_questions(token)
+        for _ in range(SYNC_POLL_ATTEMPTS):
+            if job["status"] not in ("pending", "running"):
+                break
+            await asyncio.sleep(SYNC_POLL_INTERVAL)
+            job = await api_client.question_sync_status(job["job_id"], token)
+    except ApiError as exc:
+        await bot_msg.edit_text(f"⚠️ Ошибка: {exc.text}")
+        return
 
-    if resp.status_code == 200:
-        cnt = resp.json()["inserted"]
-        await bot_msg.edit_text(f"✅ Готово! Заменено {cnt} вопросов.")
+    if job["status"] == "failed":
+        await bot_msg.edit_text(f"⚠️ Ошибка: {job['error']}")
+    elif job["status"] != "done":
+        await bot_msg.edit_text(
+            f"⏳ Синхронизация #{job['job_id']} ещё идёт, проверьте позже."
+        )
     else:
-        await bot_msg.edit_text(f"⚠️ Ошибка: {resp.text}")
+        await bot_msg.edit_text(
+            "✅ Готово! "
+            f"Добавлено {job['inserted']}, изменено {job['updated']}, "
+            f"удалено {job['deleted']} вопросов."
+        )
 
 
 @router.message(AdminFilter(), Command(commands=["health"]))
 async def health_command(message: Message):
-    url = f"{settings.bots.app_url}/api/v1/health_check"
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get(url)
-    status = "✅ API работает" if resp.status_code == 200 else "❌ Нет связи"
+    ok = await api_client.health()
+    status = "✅ API работает" if ok else "❌ Нет связи"
     await message.answer(status)
 
 
+@router.message(AdminFilter(), Command("queue"))
+async def queue_command(message: Message):
+    stats = outbound_scheduler.snapshot()
+    await message.answer(
+        "📤 Очередь исходящих:\n"
+        f"• отправлено: {stats['sent']}\n"
+        f"• в очереди: {stats['depth']}\n"
+        f"• RetryAfter: {stats['retries']}\n"
+        f"• ожидание p50/p95/max: {stats['wait_p50']:.2f}/"
+        f"{stats['wait_p95']:.2f}/{stats['wait_max']:.2f} с"
+    )
+
+
 @router.message(Command("insights"))
 async def get_insights_cmd(msg: Message):
     """
@@ -56,16 +86,14 @@ async def get_insights_cmd(msg: Message):
         await msg.answer(f"Использование: /insights для {tg_id}")
 
     await msg.answer("⏳ Запрашиваю инсайты…")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(f"{INSIGHTS_URL}/{tg_id}/insight")
-
-    if resp.status_code == 200:
-        data = resp.json()
-        facts = data["insights"]
-        if facts:
-            formatted = "\n".join(f"• {fact}" for fact in facts)
-            await msg.answer(f"📝 Факты о пользователе:\n{formatted}")
-        else:
-            await msg.answer("ℹ️ Фактов пока нет")
+    try:
+        facts = await api_client.get_insights(tg_id)
+    except ApiError as exc:
+        await msg.answer(f"❌ Ошибка: {exc.text}")
+        return
+
+    if facts:
+        formatted = "\n".join(f"• {fact}" for fact in facts)
+        await msg.answer(f"📝 Факты о пользователе:\n{formatted}")
     else:
-        await msg.answer(f"❌ Ошибка: {resp.text}")
+        await msg.answer("ℹ️ Фактов пока нет")
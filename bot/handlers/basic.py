@@ -1,11 +1,10 @@
-import httpx
 from aiogram import Router
 from aiogram.enums import ParseMode
 from aiogram.filters import Command
 from aiogram.types import Message
 
 from keyboards.reply import get_main_kb, remove_kb
-from settings import settings
+from utils.api_client import ApiError, api_client
 
 router = Router()
 
@@ -13,13 +12,9 @@ router = Router()
 @router.message(Command("start"))
 async def start_command(message: Message):
     """Регистрирует пользователя в бэкэнде и приветствует его."""
-    url = f"{settings.bots.app_url}/api/v1/auth/tg"
-    payload = {"tg_id": message.from_user.id}
-
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.post(url, json=payload)
-
-    if resp.status_code != 200:
+    try:
+        await api_client.auth_tg(message.from_user.id)
+    except ApiError:
         await message.answer("⚠️ Сервис временно недоступен.")
         return
 
@@ -4,11 +4,11 @@ from aiogram.enums import ParseMode
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from keyboards.inline import consent_kb
-from handlers.resume import _check_consent
-from settings import settings
+from middlewares.typing import typing_service
+from utils.api_client import ApiError, api_client
+from utils.debounce import agent_debouncer
 
 router = Router()
-AGENT_ENDPOINT = f"{settings.bots.app_url}/api/v1/dialog/agent"
 
 @router.message(F.text)
 async def unknown_message(message: Message, state: FSMContext):
@@ -19,7 +19,7 @@ async def unknown_message(message: Message, state: FSMContext):
         '<a href="https://tomoru.team/useragreement">ссылке</a>\n\n'
         "Вы согласны с этим документом?"
     )
-    if not await _check_consent(message.from_user.id):
+    if not await api_client.check_consent(message.from_user.id):
         await message.answer(
             consent_txt,
             parse_mode=ParseMode.HTML,
@@ -27,19 +27,21 @@ async def unknown_message(message: Message, state: FSMContext):
             disable_web_page_preview=True,
         )
         return
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            resp = await client.post(
-                AGENT_ENDPOINT,
-                json={
-                    "message": message.text,
-                    "user_id": message.from_user.id,
-                }
+
+    async def reply(text: str) -> None:
+        try:
+            async with typing_service.typing(message.bot, message.chat.id):
+                answer = await api_client.ask_agent(message.from_user.id, text)
+        except ApiError:
+            answer = "Ошибка ассистента"
+        except httpx.ReadTimeout:
+            answer = (
+                "Извините, ассистент не ответил вовремя. "
+                "Попробуйте ещё раз."
             )
-            answer = resp.json().get("answer", "Ошибка ассистента")
-    except httpx.ReadTimeout:
-        answer = "Извините, ассистент не ответил вовремя. Попробуйте ещё раз."
-    except Exception as e:
-        answer = f"Ошибка ассистента: {type(e).__name__}"
+        except Exception as e:
+            answer = f"Ошибка ассистента: {type(e).__name__}"
+
+        await message.answer(answer, parse_mode="Markdown")
 
-    await message.answer(answer, parse_mode="Markdown")
+    await agent_debouncer.submit(message.chat.id, message.text, reply)
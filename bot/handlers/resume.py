@@ -1,6 +1,4 @@
 from typing import Any, Dict, List
-import asyncio
-import httpx
 from aiogram import Bot, F, Router
 from aiogram.enums import ParseMode
 from aiogram.fsm.context import FSMContext
@@ -11,7 +9,9 @@ from keyboards.inline import (
     resume_completed_kb,
     resume_reset_or_continue_kb,
 )
-from settings import settings
+from middlewares.typing import typing_service
+from utils.api_client import ApiError, api_client, consent_cache
+from utils.debounce import agent_debouncer
 from utils.states import DialogSG
 
 router = Router()
@@ -32,29 +32,21 @@ async def pdf_resume_cb(message: Message, bot: Bot, state: FSMContext) -> None:
       • иначе (нужно уточнение) – переключаем общение на агента.
     """
     status_msg = await message.answer("⏳ Распознаю резюме, подождите...")
-    tg_id = str(message.from_user.id)
+    tg_id = message.from_user.id
 
     # — скачиваем файл из Telegram —
     doc = message.document
     file = await bot.get_file(doc.file_id)
     raw = await bot.download_file(file.file_path)
-    files = {"file": ("resume.pdf", raw, "application/pdf")}
 
-    async with httpx.AsyncClient(timeout=120.0) as cli:
-        resp = await cli.post(
-            f"{settings.bots.app_url}/api/v1/dialog/pdf",
-            data={"tg_id": tg_id},
-            files=files,
-        )
-
-    if resp.status_code != 200:
+    try:
+        data = await api_client.upload_pdf(tg_id, raw)
+    except ApiError:
         await status_msg.edit_text(
             "⚠️ Не удалось распознать PDF. Попробуйте ещё раз."
         )
         return
 
-    data = resp.json()
-
     # — готовый CV из PDF —
     if "cv_markdown" in data:
         await _send_long(
@@ -128,33 +120,14 @@ async def _ask_agent(tg_id: int, text: str, message: Message) -> str:
     Унифицированная оболочка: шлём сообщение ассистенту
     и возвращаем его ответ (строка).
     """
-    stop_typing = asyncio.Event()
-    asyncio.create_task(send_typing_periodically(message, stop_typing))
-    async with httpx.AsyncClient(timeout=120.0) as cli:
-        resp = await cli.post(
-            f"{settings.bots.app_url}/api/v1/dialog/agent",
-            json={"user_id": tg_id, "message": text},
-        )
-    if resp.status_code != 200:
-        return (
-            "⚠️ Извините, сервис временно недоступен. "
-            "Попробуйте повторить запрос чуть позже."
-        )
-    stop_typing.set()
-    return resp.json().get("answer") or "…"
-
-
-# ────────────────────────── согласия ──────────────────────────────
-
-async def _check_consent(tg_id: int) -> bool:
-    """True ⇢ пользователь принял оба юридических согласия."""
-    url = f"{settings.bots.app_url}/api/v1/auth/tg"
-    async with httpx.AsyncClient(timeout=5.0) as cli:
-        resp = await cli.post(url, json={"tg_id": tg_id})
-    if resp.status_code != 200:
-        return False
-    user: Dict[str, Any] = resp.json()["user"]
-    return bool(user.get("pdn_agreed") and user.get("offer_agreed"))
+    async with typing_service.typing(message.bot, message.chat.id):
+        try:
+            return await api_client.ask_agent(tg_id, text)
+        except ApiError:
+            return (
+                "⚠️ Извините, сервис временно недоступен. "
+                "Попробуйте повторить запрос чуть позже."
+            )
 
 
 # ────────────────────────── вход в диалог ─────────────────────────
@@ -174,7 +147,6 @@ async def _start_agent_flow(
       • выводим его ответ,
       • переключаем FSM в waiting_for_answer.
     """
-    await bot.send_chat_action(chat_id, "typing")
     answer = await _ask_agent(tg_id, initial_prompt, message)
     await _send_long(chat_id, answer, bot)
     await state.set_state(DialogSG.waiting_for_answer)
@@ -192,18 +164,12 @@ async def _begin_dialog(
     «📝 Заполнить резюме»: готовое, частичное или запуск нового
     диалога с ассистентом.
     """
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.bots.app_url}/api/v1/dialog/next",
-            json={"user_id": tg_id},
-            timeout=10.0,
-        )
-    if resp.status_code != 200:
+    try:
+        data: Dict[str, Any] = await api_client.dialog_next(tg_id)
+    except ApiError:
         await bot.send_message(chat_id, "⚠️ Сервис временно недоступен.")
         return
 
-    data: Dict[str, Any] = resp.json()
-
     # ── уже готовое резюме ────────────────────────────────────────
     if data.get("cv_markdown") and "resume_id" not in data:
         await _send_long(
@@ -247,7 +213,7 @@ async def start_dialog(message: Message, bot: Bot, state: FSMContext) -> None:
         '<a href="https://tomoru.team/useragreement">ссылке</a>\n\n'
         "Вы согласны с этим документом?"
     )
-    if not await _check_consent(message.from_user.id):
+    if not await api_client.check_consent(message.from_user.id):
         await message.answer(
             consent_txt,
             parse_mode=ParseMode.HTML,
@@ -266,6 +232,7 @@ async def consent_cb(
 ) -> None:
     await query.answer()
     if query.data.endswith(":no"):
+        await consent_cache.invalidate(query.from_user.id)
         await query.message.answer(
             "😔 Без согласия мы не сможем продолжить.\n"
             "При желании нажмите «📝 Заполнить резюме» ещё раз.",
@@ -273,9 +240,10 @@ async def consent_cb(
         await query.message.delete_reply_markup()
         return
 
-    url = f"{settings.bots.app_url}/api/v1/users/consent"
-    async with httpx.AsyncClient(timeout=5.0) as cli:
-        await cli.post(url, json={"tg_id": query.from_user.id, "agree": True})
+    try:
+        await api_client.set_consent(query.from_user.id, True)
+    except ApiError:
+        pass
     await query.message.delete_reply_markup()
 
     await _begin_dialog(query.message.chat.id, query.from_user.id, bot, state, query.message)
@@ -283,22 +251,17 @@ async def consent_cb(
 
 # ────────────────────────── поток общения ─────────────────────────
 
-async def send_typing_periodically(message: Message, stop_event: asyncio.Event):
-    """Send typing indicator every 4 seconds until stop_event is set"""
-    while not stop_event.is_set():
-        try:
-            await message.bot.send_chat_action(message.chat.id, "typing")
-            await asyncio.wait_for(stop_event.wait(), timeout=4.0)
-        except asyncio.TimeoutError:
-            continue # Timeout is expected, continue sending typing
-
 @router.message(DialogSG.waiting_for_answer)
 async def relay_to_agent(message: Message, state: FSMContext) -> None:
     """
     Любое пользовательское сообщение → ассистенту, ответ – обратно.
+    Быстрые сообщения подряд склеиваются в один ход агента.
     """
-    answer = await _ask_agent(message.from_user.id, message.text or "", message)
-    await _send_long(message.chat.id, answer, message.bot)
+    async def reply(text: str) -> None:
+        answer = await _ask_agent(message.from_user.id, text, message)
+        await _send_long(message.chat.id, answer, message.bot)
+
+    await agent_debouncer.submit(message.chat.id, message.text or "", reply)
 
 
 # ─────────────────── reset / continue черновика ───────────────────
@@ -313,13 +276,9 @@ async def reset_resume(
     await query.answer()
     await state.clear()
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.bots.app_url}/api/v1/dialog/reset",
-            json={"user_id": query.from_user.id},
-            timeout=10.0,
-        )
-    if resp.status_code != 200:
+    try:
+        await api_client.dialog_reset(query.from_user.id)
+    except ApiError:
         await query.message.answer("⚠️ Не удалось начать заново.")
         return
 
@@ -346,13 +305,9 @@ async def continue_resume(
     await query.answer()
     resume_id = int(query.data.split(":")[-1])
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{settings.bots.app_url}/api/v1/dialog/resume-continue",
-            json={"resume_id": resume_id, "user_id": query.from_user.id},
-            timeout=10.0,
-        )
-    if resp.status_code != 200:
+    try:
+        await api_client.resume_continue(query.from_user.id, resume_id)
+    except ApiError:
         await query.message.answer("⚠️ Ошибка при продолжении заполнения.")
         return
 
@@ -1,80 +1,73 @@
+import io
 import logging
-import tempfile
-from pathlib import Path
 
-import httpx
 from aiogram import F, Router
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from settings import settings
+from middlewares.typing import typing_service
+from utils.api_client import ApiError, api_client
+from utils.cache import TTLCache
+from utils.debounce import agent_debouncer
 
 router = Router()
 logger = logging.getLogger(__name__)
 
-ASR_ENDPOINT = f"{settings.bots.app_url}/api/v1/dialog/audio/"
-AGENT_ENDPOINT = f"{settings.bots.app_url}/api/v1/dialog/agent"
-HTTP_TIMEOUT = 60.0
+# file_unique_id → текст; пересланные голосовые не распознаём повторно
+transcript_cache: TTLCache[str] = TTLCache(
+    ttl=settings.bots.transcript_cache_ttl, maxsize=2048
+)
 
 
-async def _download_telegram_file(bot, file_id: str,
-                                  suffix: str = ".ogg") -> Path:
-    """Скачивает файл Telegram во временную папку и
-    возвращает путь к нему."""
-    tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
-    path = Path(tmp.name)
-    await bot.download(file_id, destination=path)
-    tmp.close()
-    return path
+class VoiceTooLarge(Exception):
+    """Голосовое больше лимита VOICE_MAX_BYTES."""
 
 
-async def _send_to_asr(file_path: Path) -> str:
-    """Отправляет файл на сервис ASR и возвращает текст."""
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as cli:
-        with file_path.open("rb") as fh:
-            resp = await cli.post(
-                ASR_ENDPOINT,
-                files={
-                    "file": (file_path.name,
-                             fh,
-                             "application/octet-stream")
-                },
-            )
+async def _download_telegram_file(bot, media) -> io.BytesIO:
+    """Скачивает файл Telegram в память, не превышая лимит размера."""
+    limit = settings.bots.voice_max_bytes
+    if media.file_size and media.file_size > limit:
+        raise VoiceTooLarge(media.file_size)
+    buf = await bot.download(media.file_id)
+    if buf.getbuffer().nbytes > limit:
+        raise VoiceTooLarge(buf.getbuffer().nbytes)
+    buf.seek(0)
+    return buf
 
-    if resp.status_code != 200:
-        logger.error("ASR %s → %s", resp.status_code, resp.text)
-        raise RuntimeError("ASR service error")
 
-    return resp.json().get("text", "")
+async def _send_to_asr(audio: io.BytesIO) -> str:
+    """Отправляет аудио из памяти на сервис ASR и возвращает текст."""
+    return await api_client.recognize(audio)
 
 
 async def _send_to_agent(transcript: str, user_id: int) -> str:
     """Отправляет текст на сервис агента и возвращает ответ."""
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        resp = await client.post(
-            AGENT_ENDPOINT,
-            json={
-                "message": transcript,
-                "user_id": user_id,
-            }
-        )
-    if resp.status_code != 200:
-        logger.error("AGENT %s → %s", resp.status_code, resp.text)
+    try:
+        return await api_client.ask_agent(user_id, transcript)
+    except ApiError:
         return "Ошибка ассистента"
-    return resp.json().get("answer", "Ошибка ассистента")
 
 
 @router.message(F.voice | F.audio)
 async def voice_message(message: Message, state: FSMContext) -> None:
     """Обрабатывает голосовые и аудио-сообщения."""
     bot = message.bot
-    await bot.send_chat_action(message.chat.id, "typing")
 
     media = message.voice or message.audio  # type: ignore
-    tmp_path: Path | None = None
 
     try:
-        tmp_path = await _download_telegram_file(bot, media.file_id)
-        transcript = await _send_to_asr(tmp_path)
+        transcript = transcript_cache.get(media.file_unique_id)
+        if transcript is None:
+            audio = await _download_telegram_file(bot, media)
+            transcript = await _send_to_asr(audio)
+            if transcript:
+                transcript_cache.set(media.file_unique_id, transcript)
+    except VoiceTooLarge:
+        await message.answer(
+            "Аудио слишком большое. "
+            "Попробуйте записать покороче 🙏",
+        )
+        return
     except Exception as exc:  # noqa: BLE001
         logger.exception("Speech err: %s", exc)
         await message.answer(
@@ -82,22 +75,19 @@ async def voice_message(message: Message, state: FSMContext) -> None:
             "Попробуйте ещё раз позже 🙏",
         )
         return
-    finally:
-        if tmp_path and tmp_path.exists():
-            try:
-                tmp_path.unlink()
-            except OSError:
-                logger.warning("Tmp not removed: %s", tmp_path)
 
     if not transcript:
         await message.answer("К сожалению, речь не распознана 😔")
         return
 
-    await bot.send_chat_action(message.chat.id, "typing")
-    try:
-        answer = await _send_to_agent(transcript, message.from_user.id)
-    except Exception as exc:
-        logger.exception("Agent err: %s", exc)
-        answer = "Ошибка ассистента"
+    async def reply(text: str) -> None:
+        try:
+            async with typing_service.typing(bot, message.chat.id):
+                answer = await _send_to_agent(text, message.from_user.id)
+        except Exception as exc:
+            logger.exception("Agent err: %s", exc)
+            answer = "Ошибка ассистента"
+
+        await message.answer(answer)
 
-    await message.answer(answer)
+    await agent_debouncer.submit(message.chat.id, transcript, reply)
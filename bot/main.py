@@ -1,4 +1,6 @@
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
 from settings import settings
 from handlers import (
     admin,
@@ -11,25 +13,37 @@ import asyncio
 import logging
 from utils.commands import set_commands
 from middlewares.typing import TypingMiddleware
+from middlewares.outbound import setup_outbound
+from utils.api_client import api_client
 
 logger = logging.getLogger(__name__)
 
 
 async def start_bot(bot: Bot):
+    await api_client.start()
     await set_commands(bot)
     await bot.send_message(settings.bots.admin_id, text='Bot started!')
 
 
 async def stop_bot(bot: Bot):
     await bot.send_message(settings.bots.admin_id, text='Bot stopped!')
+    await api_client.close()
 
 
-async def start():
-    bot = Bot(token=settings.bots.bot_token)
-    dp = Dispatcher()
+def build_storage() -> BaseStorage:
+    """FSM-хранилище: Redis (переживает рестарт, общее для воркеров) или память."""
+    if settings.runtime.fsm_storage == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
 
-    dp.startup.register(start_bot)
-    dp.shutdown.register(stop_bot)
+        if not settings.bots.redis_url:
+            raise RuntimeError("FSM_STORAGE=redis requires REDIS_URL")
+        return RedisStorage.from_url(settings.bots.redis_url)
+    return MemoryStorage()
+
+
+def build_dispatcher() -> Dispatcher:
+    """Собирает диспетчер с роутерами и middleware (без хуков старта)."""
+    dp = Dispatcher(storage=build_storage())
 
     dp.message.middleware.register(TypingMiddleware())
 
@@ -40,11 +54,22 @@ async def start():
         resume.router,
         echo.router
     )
+    return dp
+
+
+async def start():
+    bot = Bot(token=settings.bots.bot_token)
+    setup_outbound(bot)
+    dp = build_dispatcher()
+
+    dp.startup.register(start_bot)
+    dp.shutdown.register(stop_bot)
 
     try:
         await bot.delete_webhook(drop_pending_updates=True)
         await dp.start_polling(bot)
     finally:
+        await dp.storage.close()
         await bot.session.close()
 
 
@@ -53,4 +78,8 @@ if __name__ == '__main__':
         import debugpy
         debugpy.listen(("0.0.0.0", 5678))
         logger.info("Debugger enabled!")
-    asyncio.run(start())
+    if settings.runtime.mode == "webhook":
+        from webhook import run_webhook
+        asyncio.run(run_webhook())
+    else:
+        asyncio.run(start())
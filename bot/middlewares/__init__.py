@@ -1 +1,2 @@
-from .typing import TypingMiddleware
+from .typing import TypingMiddleware, typing_service
+from .outbound import OutboundMiddleware, setup_outbound
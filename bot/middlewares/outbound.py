@@ -0,0 +1,297 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from settings import settings
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NOTIFICATION = 1
+
+_THROTTLED_PREFIXES = ("send", "edit", "copy", "forward")
+_UNTHROTTLED = {"sendChatAction"}
+
+
+class TokenBucket:
+    """Классический token bucket: `rate` токенов в секунду, не больше `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько ждать до свободного токена (0 — можно сейчас)."""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until,
+                                 time.monotonic() + seconds)
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+@dataclass(order=True)
+class _Ticket:
+    priority: int
+    seq: int
+    chat_id: Any = field(compare=False)
+    enqueued: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class QueueStats:
+    """Метрики очереди: ожидание до отправки, ретраи, глубина."""
+
+    def __init__(self, window: int = 1000):
+        self.sent = 0
+        self.retries = 0
+        self.max_wait = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, wait: float) -> None:
+        self.sent += 1
+        self.max_wait = max(self.max_wait, wait)
+        self._recent.append(wait)
+
+    def snapshot(self, depth: int) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+
+        def pct(q: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "depth": depth,
+            "wait_p50": pct(0.50),
+            "wait_p95": pct(0.95),
+            "wait_max": self.max_wait,
+        }
+
+
+class OutboundScheduler:
+    """
+    Центральная очередь исходящих сообщений бота.
+
+    Запрос получает разрешение, когда есть токен и в глобальном
+    ведре (лимит Telegram ~30 msg/s), и в ведре чата. Из готовых к
+    отправке первыми идут интерактивные ответы, затем уведомления админу.
+    Запросы чата, упёршегося в свой лимит, откладываются в очередь этого
+    чата и возвращаются в общую кучу, когда его ведро освободится.
+
+    Ограничение: глобальное ведро локально для процесса. В режиме webhook
+    лимит делится между воркерами поровну (`configure`), даже если часть
+    из них простаивает, а RetryAfter без chat_id блокирует только ведро
+    того воркера, который его получил, — остальные узнают о нём из
+    собственных ответов Telegram.
+    """
+
+    def __init__(self):
+        self.global_bucket = TokenBucket(
+            settings.bots.tg_global_rate, settings.bots.tg_global_rate
+        )
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._heap: List[_Ticket] = []
+        # chat_id → отложенные запросы чата (в порядке постановки)
+        self._deferred: Dict[Any, Deque[_Ticket]] = {}
+        # (когда освободится ведро, seq, chat_id) для отложенных чатов
+        self._timers: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self.stats = QueueStats()
+
+    def configure(self, share: int) -> None:
+        """Делит глобальный лимит между `share` процессами-отправителями."""
+        rate = settings.bots.tg_global_rate / max(share, 1)
+        self.global_bucket = TokenBucket(rate, max(rate, 1))
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = (settings.bots.tg_group_rate if is_group
+                    else settings.bots.tg_chat_rate)
+            bucket = TokenBucket(rate, settings.bots.tg_chat_burst)
+            self._chats[chat_id] = bucket
+            if len(self._chats) > 10000:
+                self._gc()
+        return bucket
+
+    def _gc(self) -> None:
+        now = time.monotonic()
+        waiting = {t.chat_id for t in self._heap} | set(self._deferred)
+        for chat_id in [c for c, b in self._chats.items()
+                        if c not in waiting and b.idle(now)]:
+            del self._chats[chat_id]
+
+    async def acquire(self, chat_id: Any, priority: int) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._dispatch())
+        ticket = _Ticket(
+            priority, next(self._seq), chat_id, time.monotonic(),
+            asyncio.get_running_loop().create_future(),
+        )
+        parked = self._deferred.get(chat_id)
+        if parked is not None:
+            # чат и так ждёт своего ведра — встаём за его запросами
+            parked.append(ticket)
+        else:
+            heapq.heappush(self._heap, ticket)
+            self._wakeup.set()
+        await ticket.future
+
+    def retry_after(self, chat_id: Any, seconds: float) -> None:
+        self.stats.retries += 1
+        if chat_id is None:
+            self.global_bucket.block(seconds)
+        else:
+            self._chat_bucket(chat_id).block(seconds)
+
+    def _defer(self, ticket: _Ticket, delay: float, now: float) -> None:
+        parked = self._deferred.get(ticket.chat_id)
+        if parked is None:
+            parked = self._deferred[ticket.chat_id] = deque()
+            heapq.heappush(
+                self._timers, (now + delay, next(self._seq), ticket.chat_id)
+            )
+        parked.append(ticket)
+
+    def _release_due(self, now: float) -> None:
+        """Возвращает в кучу запросы чатов, чьё ведро уже освободилось."""
+        while self._timers and self._timers[0][0] <= now:
+            _, _, chat_id = heapq.heappop(self._timers)
+            for ticket in self._deferred.pop(chat_id, ()):
+                if not ticket.future.done():
+                    heapq.heappush(self._heap, ticket)
+
+    async def _sleep(self, timeout: float) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _dispatch(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._release_due(now)
+            next_timer = (self._timers[0][0] - now if self._timers
+                          else None)
+
+            if not self._heap:
+                if next_timer is None:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                else:
+                    await self._sleep(next_timer)
+                continue
+
+            global_delay = self.global_bucket.delay(now)
+            if global_delay > 0:
+                await self._sleep(global_delay)
+                continue
+
+            ticket = heapq.heappop(self._heap)
+            if ticket.future.done():
+                continue
+            delay = self._chat_bucket(ticket.chat_id).delay(now)
+            if delay > 0:
+                self._defer(ticket, delay, now)
+                continue
+
+            self.global_bucket.take(now)
+            self._chat_bucket(ticket.chat_id).take(now)
+            self.stats.observe(now - ticket.enqueued)
+            ticket.future.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        depth = len(self._heap) + sum(map(len, self._deferred.values()))
+        return self.stats.snapshot(depth=depth)
+
+
+class OutboundMiddleware(BaseRequestMiddleware):
+    """
+    Request-middleware сессии бота: все send*/edit*/copy*/forward*
+    проходят через OutboundScheduler; TelegramRetryAfter повторяется.
+    """
+
+    def __init__(self, scheduler: OutboundScheduler, max_retries: int = 5):
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        chat_id = getattr(method, "chat_id", None)
+        if (name in _UNTHROTTLED
+                or not name.startswith(_THROTTLED_PREFIXES)
+                or chat_id is None):
+            return await make_request(bot, method)
+
+        priority = (PRIORITY_NOTIFICATION
+                    if chat_id == settings.bots.admin_id
+                    else PRIORITY_INTERACTIVE)
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.warning("RetryAfter %ss for chat %s (%s)",
+                               exc.retry_after, chat_id, name)
+                self.scheduler.retry_after(chat_id, exc.retry_after)
+
+
+outbound_scheduler = OutboundScheduler()
+
+
+def setup_outbound(bot: "Bot", share: int = 1) -> None:
+    """Подключает очередь исходящих к сессии бота."""
+    outbound_scheduler.configure(share)
+    bot.session.middleware(OutboundMiddleware(outbound_scheduler))
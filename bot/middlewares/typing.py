@@ -1,15 +1,83 @@
 import asyncio
-from typing import Any, Callable, Awaitable
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
 
-from aiogram import BaseMiddleware
+from aiogram import BaseMiddleware, Bot
 from aiogram.types import Message
 
+logger = logging.getLogger(__name__)
 
-class TypingMiddleware(BaseMiddleware):
-    """Send 'typing' action while handler is processing."""
+
+@dataclass
+class _Ticker:
+    task: asyncio.Task
+    refs: int = 0
+
+
+class TypingService:
+    """
+    Один индикатор «печатает…» на чат.
+
+    Все обработчики чата делят общий тикер со счётчиком ссылок: первый
+    запускает, последний гарантированно останавливает. Chat action
+    отправляется не чаще раза в `interval` секунд на чат.
+    """
 
     def __init__(self, interval: float = 4.0):
         self.interval = interval
+        self._tickers: Dict[int, _Ticker] = {}
+        self._last_sent: Dict[int, float] = {}
+
+    @asynccontextmanager
+    async def typing(self, bot: Bot, chat_id: int) -> AsyncIterator[None]:
+        ticker = self._tickers.get(chat_id)
+        if ticker is None:
+            ticker = _Ticker(asyncio.create_task(self._tick(bot, chat_id)))
+            self._tickers[chat_id] = ticker
+        ticker.refs += 1
+        try:
+            yield
+        finally:
+            ticker.refs -= 1
+            if not ticker.refs:
+                ticker.task.cancel()
+                if self._tickers.get(chat_id) is ticker:
+                    del self._tickers[chat_id]
+
+    async def _tick(self, bot: Bot, chat_id: int) -> None:
+        while True:
+            delay = self._last_sent.get(chat_id, 0) + self.interval \
+                - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_sent[chat_id] = time.monotonic()
+            self._prune()
+            try:
+                await bot.send_chat_action(chat_id, "typing")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("typing for %s failed: %s", chat_id, exc)
+
+    def _prune(self) -> None:
+        if len(self._last_sent) < 1000:
+            return
+        edge = time.monotonic() - self.interval
+        for chat_id in [c for c, t in self._last_sent.items() if t < edge]:
+            del self._last_sent[chat_id]
+
+
+typing_service = TypingService()
+
+
+class TypingMiddleware(BaseMiddleware):
+    """Send 'typing' action while handler is processing."""
+
+    def __init__(self, service: TypingService = typing_service):
+        self.service = service
 
     async def __call__(
         self,
@@ -20,19 +88,5 @@ class TypingMiddleware(BaseMiddleware):
         if not isinstance(event, Message):
             return await handler(event, data)
 
-        stop_event = asyncio.Event()
-
-        async def send_typing() -> None:
-            while not stop_event.is_set():
-                try:
-                    await event.bot.send_chat_action(event.chat.id, "typing")
-                    await asyncio.wait_for(stop_event.wait(), timeout=self.interval)
-                except asyncio.TimeoutError:
-                    continue
-
-        task = asyncio.create_task(send_typing())
-        try:
+        async with self.service.typing(event.bot, event.chat.id):
             return await handler(event, data)
-        finally:
-            stop_event.set()
-            await task
@@ -12,6 +12,32 @@ class Bots:
     admin_id: int
     app_url: str
     debug: bool
+    voice_max_bytes: int
+    transcript_cache_ttl: int
+    api_http2: bool
+    api_max_connections: int
+    api_max_keepalive: int
+    consent_cache_ttl: int
+    redis_url: str | None
+    debounce_window: float
+    debounce_max_wait: float
+    tg_global_rate: float
+    tg_chat_rate: float
+    tg_group_rate: float
+    tg_chat_burst: int
+
+
+@dataclass
+class Runtime:
+    mode: str                 # "polling" | "webhook"
+    fsm_storage: str          # "memory" | "redis"
+    webhook_base_url: str | None
+    webhook_path: str
+    webhook_host: str
+    webhook_port: int
+    webhook_secret: str | None
+    workers: int
+    queue_size: int
 
 
 @dataclass
@@ -28,6 +54,7 @@ class LLM:
 class Settings:
     bots: Bots
     llm: LLM
+    runtime: Runtime
 
 def get_settings(path: str):
     env = Env()
@@ -38,7 +65,20 @@ def get_settings(path: str):
             bot_token=env.str("TELEGRAM_BOT_TOKEN"),
             admin_id=env.int("ADMIN_ID"),
             app_url=env.str("APP_URL", "http://app:8000"),
-            debug=env.bool("DEBUG", False)
+            debug=env.bool("DEBUG", False),
+            voice_max_bytes=env.int("VOICE_MAX_BYTES", 20 * 1024 * 1024),
+            transcript_cache_ttl=env.int("TRANSCRIPT_CACHE_TTL", 24 * 3600),
+            api_http2=env.bool("API_HTTP2", False),
+            api_max_connections=env.int("API_MAX_CONNECTIONS", 100),
+            api_max_keepalive=env.int("API_MAX_KEEPALIVE", 20),
+            consent_cache_ttl=env.int("CONSENT_CACHE_TTL", 600),
+            redis_url=env.str("REDIS_URL", None),
+            debounce_window=env.float("AGENT_DEBOUNCE_SECONDS", 1.5),
+            debounce_max_wait=env.float("AGENT_DEBOUNCE_MAX_SECONDS", 6.0),
+            tg_global_rate=env.float("TG_GLOBAL_RATE", 30.0),
+            tg_chat_rate=env.float("TG_CHAT_RATE", 1.0),
+            tg_group_rate=env.float("TG_GROUP_RATE", 20 / 60),
+            tg_chat_burst=env.int("TG_CHAT_BURST", 3),
         ),
         llm=LLM(
             provider=env.str("LLM_PROVIDER", "openai"),
@@ -47,6 +87,17 @@ def get_settings(path: str):
             top_p=env.float("LLM_TOP_P", 1.0),
             openai_api_key=env.str("OPENAI_API_KEY"),
             google_api_key=env.str("GOOGLE_API_KEY")
+        ),
+        runtime=Runtime(
+            mode=env.str("BOT_MODE", "polling"),
+            fsm_storage=env.str("FSM_STORAGE", "memory"),
+            webhook_base_url=env.str("WEBHOOK_BASE_URL", None),
+            webhook_path=env.str("WEBHOOK_PATH", "/tg/webhook"),
+            webhook_host=env.str("WEBHOOK_HOST", "0.0.0.0"),
+            webhook_port=env.int("WEBHOOK_PORT", 8080),
+            webhook_secret=env.str("WEBHOOK_SECRET", None),
+            workers=env.int("BOT_WORKERS", 4),
+            queue_size=env.int("BOT_WORKER_QUEUE_SIZE", 1000),
         )
     )
 
@@ -0,0 +1,239 @@
+import io
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from settings import settings
+from utils.cache import ConsentCache, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Таймауты по ручкам, секунды
+TIMEOUTS: Dict[str, float] = {
+    "default": 10.0,
+    "auth": 5.0,
+    "consent": 5.0,
+    "health": 5.0,
+    "agent": 300.0,
+    "asr": 60.0,
+    "pdf": 120.0,
+    "admin": 30.0,
+}
+
+
+class ApiError(Exception):
+    """Backend ответил не-2xx статусом."""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"API {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class ApiClient:
+    """
+    Единый клиент бота к backend API.
+
+    Один httpx.AsyncClient на всё время работы бота: keep-alive пул,
+    лимиты соединений и (опционально) HTTP/2. Открывается на старте
+    диспетчера и закрывается при остановке.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = f"{base_url.rstrip('/')}/api/v1"
+        self._client: Optional[httpx.AsyncClient] = None
+        # tg_id → (ETag, ответ /dialog/next) для условных запросов
+        self._dialog_next: TTLCache[Tuple[str, Dict[str, Any]]] = TTLCache(
+            ttl=3600, maxsize=10000
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=settings.bots.api_http2,
+                timeout=TIMEOUTS["default"],
+                limits=httpx.Limits(
+                    max_connections=settings.bots.api_max_connections,
+                    max_keepalive_connections=settings.bots.api_max_keepalive,
+                    keepalive_expiry=60.0,
+                ),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        _ = self.client
+        logger.info("API client ready: %s", self.base_url)
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        await consent_cache.close()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        timeout: str = "default",
+        **kwargs: Any,
+    ) -> Any:
+        resp = await self.client.request(
+            method, path, timeout=TIMEOUTS[timeout], **kwargs
+        )
+        if not resp.is_success:
+            logger.error("%s %s → %s %s", method, path,
+                         resp.status_code, resp.text)
+            raise ApiError(resp.status_code, resp.text)
+        return resp.json() if resp.content else None
+
+    # ───────────────────────── auth / consent ──────────────────────────
+
+    async def auth_tg(self, tg_id: int) -> Dict[str, Any]:
+        """Регистрирует (или находит) пользователя, возвращает его данные."""
+        data = await self._request(
+            "POST", "/auth/tg", json={"tg_id": tg_id}, timeout="auth"
+        )
+        return data["user"]
+
+    async def check_consent(self, tg_id: int) -> bool:
+        """
+        True ⇢ пользователь принял оба юридических согласия.
+        Статус берётся из кэша; /auth/tg вызывается только при промахе.
+        """
+        cached = await consent_cache.get(tg_id)
+        if cached is not None:
+            return cached
+        try:
+            user = await self.auth_tg(tg_id)
+        except ApiError:
+            return False
+        agreed = bool(user.get("pdn_agreed") and user.get("offer_agreed"))
+        await consent_cache.set(tg_id, agreed)
+        return agreed
+
+    async def set_consent(self, tg_id: int, agree: bool) -> None:
+        try:
+            await self._request(
+                "POST",
+                "/users/consent",
+                json={"tg_id": tg_id, "agree": agree},
+                timeout="consent",
+            )
+        except ApiError:
+            await consent_cache.invalidate(tg_id)
+            raise
+        await consent_cache.set(tg_id, agree)
+
+    # ───────────────────────────── dialog ──────────────────────────────
+
+    async def ask_agent(self, tg_id: int, text: str) -> str:
+        data = await self._request(
+            "POST",
+            "/dialog/agent",
+            json={"user_id": tg_id, "message": text},
+            timeout="agent",
+        )
+        return data.get("answer") or "…"
+
+    async def dialog_next(self, tg_id: int) -> Dict[str, Any]:
+        """
+        Следующий шаг диалога. Готовое/частичное резюме кэшируется по
+        ETag: при 304 backend не перерисовывает CV, а бот берёт прошлый ответ.
+        """
+        cached = self._dialog_next.get(tg_id)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        resp = await self.client.post(
+            "/dialog/next",
+            json={"user_id": tg_id},
+            headers=headers,
+            timeout=TIMEOUTS["default"],
+        )
+        if resp.status_code == 304 and cached:
+            return cached[1]
+        if not resp.is_success:
+            logger.error("POST /dialog/next → %s %s",
+                         resp.status_code, resp.text)
+            raise ApiError(resp.status_code, resp.text)
+        data = resp.json()
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._dialog_next.set(tg_id, (etag, data))
+        else:
+            self._dialog_next.pop(tg_id)
+        return data
+
+    async def dialog_reset(self, tg_id: int) -> Dict[str, Any]:
+        return await self._request(
+            "POST", "/dialog/reset", json={"user_id": tg_id}
+        )
+
+    async def resume_continue(
+        self, tg_id: int, resume_id: int
+    ) -> Dict[str, Any]:
+        return await self._request(
+            "POST",
+            "/dialog/resume-continue",
+            json={"resume_id": resume_id, "user_id": tg_id},
+        )
+
+    async def upload_pdf(self, tg_id: int, pdf: io.BytesIO) -> Dict[str, Any]:
+        return await self._request(
+            "POST",
+            "/dialog/pdf",
+            data={"tg_id": str(tg_id)},
+            files={"file": ("resume.pdf", pdf, "application/pdf")},
+            timeout="pdf",
+        )
+
+    async def recognize(self, audio: io.BytesIO) -> str:
+        data = await self._request(
+            "POST",
+            "/dialog/audio/",
+            files={"file": ("voice.ogg", audio, "application/octet-stream")},
+            timeout="asr",
+        )
+        return data.get("text", "")
+
+    # ───────────────────────────── admin ───────────────────────────────
+
+    async def health(self) -> bool:
+        try:
+            await self._request("GET", "/health_check", timeout="health")
+        except (ApiError, httpx.HTTPError):
+            return False
+        return True
+
+    async def update_questions(self, token: str) -> Dict[str, Any]:
+        return await self._request(
+            "POST",
+            "/admin/update-questions",
+            json={"token": token},
+            timeout="admin",
+        )
+
+    async def question_sync_status(
+        self, job_id: int, token: str
+    ) -> Dict[str, Any]:
+        return await self._request(
+            "GET",
+            f"/admin/update-questions/{job_id}",
+            headers={"X-Admin-Token": token},
+            timeout="admin",
+        )
+
+    async def get_insights(self, tg_id: int) -> List[str]:
+        data = await self._request(
+            "GET", f"/resume/{tg_id}/insight", timeout="admin"
+        )
+        return data["insights"]
+
+
+consent_cache = ConsentCache(
+    ttl=settings.bots.consent_cache_ttl,
+    redis_url=settings.bots.redis_url,
+)
+api_client = ApiClient(settings.bots.app_url)
@@ -0,0 +1,103 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Простой in-memory кэш с временем жизни записей и LRU-вытеснением.
+    Бот однопоточный (asyncio), поэтому блокировки не нужны.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ConsentCache:
+    """
+    Кэш статуса согласий: tg_id → bool.
+
+    Если задан REDIS_URL — хранится в Redis (общий для всех реплик бота),
+    иначе — в памяти процесса. Заполняется из /auth/tg и обновляется
+    при нажатии кнопок согласия. Ошибка Redis не роняет обработчик:
+    get считает её промахом (статус придёт из /auth/tg), set и
+    invalidate только пишут в лог.
+    """
+
+    PREFIX = "consent:"
+
+    def __init__(self, ttl: int, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self._local: TTLCache[bool] = TTLCache(ttl=ttl, maxsize=10000)
+        self._redis = None
+        if redis_url:
+            from redis import asyncio as aioredis
+
+            self._redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, tg_id: int) -> Optional[bool]:
+        if self._redis is None:
+            return self._local.get(tg_id)
+        try:
+            value = await self._redis.get(f"{self.PREFIX}{tg_id}")
+        except RedisError as exc:
+            logger.warning("Consent cache GET %s failed: %s", tg_id, exc)
+            return None
+        return None if value is None else value == "1"
+
+    async def set(self, tg_id: int, agreed: bool) -> None:
+        if self._redis is None:
+            self._local.set(tg_id, agreed)
+            return
+        try:
+            await self._redis.set(
+                f"{self.PREFIX}{tg_id}", "1" if agreed else "0", ex=self.ttl
+            )
+        except RedisError as exc:
+            logger.warning("Consent cache SET %s failed: %s", tg_id, exc)
+
+    async def invalidate(self, tg_id: int) -> None:
+        if self._redis is None:
+            self._local.pop(tg_id)
+            return
+        try:
+            await self._redis.delete(f"{self.PREFIX}{tg_id}")
+        except RedisError as exc:
+            # устаревшее значение доживёт до конца TTL
+            logger.error("Consent cache DEL %s failed: %s", tg_id, exc)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
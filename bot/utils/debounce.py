@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+Flush = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class _Burst:
+    flush: Flush
+    parts: List[str] = field(default_factory=list)
+    first: float = field(default_factory=time.monotonic)
+    last: float = field(default_factory=time.monotonic)
+
+
+class AgentDebouncer:
+    """
+    Склеивает «пачку» быстрых сообщений одного чата в один запрос к агенту.
+
+    Каждое сообщение продлевает окно тишины `window`; когда оно истекло
+    (или пачка копится дольше `max_wait`), тексты объединяются и
+    отправляются последним переданным `flush`. Хендлер не ждёт окна,
+    поэтому апдейты чата могут обрабатываться последовательно. Вызовы
+    агента внутри одного чата не пересекаются.
+    """
+
+    def __init__(self, window: float, max_wait: float):
+        self.window = window
+        self.max_wait = max_wait
+        self._bursts: Dict[int, _Burst] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._users: Dict[int, int] = {}
+        self._tasks: set = set()
+
+    async def submit(self, chat_id: int, text: str, flush: Flush) -> None:
+        if self.window <= 0:
+            await flush(text)
+            return
+
+        burst = self._bursts.get(chat_id)
+        if burst is None:
+            burst = _Burst(flush=flush)
+            self._bursts[chat_id] = burst
+            task = asyncio.create_task(self._run(chat_id, burst))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        burst.parts.append(text)
+        burst.flush = flush
+        burst.last = time.monotonic()
+
+    async def _run(self, chat_id: int, burst: _Burst) -> None:
+        while True:
+            now = time.monotonic()
+            deadline = min(burst.last + self.window,
+                           burst.first + self.max_wait)
+            if now >= deadline:
+                break
+            await asyncio.sleep(deadline - now)
+
+        # новые сообщения с этого момента копятся в следующую пачку
+        self._bursts.pop(chat_id, None)
+        text = "\n".join(p for p in burst.parts if p) or ""
+        if len(burst.parts) > 1:
+            logger.info("Chat %s: %d messages merged", chat_id,
+                        len(burst.parts))
+
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        self._users[chat_id] = self._users.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                await burst.flush(text)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Chat %s: agent turn failed: %s", chat_id, exc)
+        finally:
+            self._users[chat_id] -= 1
+            if not self._users[chat_id]:
+                del self._users[chat_id]
+                del self._locks[chat_id]
+
+
+agent_debouncer = AgentDebouncer(
+    window=settings.bots.debounce_window,
+    max_wait=settings.bots.debounce_max_wait,
+)
@@ -0,0 +1,181 @@
+"""
+Webhook-режим с несколькими процессами-воркерами.
+
+Фронт-процесс принимает апдейты от Telegram и раскладывает их по
+очередям воркеров по chat_id, поэтому все апдейты одного чата всегда
+обрабатывает один и тот же воркер. Внутри воркера чаты обрабатываются
+параллельно, а апдейты одного чата — строго по очереди. FSM хранится в
+общем хранилище (FSM_STORAGE=redis), так что состояние переживает
+рестарты и не зависит от номера воркера.
+"""
+import asyncio
+import logging
+import multiprocessing as mp
+import queue
+import signal
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from aiogram import Bot
+from aiogram.types import Update
+from aiohttp import web
+
+from settings import settings
+from utils.commands import set_commands
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def chat_key(update: Dict[str, Any]) -> int:
+    """
+    Ключ шардирования: chat.id события, иначе from.id, иначе 0.
+    """
+    for name, event in update.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat and "id" in chat:
+            return chat["id"]
+        sender = event.get("from") or event.get("user")
+        if sender and "id" in sender:
+            return sender["id"]
+    return 0
+
+
+class _ChatLocks:
+    """asyncio.Lock на чат; замки удаляются, когда ими никто не пользуется."""
+
+    def __init__(self):
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._users: Dict[int, int] = defaultdict(int)
+
+    async def run(self, key: int, coro) -> None:
+        self._users[key] += 1
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                await coro
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+
+# ──────────────────────────── воркер ──────────────────────────────
+
+async def _worker(shard: int, inbox: "mp.Queue") -> None:
+    from main import build_dispatcher
+    from middlewares.outbound import setup_outbound
+    from utils.api_client import api_client
+
+    bot = Bot(token=settings.bots.bot_token)
+    setup_outbound(bot, share=settings.runtime.workers)
+    dp = build_dispatcher()
+    await api_client.start()
+
+    locks = _ChatLocks()
+    tasks: set = set()
+    loop = asyncio.get_running_loop()
+
+    async def handle(data: Dict[str, Any]) -> None:
+        try:
+            update = Update.model_validate(data, context={"bot": bot})
+            await dp.feed_update(bot, update)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Worker %s: update failed: %s", shard, exc)
+
+    logger.info("Worker %s started", shard)
+    try:
+        while True:
+            data = await loop.run_in_executor(None, inbox.get)
+            if data is None:
+                break
+            task = asyncio.create_task(
+                locks.run(chat_key(data), handle(data))
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await api_client.close()
+        await dp.storage.close()
+        await bot.session.close()
+        logger.info("Worker %s stopped", shard)
+
+
+def _worker_entry(shard: int, inbox: "mp.Queue") -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_worker(shard, inbox))
+
+
+# ──────────────────────────── фронт ───────────────────────────────
+
+async def run_webhook() -> None:
+    cfg = settings.runtime
+    if not cfg.webhook_base_url:
+        raise RuntimeError("BOT_MODE=webhook requires WEBHOOK_BASE_URL")
+    if cfg.workers > 1 and cfg.fsm_storage != "redis":
+        logger.warning(
+            "BOT_WORKERS=%s with in-memory FSM: state is per worker "
+            "and lost on restart", cfg.workers,
+        )
+
+    ctx = mp.get_context("spawn")
+    inboxes: List["mp.Queue"] = [
+        ctx.Queue(maxsize=cfg.queue_size) for _ in range(cfg.workers)
+    ]
+    workers = [
+        ctx.Process(target=_worker_entry, args=(i, q), daemon=True)
+        for i, q in enumerate(inboxes)
+    ]
+    for proc in workers:
+        proc.start()
+
+    async def on_update(request: web.Request) -> web.Response:
+        if (cfg.webhook_secret
+                and request.headers.get(SECRET_HEADER) != cfg.webhook_secret):
+            return web.Response(status=401)
+        data = await request.json()
+        shard = chat_key(data) % cfg.workers
+        try:
+            inboxes[shard].put_nowait(data)
+        except queue.Full:
+            # Telegram повторит доставку позже
+            logger.warning("Worker %s queue is full", shard)
+            return web.Response(status=503)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(cfg.webhook_path, on_update)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, cfg.webhook_host, cfg.webhook_port)
+    await site.start()
+
+    bot = Bot(token=settings.bots.bot_token)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await bot.set_webhook(
+            f"{cfg.webhook_base_url.rstrip('/')}{cfg.webhook_path}",
+            secret_token=cfg.webhook_secret,
+            drop_pending_updates=True,
+        )
+        await set_commands(bot)
+        await bot.send_message(settings.bots.admin_id, text='Bot started!')
+        logger.info("Webhook mode: %s workers", cfg.workers)
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        for inbox in inboxes:
+            inbox.put(None)
+        for proc in workers:
+            await loop.run_in_executor(None, proc.join, 30)
+        await bot.send_message(settings.bots.admin_id, text='Bot stopped!')
+        await bot.session.close()